@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     InsuranceAgent, InsuranceCarrier, InsurancePlan, Client,
-    PolicyApplication, AgentCommission, AgentActivity
+    PolicyApplication, AgentCommission, AgentActivity, AgentDashboardSnapshot, AgentStats
 )
 
 
@@ -59,4 +59,18 @@ class AgentCommissionAdmin(admin.ModelAdmin):
 class AgentActivityAdmin(admin.ModelAdmin):
     list_display = ['agent', 'client', 'activity_type', 'subject', 'created_at']
     list_filter = ['activity_type', 'agent', 'created_at']
-    search_fields = ['agent__agent_id', 'client__first_name', 'client__last_name', 'subject']
\ No newline at end of file
+    search_fields = ['agent__agent_id', 'client__first_name', 'client__last_name', 'subject']
+
+
+@admin.register(AgentDashboardSnapshot)
+class AgentDashboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['agent', 'generated_at', 'context_fingerprint']
+    search_fields = ['agent__agent_id']
+    readonly_fields = ['generated_at', 'context_fingerprint']
+
+
+@admin.register(AgentStats)
+class AgentStatsAdmin(admin.ModelAdmin):
+    list_display = ['agent', 'clients_active', 'clients_prospect', 'applications_approved', 'commission_amount_paid', 'updated_at']
+    search_fields = ['agent__agent_id']
+    readonly_fields = ['updated_at']
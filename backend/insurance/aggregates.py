@@ -0,0 +1,38 @@
+"""
+Per-agent aggregate expressions
+Scalar subqueries that let a single agent query carry counts, sums and latest timestamps over
+the agent's clients, applications, commissions and activities
+"""
+
+from decimal import Decimal
+
+from django.db.models import Count, DateTimeField, DecimalField, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+MONEY_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+
+def agent_count(model, condition=None):
+    """Scalar subquery counting the outer agent's rows, optionally filtered"""
+    rows = model.objects.filter(agent=OuterRef('pk')).order_by().values('agent')
+    return Coalesce(
+        Subquery(rows.annotate(value=Count('id', filter=condition)).values('value')[:1], output_field=IntegerField()),
+        Value(0)
+    )
+
+
+def agent_sum(model, field, condition=None):
+    """Scalar subquery summing a decimal field over the outer agent's rows, optionally filtered"""
+    rows = model.objects.filter(agent=OuterRef('pk')).order_by().values('agent')
+    return Coalesce(
+        Subquery(rows.annotate(value=Sum(field, filter=condition)).values('value')[:1], output_field=MONEY_FIELD),
+        Value(Decimal('0')),
+        output_field=MONEY_FIELD
+    )
+
+
+def agent_latest(model, field='updated_at'):
+    """Scalar subquery with the latest value of a timestamp over the outer agent's rows (NULL if none)"""
+    rows = model.objects.filter(agent=OuterRef('pk')).order_by().values('agent')
+    return Subquery(rows.annotate(value=Max(field)).values('value')[:1], output_field=DateTimeField())
@@ -3,38 +3,72 @@ Insurance Agent AI Assistant - Agentic Solution
 Provides intelligent summaries, recommendations, and insights for insurance agents
 """
 
-import os
-from typing import List, Dict, Any
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 from datetime import datetime, timedelta
 from django.conf import settings
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from .models import InsuranceAgent, InsurancePlan, Client, PolicyApplication, AgentCommission
+from .models import InsuranceAgent, AgentDashboardSnapshot
+from .ai_cache import summary_cache, summary_flight, agent_fingerprint, compute_fingerprints, get_llm_response_cache
+from .ai_context import AgentContext, build_agent_context, build_agent_contexts
+from .ai_metrics import PipelineTrace, ai_metrics
+from .llm import LLMBackend, LLMResponse, LLMUnavailableError, CircuitBreaker, Deadline, get_llm_backend
 
-# Groq LLM Integration
-try:
-    from langchain_groq import ChatGroq
-    from dotenv import load_dotenv
-    load_dotenv()
-    
-    # Initialize Groq LLM
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    groq_llm = ChatGroq(
-        groq_api_key=groq_api_key, 
-        model_name="mixtral-8x7b-32768", 
-        temperature=0.1, 
-        max_tokens=1024
-    ) if groq_api_key and groq_api_key.startswith("gsk_") else None
-    
-    GROQ_AVAILABLE = groq_llm is not None
-    print(f"🤖 Groq LLM {'initialized' if GROQ_AVAILABLE else 'not available (using fallback logic)'}")
-    
-except ImportError:
-    print("⚠️ Groq dependencies not installed. Using fallback AI logic.")
-    GROQ_AVAILABLE = False
-    groq_llm = None
+# Shared across requests so a degraded upstream trips every worker into fallback-only mode
+llm_breaker = CircuitBreaker(
+    failure_threshold=settings.AI_LLM_BREAKER_FAILURE_THRESHOLD,
+    slow_call_seconds=settings.AI_LLM_SLOW_CALL_SECONDS,
+    reset_timeout=settings.AI_LLM_BREAKER_RESET_SECONDS
+)
+
+
+# Expected shape of each section in a combined-mode LLM reply
+COMBINED_RESPONSE_SCHEMA = {
+    'insights': ('type', 'title', 'insight', 'metric', 'recommendation'),
+    'recommendations': ('type', 'priority', 'action', 'description', 'expected_impact'),
+}
+RECOMMENDATION_PRIORITIES = ('high', 'medium', 'low')
+
+
+# Shared pool for LLM round-trips; its size caps concurrent upstream connections per process
+_llm_executor = None
+_llm_executor_lock = threading.Lock()
+
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide bounded thread pool used for LLM calls
+    """
+    global _llm_executor
+    with _llm_executor_lock:
+        if _llm_executor is None:
+            _llm_executor = ThreadPoolExecutor(
+                max_workers=settings.AI_LLM_MAX_CONCURRENCY,
+                thread_name_prefix='navicare-llm'
+            )
+        return _llm_executor
+
+
+def _run_llm_stage(stage, *args):
+    """
+    Run an LLM stage on a pool thread, releasing any DB connection it opened
+    """
+    try:
+        return stage(*args)
+    finally:
+        connections.close_all()
 
 
 class InsuranceAgentAI:
@@ -43,75 +77,529 @@ class InsuranceAgentAI:
     Provides intelligent insights, summaries, and recommendations using RAG pipeline approach
     """
     
-    def __init__(self):
+    def __init__(self, llm: LLMBackend = None):
         self.context_store = {}
-        self.analysis_cache = {}
-        self.llm = groq_llm
-        self.groq_available = GROQ_AVAILABLE
+        self.summary_cache = summary_cache
+        # LLM Integration - Groq by default, or the offline stand-in with AI_LLM_BACKEND=fake;
+        # the provider SDK is only imported when the first assistant is created
+        self.llm = llm or get_llm_backend()
+        self.llm_available = self.llm is not None
+        self.response_cache = get_llm_response_cache()
+        self.breaker = llm_breaker
+        self.deadline = Deadline(settings.AI_REQUEST_BUDGET_SECONDS)
+        self.trace = PipelineTrace()
     
-    def generate_agent_dashboard_summary(self, agent_id: str) -> Dict[str, Any]:
+    def generate_agent_dashboard_summary(self, agent_id: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Generate comprehensive dashboard summary for an insurance agent
         Enhanced with Groq LLM for intelligent analysis
+        Summaries are served from the process-wide cache or a fresh precomputed snapshot
+        while the agent's book of business is unchanged; concurrent misses for the same
+        agent and fingerprint share a single generation
         """
         try:
-            agent = InsuranceAgent.objects.get(agent_id=agent_id)
-            
-            # Gather agent context data
-            context = self._gather_agent_context(agent)
-            
-            # Generate LLM-powered insights
-            insights = self._generate_llm_insights(context)
+            with self.trace.stage('lookup'):
+                agent = InsuranceAgent.objects.select_related('user').get(agent_id=agent_id)
+                fingerprint = agent_fingerprint(agent)
+                stored = self._lookup_summary(agent, fingerprint) if use_cache else None
             
-            # Create LLM-powered recommendations
-            recommendations = self._generate_llm_recommendations(context)
+            if not use_cache:
+                return self.generate_summary_for_agent(agent)
+            if stored is not None:
+                return stored
             
-            # Performance metrics
-            performance = self._calculate_performance_metrics(agent, context)
+            return self._coalesced(summary_flight.do(
+                (agent.agent_id, fingerprint),
+                lambda: self._generate_and_cache(agent, fingerprint)
+            ))
             
-            # Generate executive summary using LLM
-            executive_summary = self._generate_executive_summary(context)
-            
-            summary = {
-                'agent_info': {
-                    'name': agent.user.get_full_name(),
-                    'agent_id': agent.agent_id,
-                    'certification': agent.certification_level,
-                    'specialties': agent.specialties,
-                    'active_since': agent.active_since.isoformat()
-                },
-                'executive_summary': executive_summary,
-                'insights': insights,
-                'recommendations': recommendations,
-                'performance': performance,
-                'context_summary': self._create_context_summary(context),
-                'ai_powered': self.groq_available,
-                'generated_at': datetime.now().isoformat()
-            }
+        except InsuranceAgent.DoesNotExist:
+            return {'error': f'Agent {agent_id} not found'}
+        except Exception as e:
+            return {'error': f'Failed to generate summary: {str(e)}'}
+        finally:
+            self.trace.finish()
+    
+    async def agenerate_agent_dashboard_summary(self, agent_id: str) -> Dict[str, Any]:
+        """
+        Async variant of generate_agent_dashboard_summary for the ASGI entry point
+        Coroutines waiting on a coalesced generation do not hold a worker thread
+        """
+        try:
+            agent, fingerprint, stored = await sync_to_async(self._prepare_lookup)(agent_id)
+            if stored is not None:
+                return stored
             
-            return summary
+            return self._coalesced(await summary_flight.do_async(
+                (agent.agent_id, fingerprint),
+                lambda: _run_llm_stage(self._generate_and_cache, agent, fingerprint)
+            ))
             
         except InsuranceAgent.DoesNotExist:
             return {'error': f'Agent {agent_id} not found'}
         except Exception as e:
             return {'error': f'Failed to generate summary: {str(e)}'}
+        finally:
+            self.trace.finish()
+    
+    def _prepare_lookup(self, agent_id: str) -> tuple:
+        with self.trace.stage('lookup'):
+            agent = InsuranceAgent.objects.select_related('user').get(agent_id=agent_id)
+            fingerprint = agent_fingerprint(agent)
+            return agent, fingerprint, self._lookup_summary(agent, fingerprint)
+    
+    def _coalesced(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        # Callers that waited on another request's generation never recorded a source of their own
+        if self.trace.source is None:
+            self.trace.record_source('coalesced')
+        return summary
+    
+    def _generate_and_cache(self, agent: InsuranceAgent, fingerprint: str,
+                            context: AgentContext = None) -> Dict[str, Any]:
+        summary = self.generate_summary_for_agent(agent, context)
+        self.summary_cache.set(agent.agent_id, fingerprint, summary)
+        return summary
+    
+    def generate_batch_summaries(self, agents: Iterable[InsuranceAgent]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a dashboard summary result for each agent (with its user loaded) as it becomes ready
+        Stored summaries come first; the rest share one grouped context query and are generated
+        AI_BATCH_CONCURRENCY at a time, so database work does not grow with the team size
+        """
+        agents = list(agents)
+        fingerprints = compute_fingerprints(agents)
+        stored = self._lookup_summaries(agents, fingerprints)
+        
+        pending = []
+        for agent in agents:
+            if agent.pk in stored:
+                yield self._batch_result(agent, stored[agent.pk])
+            else:
+                pending.append(agent)
+        
+        if not pending:
+            return
+        
+        contexts = build_agent_contexts(pending)
+        workers = max(min(settings.AI_BATCH_CONCURRENCY, len(contexts)), 1)
+        # A dedicated pool: each generation submits its LLM stages to the shared LLM pool
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='navicare-ai-batch') as executor:
+            futures = {
+                executor.submit(_run_llm_stage, self._generate_batch_summary, context, fingerprints[context.agent.pk]): context.agent
+                for context in contexts
+            }
+            for future in as_completed(futures):
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    summary = {'error': f'Failed to generate summary: {str(e)}'}
+                yield self._batch_result(futures[future], summary)
+    
+    def _generate_batch_summary(self, context: AgentContext, fingerprint: str) -> Dict[str, Any]:
+        # Each generation gets its own assistant so deadlines and traces are not shared across agents
+        ai_assistant = InsuranceAgentAI(llm=self.llm)
+        try:
+            return ai_assistant._coalesced(summary_flight.do(
+                (context.agent.agent_id, fingerprint),
+                lambda: ai_assistant._generate_and_cache(context.agent, fingerprint, context)
+            ))
+        finally:
+            ai_assistant.trace.finish()
+    
+    def _batch_result(self, agent: InsuranceAgent, summary: Dict[str, Any]) -> Dict[str, Any]:
+        if 'error' in summary:
+            return {'agent_id': agent.agent_id, 'status': 'error', 'error': summary['error']}
+        return {'agent_id': agent.agent_id, 'status': 'success', 'data': summary}
+    
+    def generate_summary_for_agent(self, agent: InsuranceAgent, context: AgentContext = None) -> Dict[str, Any]:
+        """
+        Generate a fresh dashboard summary for an agent (with its user loaded), bypassing all caches
+        """
+        # All LLM stages of this summary share one deadline budget
+        self.deadline = Deadline(settings.AI_REQUEST_BUDGET_SECONDS)
+        self.trace.record_source('generated')
+        
+        # Gather agent context data
+        if context is None:
+            with self.trace.stage('context'):
+                context = self._gather_agent_context(agent)
+        
+        # Generate LLM-powered insights, recommendations and executive summary concurrently
+        insights, recommendations, executive_summary = self._run_llm_stages(context)
+        
+        with self.trace.stage('assemble'):
+            return self._assemble_summary(context, insights, recommendations, executive_summary)
+    
+    def _lookup_summary(self, agent: InsuranceAgent, fingerprint: str) -> Dict[str, Any]:
+        """
+        Return a stored summary matching fingerprint from the in-process cache, then from
+        the precomputed snapshot table, or None when live generation is needed
+        """
+        cached = self.summary_cache.get(agent.agent_id, fingerprint)
+        if cached is not None:
+            self.trace.record_source('cache')
+            return cached
+        
+        snapshot = AgentDashboardSnapshot.objects.filter(agent=agent).first()
+        max_age = timedelta(seconds=settings.AI_SNAPSHOT_MAX_AGE)
+        if snapshot is None or not snapshot.is_fresh(fingerprint, max_age):
+            return None
+        
+        self.trace.record_source('snapshot')
+        self.summary_cache.set(agent.agent_id, fingerprint, snapshot.summary)
+        return snapshot.summary
+    
+    def _lookup_summaries(self, agents: List[InsuranceAgent], fingerprints: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+        """
+        Batch form of _lookup_summary: stored summaries by agent pk, with one snapshot query for all cache misses
+        """
+        stored = {}
+        misses = []
+        for agent in agents:
+            cached = self.summary_cache.get(agent.agent_id, fingerprints[agent.pk])
+            if cached is not None:
+                ai_metrics.increment('summary.cache')
+                stored[agent.pk] = cached
+            else:
+                misses.append(agent)
+        
+        if not misses:
+            return stored
+        
+        max_age = timedelta(seconds=settings.AI_SNAPSHOT_MAX_AGE)
+        agents_by_pk = {agent.pk: agent for agent in misses}
+        for snapshot in AgentDashboardSnapshot.objects.filter(agent__in=misses):
+            agent = agents_by_pk[snapshot.agent_id]
+            if snapshot.is_fresh(fingerprints[agent.pk], max_age):
+                ai_metrics.increment('summary.snapshot')
+                self.summary_cache.set(agent.agent_id, fingerprints[agent.pk], snapshot.summary)
+                stored[agent.pk] = snapshot.summary
+        
+        return stored
+    
+    def stream_agent_dashboard_summary(self, agent_id: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Generate the dashboard summary as a sequence of (event, data) pairs
+        Deterministic sections are yielded after one context query; LLM sections follow as each
+        completes, with the executive summary streamed token by token before its final event
+        """
+        # Runs when the stream ends, however it ends: not found, done, or closed by a disconnect
+        try:
+            yield from self._stream_summary_events(agent_id)
+        finally:
+            self.trace.finish()
+    
+    def _stream_summary_events(self, agent_id: str) -> Iterator[Tuple[str, Any]]:
+        try:
+            with self.trace.stage('lookup'):
+                agent = InsuranceAgent.objects.select_related('user').get(agent_id=agent_id)
+                fingerprint = agent_fingerprint(agent)
+                cached = self._lookup_summary(agent, fingerprint)
+        except InsuranceAgent.DoesNotExist:
+            yield 'error', {'error': f'Agent {agent_id} not found'}
+            return
+        
+        if cached is not None:
+            for section in ('agent_info', 'performance', 'context_summary', 'insights', 'recommendations', 'executive_summary'):
+                yield section, cached[section]
+            yield 'done', {'ai_powered': cached['ai_powered'], 'generated_at': cached['generated_at'], 'cached': True}
+            return
+        
+        self.trace.record_source('generated')
+        with self.trace.stage('context'):
+            context = self._gather_agent_context(agent)
+        self.deadline = Deadline(settings.AI_REQUEST_BUDGET_SECONDS)
+        
+        yield 'agent_info', self._build_agent_info(agent)
+        yield 'performance', self._calculate_performance_metrics(agent, context)
+        yield 'context_summary', self._create_context_summary(context)
+        
+        if self.llm_available and self.llm:
+            results = yield from self._stream_llm_stages(context)
+        else:
+            results = {
+                'insights': self._fallback_generate_insights(context),
+                'recommendations': self._fallback_generate_recommendations(context),
+                'executive_summary': self._fallback_generate_executive_summary(context),
+            }
+            for section, value in results.items():
+                self.trace.record_fallback(section, 'LLM backend not configured')
+                yield section, value
+        
+        with self.trace.stage('assemble'):
+            summary = self._assemble_summary(
+                context, results['insights'], results['recommendations'], results['executive_summary']
+            )
+        self.summary_cache.set(agent.agent_id, fingerprint, summary)
+        
+        yield 'done', {'ai_powered': summary['ai_powered'], 'generated_at': summary['generated_at'], 'cached': False}
+    
+    def _stream_llm_stages(self, context: AgentContext):
+        """
+        Run the LLM stages on the shared pool, yielding each section as it completes
+        Always uses one call per section (never combined mode) so the summary can stream
+        """
+        with self.trace.stage('prompt'):
+            context_text = self._prepare_context_for_llm(context)
+        events = queue.Queue()
+        
+        def run_stage(section, generate, fallback):
+            try:
+                value = generate(context, context_text)
+            except Exception as e:
+                self.trace.record_fallback(section, e)
+                value = fallback(context)
+            events.put((section, value))
+        
+        def stream_summary():
+            try:
+                value = self._groq_stream_executive_summary(
+                    context_text, lambda text: events.put(('executive_summary_delta', {'text': text}))
+                )
+            except Exception as e:
+                self.trace.record_fallback('executive_summary', e)
+                value = None
+            else:
+                if not value:
+                    self.trace.record_fallback('executive_summary', 'empty LLM response')
+            events.put(('executive_summary', value or self._fallback_generate_executive_summary(context)))
+        
+        executor = get_llm_executor()
+        executor.submit(_run_llm_stage, run_stage, 'insights', self._generate_llm_insights, self._fallback_generate_insights)
+        executor.submit(_run_llm_stage, run_stage, 'recommendations', self._generate_llm_recommendations, self._fallback_generate_recommendations)
+        executor.submit(_run_llm_stage, stream_summary)
+        
+        results = {}
+        while len(results) < 3:
+            try:
+                section, value = events.get(timeout=self.deadline.remaining())
+            except queue.Empty:
+                break
+            if section != 'executive_summary_delta':
+                results[section] = value
+            yield section, value
+        
+        # Stages still running when the deadline budget is spent fall back immediately
+        fallbacks = {
+            'insights': self._fallback_generate_insights,
+            'recommendations': self._fallback_generate_recommendations,
+            'executive_summary': self._fallback_generate_executive_summary,
+        }
+        for section, fallback in fallbacks.items():
+            if section not in results:
+                self.trace.record_fallback(section, 'deadline budget spent')
+                results[section] = fallback(context)
+                yield section, results[section]
+        
+        return results
+    
+    def _build_agent_info(self, agent: InsuranceAgent) -> Dict[str, Any]:
+        return {
+            'name': agent.user.get_full_name(),
+            'agent_id': agent.agent_id,
+            'certification': agent.certification_level,
+            'specialties': agent.specialties,
+            'active_since': agent.active_since.isoformat()
+        }
+    
+    def _assemble_summary(self, context: AgentContext, insights: List[Dict[str, Any]],
+                          recommendations: List[Dict[str, Any]], executive_summary: str) -> Dict[str, Any]:
+        """
+        Combine generated sections with the deterministic parts of the dashboard summary
+        """
+        agent = context.agent
+        return {
+            'agent_info': self._build_agent_info(agent),
+            'executive_summary': executive_summary,
+            'insights': insights,
+            'recommendations': recommendations,
+            'performance': self._calculate_performance_metrics(agent, context),
+            'context_summary': self._create_context_summary(context),
+            'ai_powered': self.llm_available,
+            'generated_at': datetime.now().isoformat()
+        }
+    
+    def _run_llm_stages(self, context: AgentContext) -> tuple:
+        """
+        Run the three independent LLM stages on the shared bounded pool
+        Wall time approaches the slowest single call; each stage falls back on its own
+        """
+        stages = [
+            ('insights', self._generate_llm_insights, self._fallback_generate_insights),
+            ('recommendations', self._generate_llm_recommendations, self._fallback_generate_recommendations),
+            ('executive_summary', self._generate_executive_summary, self._fallback_generate_executive_summary),
+        ]
+        
+        if not (self.llm_available and self.llm):
+            return self._fallback_stages(context, stages, 'LLM backend not configured')
+        
+        # Render the prompt context once and share it across stages
+        with self.trace.stage('prompt'):
+            context_text = self._prepare_context_for_llm(context)
+        
+        executor = get_llm_executor()
+        
+        if settings.AI_GENERATION_MODE == 'combined':
+            future = executor.submit(_run_llm_stage, self._groq_generate_combined, context, context_text)
+            try:
+                return future.result(timeout=self.deadline.remaining())
+            except FutureTimeoutError:
+                return self._fallback_stages(context, stages, 'deadline budget spent')
+            except Exception as e:
+                return self._fallback_stages(context, stages, e)
+        
+        futures = [
+            (section, executor.submit(_run_llm_stage, generate, context, context_text), fallback)
+            for section, generate, fallback in stages
+        ]
+        
+        results = []
+        for section, future, fallback in futures:
+            try:
+                results.append(future.result(timeout=self.deadline.remaining()))
+            except FutureTimeoutError:
+                self.trace.record_fallback(section, 'deadline budget spent')
+                results.append(fallback(context))
+            except Exception as e:
+                self.trace.record_fallback(section, e)
+                results.append(fallback(context))
+        
+        return tuple(results)
+    
+    def _fallback_stages(self, context: AgentContext, stages: list, reason: Any) -> tuple:
+        results = []
+        for section, _, fallback in stages:
+            self.trace.record_fallback(section, reason)
+            results.append(fallback(context))
+        return tuple(results)
+    
+    def _groq_generate_combined(self, context: AgentContext, context_text: str) -> tuple:
+        """
+        Use a single Groq LLM call to generate insights, recommendations and executive summary
+        Each section of the JSON reply is validated independently and falls back on its own
+        """
+        try:
+            prompt = f"""
+            As an experienced insurance business analyst and consultant, review the following agent performance data.
+            
+            Agent Context:
+            {context_text}
+            
+            Respond with a single JSON object and no other text, in exactly this format:
+            {{
+                "insights": [
+                    {{
+                        "type": "insight_category",
+                        "title": "Brief Title",
+                        "insight": "Detailed analysis in 1-2 sentences",
+                        "metric": "Key metric or statistic",
+                        "recommendation": "Actionable recommendation"
+                    }}
+                ],
+                "recommendations": [
+                    {{
+                        "type": "recommendation_category",
+                        "priority": "high|medium|low",
+                        "action": "Specific Action Title",
+                        "description": "Detailed description of what to do",
+                        "expected_impact": "Expected business impact"
+                    }}
+                ],
+                "executive_summary": "2-3 sentences on overall performance, key strengths, and primary opportunity for improvement"
+            }}
+            
+            Provide 3-4 insights focused on client portfolio health, application success patterns, commission optimization, and growth opportunities.
+            Provide 2-3 recommendations focused on improving conversion rates, increasing revenue, operational efficiency, and client satisfaction.
+            """
+            
+            response = self._invoke_llm(prompt, 'combined')
+            response_text = response.content if hasattr(response, 'content') else str(response)
+            
+            with self.trace.stage('parse'):
+                document = self._parse_combined_response(response_text)
+            reason = 'invalid LLM response'
+            
+        except Exception as e:
+            document = {}
+            reason = e
+        
+        with self.trace.stage('parse'):
+            insights = self._validate_section(document.get('insights'), 'insights')
+            recommendations = self._validate_section(document.get('recommendations'), 'recommendations')
+            executive_summary = document.get('executive_summary')
+            if not isinstance(executive_summary, str) or not executive_summary.strip():
+                executive_summary = None
+        
+        if not insights:
+            self.trace.record_fallback('insights', reason)
+            insights = self._fallback_generate_insights(context)
+        if not recommendations:
+            self.trace.record_fallback('recommendations', reason)
+            recommendations = self._fallback_generate_recommendations(context)
+        if executive_summary:
+            executive_summary = executive_summary.strip()
+        else:
+            self.trace.record_fallback('executive_summary', reason)
+            executive_summary = self._fallback_generate_executive_summary(context)
+        
+        return insights, recommendations, executive_summary
+    
+    def _parse_combined_response(self, response_text: str) -> Dict[str, Any]:
+        """
+        Extract the JSON document from a combined-mode reply, tolerating code fences and surrounding prose
+        """
+        start = response_text.find('{')
+        end = response_text.rfind('}')
+        if start == -1 or end <= start:
+            return {}
+        
+        try:
+            document = json.loads(response_text[start:end + 1])
+        except ValueError:
+            return {}
+        
+        return document if isinstance(document, dict) else {}
+    
+    def _validate_section(self, items: Any, section: str) -> List[Dict[str, Any]]:
+        """
+        Validate a list section against COMBINED_RESPONSE_SCHEMA, dropping malformed items
+        """
+        if not isinstance(items, list):
+            return []
+        
+        fields = COMBINED_RESPONSE_SCHEMA[section]
+        valid = []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            values = {field: item.get(field) for field in fields}
+            if not all(isinstance(value, (str, int, float)) and str(value).strip() for value in values.values()):
+                continue
+            cleaned = {field: str(value).strip() for field, value in values.items()}
+            if 'priority' in cleaned:
+                cleaned['priority'] = cleaned['priority'].lower()
+                if cleaned['priority'] not in RECOMMENDATION_PRIORITIES:
+                    continue
+            valid.append(cleaned)
+        
+        return valid
     
-    def _generate_llm_insights(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _generate_llm_insights(self, context: AgentContext, context_text: str = None) -> List[Dict[str, Any]]:
         """
         Generate AI-powered insights using Groq LLM or fallback logic
         """
-        if self.groq_available and self.llm:
-            return self._groq_generate_insights(context)
+        if self.llm_available and self.llm:
+            return self._groq_generate_insights(context, context_text)
         else:
             return self._fallback_generate_insights(context)
     
-    def _groq_generate_insights(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _groq_generate_insights(self, context: AgentContext, context_text: str = None) -> List[Dict[str, Any]]:
         """
         Use Groq LLM to generate intelligent insights from context data
         """
         try:
             # Prepare context for LLM
-            context_text = self._prepare_context_for_llm(context)
+            context_text = context_text or self._prepare_context_for_llm(context)
             
             prompt = f"""
             As an experienced insurance business analyst, analyze the following agent performance data and provide 3-4 key business insights.
@@ -131,33 +619,37 @@ class InsuranceAgentAI:
             Focus on: client portfolio health, application success patterns, commission optimization, and growth opportunities.
             """
             
-            response = self.llm.invoke(prompt)
+            response = self._invoke_llm(prompt, 'insights')
             insights_text = response.content if hasattr(response, 'content') else str(response)
             
             # Parse LLM response and structure insights
-            insights = self._parse_llm_insights(insights_text, context)
+            with self.trace.stage('parse'):
+                insights = self._parse_llm_insights(insights_text, context)
             
-            return insights if insights else self._fallback_generate_insights(context)
+            if insights:
+                return insights
+            self.trace.record_fallback('insights', 'invalid LLM response')
+            return self._fallback_generate_insights(context)
             
         except Exception as e:
-            print(f"❌ Groq LLM insight generation failed: {e}")
+            self.trace.record_fallback('insights', e)
             return self._fallback_generate_insights(context)
     
-    def _generate_llm_recommendations(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _generate_llm_recommendations(self, context: AgentContext, context_text: str = None) -> List[Dict[str, Any]]:
         """
         Generate AI-powered recommendations using Groq LLM or fallback logic
         """
-        if self.groq_available and self.llm:
-            return self._groq_generate_recommendations(context)
+        if self.llm_available and self.llm:
+            return self._groq_generate_recommendations(context, context_text)
         else:
             return self._fallback_generate_recommendations(context)
     
-    def _groq_generate_recommendations(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _groq_generate_recommendations(self, context: AgentContext, context_text: str = None) -> List[Dict[str, Any]]:
         """
         Use Groq LLM to generate actionable recommendations
         """
         try:
-            context_text = self._prepare_context_for_llm(context)
+            context_text = context_text or self._prepare_context_for_llm(context)
             
             prompt = f"""
             As an insurance business consultant, provide 2-3 specific, actionable recommendations for this insurance agent.
@@ -177,51 +669,149 @@ class InsuranceAgentAI:
             Focus on: improving conversion rates, increasing revenue, operational efficiency, and client satisfaction.
             """
             
-            response = self.llm.invoke(prompt)
+            response = self._invoke_llm(prompt, 'recommendations')
             recommendations_text = response.content if hasattr(response, 'content') else str(response)
             
-            recommendations = self._parse_llm_recommendations(recommendations_text, context)
+            with self.trace.stage('parse'):
+                recommendations = self._parse_llm_recommendations(recommendations_text, context)
             
-            return recommendations if recommendations else self._fallback_generate_recommendations(context)
+            if recommendations:
+                return recommendations
+            self.trace.record_fallback('recommendations', 'invalid LLM response')
+            return self._fallback_generate_recommendations(context)
             
         except Exception as e:
-            print(f"❌ Groq LLM recommendation generation failed: {e}")
+            self.trace.record_fallback('recommendations', e)
             return self._fallback_generate_recommendations(context)
     
-    def _generate_executive_summary(self, context: Dict[str, Any]) -> str:
+    def _generate_executive_summary(self, context: AgentContext, context_text: str = None) -> str:
         """
         Generate executive summary using Groq LLM
         """
-        if self.groq_available and self.llm:
+        if self.llm_available and self.llm:
             try:
-                context_text = self._prepare_context_for_llm(context)
-                
-                prompt = f"""
-                Create a concise executive summary (2-3 sentences) for this insurance agent's current business performance.
-                
-                Agent Context:
-                {context_text}
+                context_text = context_text or self._prepare_context_for_llm(context)
                 
-                Summarize: overall performance, key strengths, and primary opportunity for improvement.
-                """
+                prompt = self._executive_summary_prompt(context_text)
                 
-                response = self.llm.invoke(prompt)
+                response = self._invoke_llm(prompt, 'executive_summary')
                 summary = response.content if hasattr(response, 'content') else str(response)
                 
                 return summary.strip()
                 
             except Exception as e:
-                print(f"❌ Groq LLM summary generation failed: {e}")
+                self.trace.record_fallback('executive_summary', e)
+        
+        return self._fallback_generate_executive_summary(context)
+    
+    def _groq_stream_executive_summary(self, context_text: str, emit) -> str:
+        """
+        Stream the executive summary from Groq LLM, passing each token chunk to emit
+        """
+        prompt = self._executive_summary_prompt(context_text)
+        cache_key = self._response_cache_key(prompt)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.trace.record_llm_call('executive_summary_stream', prompt, cached.content, cached.usage, cached=True)
+                emit(cached.content)
+                return cached.content.strip()
+        
+        self._check_llm_allowed()
+        
+        chunks = []
+        started = time.monotonic()
+        try:
+            with self.trace.stage('llm_executive_summary_stream'):
+                for chunk in self.llm.stream(prompt):
+                    text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                    if text:
+                        chunks.append(text)
+                        emit(text)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        
+        summary = ''.join(chunks)
+        self.trace.record_llm_call('executive_summary_stream', prompt, summary, {})
+        if cache_key and summary.strip():
+            self.response_cache.set(cache_key, LLMResponse(summary))
+        return summary.strip()
+    
+    def _invoke_llm(self, prompt: str, name: str = 'llm'):
+        """
+        Call the LLM through the shared circuit breaker, within this request's deadline budget
+        Identical prompts are answered from the persistent response cache without a network call;
+        the call is traced as stage llm_<name>
+        """
+        cache_key = self._response_cache_key(prompt)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.trace.record_llm_call(name, prompt, cached.content, cached.usage, cached=True)
+                return cached
         
-        # Fallback summary
-        agent = context['agent']
-        return f"Agent {agent.agent_id} is managing {context['total_clients']} clients with {context['total_applications']} applications and ${context['total_commissions']:,.2f} in total commissions. Focus areas include client conversion and application processing efficiency."
+        self._check_llm_allowed()
+        
+        started = time.monotonic()
+        try:
+            with self.trace.stage(f'llm_{name}'):
+                response = self.llm.invoke(prompt)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        
+        response_text = response.content if hasattr(response, 'content') else str(response)
+        usage = getattr(response, 'usage', None) or {}
+        self.trace.record_llm_call(name, prompt, response_text, usage)
+        if cache_key and response_text.strip():
+            self.response_cache.set(cache_key, LLMResponse(response_text, usage))
+        
+        return response
+    
+    def _response_cache_key(self, prompt: str):
+        if self.response_cache is None:
+            return None
+        return self.response_cache.make_key(
+            getattr(self.llm, 'name', type(self.llm).__name__),
+            getattr(self.llm, 'model_name', ''),
+            getattr(self.llm, 'temperature', None),
+            prompt
+        )
+    
+    def _check_llm_allowed(self) -> None:
+        """
+        Raise LLMUnavailableError when the deadline budget is spent or the circuit is open
+        """
+        if self.deadline.expired:
+            raise LLMUnavailableError('Deadline budget spent')
+        if not self.breaker.allow():
+            raise LLMUnavailableError('Circuit breaker open')
+    
+    def _executive_summary_prompt(self, context_text: str) -> str:
+        return f"""
+                Create a concise executive summary (2-3 sentences) for this insurance agent's current business performance.
+                
+                Agent Context:
+                {context_text}
+                
+                Summarize: overall performance, key strengths, and primary opportunity for improvement.
+                """
+    
+    def _fallback_generate_executive_summary(self, context: AgentContext) -> str:
+        """
+        Generate executive summary using traditional logic when LLM is not available
+        """
+        agent = context.agent
+        return f"Agent {agent.agent_id} is managing {context.total_clients} clients with {context.total_applications} applications and ${context.total_commissions:,.2f} in total commissions. Focus areas include client conversion and application processing efficiency."
     
-    def _prepare_context_for_llm(self, context: Dict[str, Any]) -> str:
+    def _prepare_context_for_llm(self, context: AgentContext) -> str:
         """
         Prepare structured context data for LLM processing
         """
-        agent = context['agent']
+        agent = context.agent
         
         context_text = f"""
         Agent: {agent.user.get_full_name()} (ID: {agent.agent_id})
@@ -229,28 +819,28 @@ class InsuranceAgentAI:
         Specialties: {', '.join(agent.specialties) if agent.specialties else 'General Insurance'}
         
         Client Portfolio:
-        - Total Clients: {context['total_clients']}
-        - Active Clients: {context['active_clients']}
-        - Prospect Clients: {context['prospect_clients']}
-        - Conversion Rate: {(context['active_clients'] / max(context['total_clients'], 1)) * 100:.1f}%
+        - Total Clients: {context.total_clients}
+        - Active Clients: {context.active_clients}
+        - Prospect Clients: {context.prospect_clients}
+        - Conversion Rate: {(context.active_clients / max(context.total_clients, 1)) * 100:.1f}%
         
         Applications:
-        - Total Applications: {context['total_applications']}
-        - Pending Applications: {context['pending_applications']}
-        - Approved Applications: {context['approved_applications']}
-        - Success Rate: {(context['approved_applications'] / max(context['total_applications'], 1)) * 100:.1f}%
+        - Total Applications: {context.total_applications}
+        - Pending Applications: {context.pending_applications}
+        - Approved Applications: {context.approved_applications}
+        - Success Rate: {(context.approved_applications / max(context.total_applications, 1)) * 100:.1f}%
         
         Financial Performance:
-        - Total Commissions: ${context['total_commissions']:,.2f}
-        - Recent Applications (30 days): {context['recent_applications'].count()}
+        - Total Commissions: ${context.total_commissions:,.2f}
+        - Recent Applications (30 days): {context.recent_applications}
         
-        Available Plans: {context['available_plans'].count()} plans
-        Top Premium Plan: {context['top_plans'][0].plan_name if context['top_plans'] else 'None'} (${context['top_plans'][0].monthly_premium if context['top_plans'] else 0}/month)
+        Available Plans: {context.available_plans} plans
+        Top Premium Plan: {context.top_plan.plan_name if context.top_plan else 'None'} (${context.top_plan.monthly_premium if context.top_plan else 0}/month)
         """
         
         return context_text.strip()
     
-    def _parse_llm_insights(self, insights_text: str, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _parse_llm_insights(self, insights_text: str, context: AgentContext) -> List[Dict[str, Any]]:
         """
         Parse LLM response and create structured insights
         """
@@ -261,36 +851,36 @@ class InsuranceAgentAI:
         lines = insights_text.split('\n')
         
         # Extract key points and create insights
-        if context['total_clients'] > 0:
-            conversion_rate = (context['active_clients'] / context['total_clients']) * 100
+        if context.total_clients > 0:
+            conversion_rate = (context.active_clients / context.total_clients) * 100
             insights.append({
                 'type': 'client_portfolio',
                 'title': 'Client Portfolio Analysis',
-                'insight': f"Portfolio shows {conversion_rate:.1f}% conversion rate with {context['total_clients']} total clients under management.",
-                'metric': f"{context['active_clients']} active / {context['prospect_clients']} prospects",
+                'insight': f"Portfolio shows {conversion_rate:.1f}% conversion rate with {context.total_clients} total clients under management.",
+                'metric': f"{context.active_clients} active / {context.prospect_clients} prospects",
                 'recommendation': "Focus on prospect nurturing" if conversion_rate < 70 else "Excellent conversion - expand pipeline"
             })
         
-        if context['total_applications'] > 0:
-            success_rate = (context['approved_applications'] / context['total_applications']) * 100
+        if context.total_applications > 0:
+            success_rate = (context.approved_applications / context.total_applications) * 100
             insights.append({
                 'type': 'application_performance',
                 'title': 'Application Success Analytics',
                 'insight': f"Application pipeline shows {success_rate:.1f}% approval rate with strong processing efficiency.",
-                'metric': f"{context['approved_applications']} approved / {context['pending_applications']} pending",
-                'recommendation': "Review pending applications for follow-up" if context['pending_applications'] > 5 else "Maintain current processing pace"
+                'metric': f"{context.approved_applications} approved / {context.pending_applications} pending",
+                'recommendation': "Review pending applications for follow-up" if context.pending_applications > 5 else "Maintain current processing pace"
             })
         
         return insights
     
-    def _parse_llm_recommendations(self, recommendations_text: str, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _parse_llm_recommendations(self, recommendations_text: str, context: AgentContext) -> List[Dict[str, Any]]:
         """
         Parse LLM response and create structured recommendations
         """
         recommendations = []
         
         # Create intelligent recommendations based on context analysis
-        if context['prospect_clients'] > context['active_clients']:
+        if context.prospect_clients > context.active_clients:
             recommendations.append({
                 'type': 'client_conversion',
                 'priority': 'high',
@@ -299,7 +889,7 @@ class InsuranceAgentAI:
                 'expected_impact': 'Increase conversion rate by 15-25% and boost revenue'
             })
         
-        if context['pending_applications'] > 3:
+        if context.pending_applications > 3:
             recommendations.append({
                 'type': 'application_management',
                 'priority': 'medium',
@@ -309,103 +899,74 @@ class InsuranceAgentAI:
             })
         
         # High-value plan opportunity
-        if context['top_plans'] and context['top_plans'][0].monthly_premium > 500:
+        if context.top_plan and context.top_plan.monthly_premium > 500:
             recommendations.append({
                 'type': 'revenue_optimization',
                 'priority': 'medium',
                 'action': 'Target Premium Plan Sales',
-                'description': f'Focus on {context["top_plans"][0].plan_name} for high-value clients seeking comprehensive coverage.',
+                'description': f'Focus on {context.top_plan.plan_name} for high-value clients seeking comprehensive coverage.',
                 'expected_impact': 'Increase average commission per sale and client lifetime value'
             })
         
         return recommendations
     
-    def _gather_agent_context(self, agent: InsuranceAgent) -> Dict[str, Any]:
+    def _gather_agent_context(self, agent: InsuranceAgent) -> AgentContext:
         """
         Gather comprehensive context about the agent's business
         Similar to document retrieval in RAG pipeline
+        All metrics come from a single aggregate query; the result never hits the database again
         """
-        # Recent time frames for analysis
-        last_30_days = datetime.now().date() - timedelta(days=30)
-        last_7_days = datetime.now().date() - timedelta(days=7)
-        
-        # Get related data
-        clients = Client.objects.filter(agent=agent)
-        applications = PolicyApplication.objects.filter(agent=agent)
-        recent_applications = applications.filter(submitted_at__gte=last_30_days)
-        commissions = AgentCommission.objects.filter(agent=agent)
-        
-        # Available insurance plans
-        plans = InsurancePlan.objects.filter(is_active=True)
-        
-        context = {
-            'agent': agent,
-            'total_clients': clients.count(),
-            'active_clients': clients.filter(status='ACTIVE').count(),
-            'prospect_clients': clients.filter(status='PROSPECT').count(),
-            'total_applications': applications.count(),
-            'recent_applications': recent_applications,
-            'pending_applications': applications.filter(status='PENDING').count(),
-            'approved_applications': applications.filter(status='APPROVED').count(),
-            'total_commissions': commissions.aggregate(models.Sum('amount'))['amount__sum'] or 0,
-            'recent_commissions': commissions.filter(created_at__gte=last_30_days),
-            'available_plans': plans,
-            'top_plans': plans.order_by('-monthly_premium')[:5],
-            'last_30_days': last_30_days,
-            'last_7_days': last_7_days
-        }
-        
-        return context
+        return build_agent_context(agent)
     
     
-    def _fallback_generate_insights(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _fallback_generate_insights(self, context: AgentContext) -> List[Dict[str, Any]]:
         """
         Generate insights using traditional logic when LLM is not available
         """
         insights = []
         
         # Client Portfolio Analysis
-        if context['total_clients'] > 0:
-            conversion_rate = (context['active_clients'] / context['total_clients']) * 100
+        if context.total_clients > 0:
+            conversion_rate = (context.active_clients / context.total_clients) * 100
             insights.append({
                 'type': 'client_portfolio',
                 'title': 'Client Portfolio Analysis',
-                'insight': f"You have {context['total_clients']} total clients with a {conversion_rate:.1f}% conversion rate from prospects to active clients.",
-                'metric': f"{context['active_clients']} active, {context['prospect_clients']} prospects",
+                'insight': f"You have {context.total_clients} total clients with a {conversion_rate:.1f}% conversion rate from prospects to active clients.",
+                'metric': f"{context.active_clients} active, {context.prospect_clients} prospects",
                 'recommendation': "Focus on nurturing prospects to improve conversion rate." if conversion_rate < 70 else "Excellent conversion rate! Consider expanding your prospect pipeline."
             })
         
         # Application Performance
-        if context['total_applications'] > 0:
-            approval_rate = (context['approved_applications'] / context['total_applications']) * 100
+        if context.total_applications > 0:
+            approval_rate = (context.approved_applications / context.total_applications) * 100
             insights.append({
                 'type': 'application_performance',
                 'title': 'Application Success Rate',
-                'insight': f"Your application approval rate is {approval_rate:.1f}% with {context['pending_applications']} applications pending review.",
-                'metric': f"{context['approved_applications']} approved / {context['total_applications']} total",
-                'recommendation': "Review pending applications for follow-up opportunities." if context['pending_applications'] > 5 else "Great job maintaining low pending applications!"
+                'insight': f"Your application approval rate is {approval_rate:.1f}% with {context.pending_applications} applications pending review.",
+                'metric': f"{context.approved_applications} approved / {context.total_applications} total",
+                'recommendation': "Review pending applications for follow-up opportunities." if context.pending_applications > 5 else "Great job maintaining low pending applications!"
             })
         
         # Commission Performance
-        if context['total_commissions'] > 0:
+        if context.total_commissions > 0:
             insights.append({
                 'type': 'commission_performance',
                 'title': 'Commission Performance',
-                'insight': f"Total commissions earned: ${context['total_commissions']:,.2f}",
-                'metric': f"${context['total_commissions']:,.2f} lifetime earnings",
+                'insight': f"Total commissions earned: ${context.total_commissions:,.2f}",
+                'metric': f"${context.total_commissions:,.2f} lifetime earnings",
                 'recommendation': "Focus on high-value plans to maximize commission potential."
             })
         
         return insights
     
-    def _fallback_generate_recommendations(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _fallback_generate_recommendations(self, context: AgentContext) -> List[Dict[str, Any]]:
         """
         Generate recommendations using traditional logic when LLM is not available
         """
         recommendations = []
         
         # Client management recommendations
-        if context['prospect_clients'] > context['active_clients']:
+        if context.prospect_clients > context.active_clients:
             recommendations.append({
                 'type': 'client_management',
                 'priority': 'high',
@@ -415,17 +976,17 @@ class InsuranceAgentAI:
             })
         
         # Application follow-up
-        if context['pending_applications'] > 3:
+        if context.pending_applications > 3:
             recommendations.append({
                 'type': 'application_followup',
                 'priority': 'medium',
                 'action': 'Review Pending Applications',
-                'description': f'You have {context["pending_applications"]} pending applications that may need follow-up.',
+                'description': f'You have {context.pending_applications} pending applications that may need follow-up.',
                 'expected_impact': 'Faster application processing and client satisfaction'
             })
         
         # Plan diversification
-        agent_specialties = context['agent'].specialties
+        agent_specialties = context.agent.specialties
         if len(agent_specialties) < 3:
             recommendations.append({
                 'type': 'skill_development',
@@ -437,14 +998,13 @@ class InsuranceAgentAI:
         
         return recommendations
     
-    def _calculate_performance_metrics(self, agent: InsuranceAgent, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _calculate_performance_metrics(self, agent: InsuranceAgent, context: AgentContext) -> Dict[str, Any]:
         """
         Calculate performance metrics for the agent
         """
         # Recent activity (last 30 days)
-        recent_apps = context['recent_applications'].count()
-        recent_commissions = context['recent_commissions']
-        recent_commission_total = sum(c.amount for c in recent_commissions)
+        recent_apps = context.recent_applications
+        recent_commission_total = context.recent_commissions
         
         metrics = {
             'recent_activity': {
@@ -453,30 +1013,30 @@ class InsuranceAgentAI:
                 'average_app_value': f"${(recent_commission_total / recent_apps):,.2f}" if recent_apps > 0 else "$0.00"
             },
             'overall_performance': {
-                'total_clients': context['total_clients'],
-                'total_applications': context['total_applications'],
-                'total_commissions': f"${context['total_commissions']:,.2f}",
+                'total_clients': context.total_clients,
+                'total_applications': context.total_applications,
+                'total_commissions': f"${context.total_commissions:,.2f}",
                 'certification_level': agent.certification_level
             },
             'efficiency_scores': {
-                'client_conversion_rate': f"{(context['active_clients'] / max(context['total_clients'], 1)) * 100:.1f}%",
-                'application_success_rate': f"{(context['approved_applications'] / max(context['total_applications'], 1)) * 100:.1f}%"
+                'client_conversion_rate': f"{(context.active_clients / max(context.total_clients, 1)) * 100:.1f}%",
+                'application_success_rate': f"{(context.approved_applications / max(context.total_applications, 1)) * 100:.1f}%"
             }
         }
         
         return metrics
     
-    def _create_context_summary(self, context: Dict[str, Any]) -> str:
+    def _create_context_summary(self, context: AgentContext) -> str:
         """
         Create a human-readable context summary
         Similar to the summary generation in the advanced RAG pipeline
         """
-        agent = context['agent']
+        agent = context.agent
         summary = f"""
         Agent {agent.agent_id} ({agent.user.get_full_name()}) is a {agent.certification_level.lower()} certified insurance agent 
         specializing in {', '.join(agent.specialties) if agent.specialties else 'general insurance'}. 
-        Currently managing {context['total_clients']} clients with {context['pending_applications']} pending applications.
-        Recent performance shows ${context['total_commissions']:,.2f} in total commissions earned.
+        Currently managing {context.total_clients} clients with {context.pending_applications} pending applications.
+        Recent performance shows ${context.total_commissions:,.2f} in total commissions earned.
         """
         return summary.strip()
 
@@ -491,11 +1051,103 @@ def agent_ai_dashboard(request, agent_id):
     ai_assistant = InsuranceAgentAI()
     summary = ai_assistant.generate_agent_dashboard_summary(agent_id)
     
-    return Response({
+    response = Response({
         'status': 'success',
         'data': summary,
         'timestamp': datetime.now().isoformat()
     })
+    response['Server-Timing'] = ai_assistant.trace.server_timing()
+    return response
+
+
+async def agent_ai_dashboard_async(request, agent_id):
+    """
+    Get AI-generated dashboard summary for an insurance agent (ASGI deployments)
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    
+    ai_assistant = InsuranceAgentAI()
+    summary = await ai_assistant.agenerate_agent_dashboard_summary(agent_id)
+    
+    response = JsonResponse({
+        'status': 'success',
+        'data': summary,
+        'timestamp': datetime.now().isoformat()
+    }, encoder=DjangoJSONEncoder)
+    response['Server-Timing'] = ai_assistant.trace.server_timing()
+    return response
+
+
+@require_GET
+def agent_ai_dashboard_stream(request, agent_id):
+    """
+    Stream the AI-generated dashboard summary for an agent as Server-Sent Events
+    """
+    ai_assistant = InsuranceAgentAI()
+    events = ai_assistant.stream_agent_dashboard_summary(agent_id)
+    
+    response = StreamingHttpResponse(
+        (_format_sse(event, data) for event, data in events),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+@csrf_exempt
+@require_POST
+def agent_ai_dashboard_batch(request):
+    """
+    Stream AI-generated dashboard summaries for several agents as NDJSON, one line per agent as it completes
+    Body: {"agent_ids": [...]} or {"agency_name": "..."}
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be JSON'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+    
+    agent_ids = payload.get('agent_ids')
+    agency_name = payload.get('agency_name')
+    
+    agents = InsuranceAgent.objects.select_related('user').order_by('agent_id')
+    if agent_ids:
+        if not isinstance(agent_ids, list) or not all(isinstance(agent_id, str) for agent_id in agent_ids):
+            return JsonResponse({'error': 'agent_ids must be a list of agent IDs'}, status=400)
+        agents = agents.filter(agent_id__in=agent_ids)
+    elif agency_name:
+        agents = agents.filter(agency_name=agency_name, is_active=True)
+    else:
+        return JsonResponse({'error': 'Provide agent_ids or agency_name'}, status=400)
+    
+    agents = list(agents[:settings.AI_BATCH_MAX_AGENTS + 1])
+    if len(agents) > settings.AI_BATCH_MAX_AGENTS:
+        return JsonResponse({'error': f'At most {settings.AI_BATCH_MAX_AGENTS} agents per batch'}, status=400)
+    
+    found = {agent.agent_id for agent in agents}
+    missing = [agent_id for agent_id in agent_ids or [] if agent_id not in found]
+    
+    def lines():
+        for agent_id in dict.fromkeys(missing):
+            yield _format_ndjson({'agent_id': agent_id, 'status': 'error', 'error': f'Agent {agent_id} not found'})
+        for result in InsuranceAgentAI().generate_batch_summaries(agents):
+            yield _format_ndjson(result)
+    
+    response = StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _format_ndjson(data: Any) -> str:
+    return json.dumps(data, cls=DjangoJSONEncoder) + "\n"
 
 
 @api_view(['GET'])
@@ -507,9 +1159,41 @@ def agent_recommendations(request, agent_id):
     ai_assistant = InsuranceAgentAI()
     summary = ai_assistant.generate_agent_dashboard_summary(agent_id)
     
-    return Response({
+    response = Response({
         'status': 'success',
         'recommendations': summary.get('recommendations', []),
         'insights': summary.get('insights', []),
         'timestamp': datetime.now().isoformat()
-    })
\ No newline at end of file
+    })
+    response['Server-Timing'] = ai_assistant.trace.server_timing()
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def ai_stats(request):
+    """
+    Get AI summary cache counters and LLM circuit breaker state
+    """
+    response_cache = get_llm_response_cache()
+    return Response({
+        'status': 'success',
+        'summary_cache': summary_cache.stats(),
+        'circuit_breaker': llm_breaker.stats(),
+        'single_flight': summary_flight.stats(),
+        'llm_response_cache': response_cache.stats() if response_cache else None,
+        'timestamp': datetime.now().isoformat()
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def ai_pipeline_metrics(request):
+    """
+    Get per-stage AI pipeline histograms (durations, query counts, prompt/response sizes, tokens) and fallback counters
+    """
+    return Response({
+        'status': 'success',
+        'metrics': ai_metrics.snapshot(),
+        'timestamp': datetime.now().isoformat()
+    })
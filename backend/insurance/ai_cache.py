@@ -0,0 +1,377 @@
+"""
+Caching for the Insurance Agent AI Assistant
+Process-wide LRU+TTL cache of generated dashboard summaries, keyed by a cheap
+fingerprint of each agent's book of business, single-flight coalescing of
+concurrent generations, and a persistent on-disk cache of LLM responses shared
+by every worker process on the host
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+
+from .llm import LLMResponse
+from .models import InsuranceAgent, InsurancePlan, Client, PolicyApplication, AgentCommission
+
+
+logger = logging.getLogger('insurance.ai')
+
+
+class SummaryCache:
+    """
+    Thread-safe LRU cache with per-entry TTL
+    Each entry remembers the fingerprint it was generated for, so a changed
+    book of business invalidates the entry on the next lookup
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 900, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+        }
+
+    def get(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key if it is fresh and matches fingerprint"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+
+            cached_fingerprint, expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return None
+            if cached_fingerprint != fingerprint:
+                del self._entries[key]
+                self._counters['invalidations'] += 1
+                self._counters['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+
+    def set(self, key: str, fingerprint: str, value: Dict[str, Any]) -> None:
+        """Store value for key, evicting least recently used entries past max_entries"""
+        with self._lock:
+            self._entries[key] = (fingerprint, self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop a single entry, or every entry when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hit_rate': round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key within a process
+    The first caller runs the work; callers arriving while it is in flight wait for
+    and share its result, whether they are WSGI threads or ASGI coroutines
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            'leaders': 0,
+            'coalesced': 0,
+        }
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for key from a thread, or block until the in-flight call for key finishes"""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        return self._run(key, future, fn)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run the synchronous fn for key on a worker thread, or await the in-flight call for key"""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        return await sync_to_async(self._run, thread_sensitive=False)(key, future, fn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, 'in_flight': len(self._calls)}
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._counters['coalesced'] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self._counters['leaders'] += 1
+            return future, True
+
+    def _run(self, key, future, fn):
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed cache of LLM responses that survives restarts and deploys
+    Keyed by a hash of backend, model, temperature and rendered prompt. WAL mode lets worker
+    processes read while one writes; entries expire after ttl and the least recently used
+    rows are evicted past max_entries. Storage errors are logged and treated as misses. The
+    directory holding path is created on first use
+    """
+
+    # Evict at most once per this many writes to keep set() cheap
+    EVICT_EVERY = 50
+
+    def __init__(self, path: str, ttl: float = 86400, max_entries: int = 5000,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'errors': 0,
+        }
+
+    @staticmethod
+    def make_key(backend: str, model_name: str, temperature: float, prompt: str) -> str:
+        material = json.dumps([backend, model_name, temperature, prompt])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        """Return the stored response for key unless it has expired"""
+        now = self.clock()
+        try:
+            db = self._connection()
+            row = db.execute(
+                'SELECT content, usage FROM llm_responses WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+            if row is not None:
+                db.execute('UPDATE llm_responses SET accessed_at = ? WHERE key = ?', (now, key))
+        except sqlite3.Error as e:
+            self._record_error(e)
+            return None
+
+        self._count('hits' if row is not None else 'misses')
+        if row is None:
+            return None
+        return LLMResponse(row[0], json.loads(row[1]))
+
+    def set(self, key: str, response: LLMResponse) -> None:
+        now = self.clock()
+        try:
+            db = self._connection()
+            db.execute(
+                'INSERT OR REPLACE INTO llm_responses (key, content, usage, created_at, accessed_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, response.content, json.dumps(response.usage), now, now, now + self.ttl)
+            )
+            with self._lock:
+                self._counters['writes'] += 1
+                self._writes += 1
+                evict = (self._writes - 1) % self.EVICT_EVERY == 0
+            if evict:
+                self._evict(db, now)
+        except sqlite3.Error as e:
+            self._record_error(e)
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute('DELETE FROM llm_responses')
+        except sqlite3.Error as e:
+            self._record_error(e)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            size = self._connection().execute('SELECT COUNT(*) FROM llm_responses').fetchone()[0]
+        except sqlite3.Error as e:
+            self._record_error(e)
+            size = None
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'size': size,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hit_rate': round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+                'path': self.path,
+            }
+
+    def _evict(self, db, now):
+        expired = db.execute('DELETE FROM llm_responses WHERE expires_at <= ?', (now,)).rowcount
+        overflow = db.execute(
+            'DELETE FROM llm_responses WHERE key IN ('
+            'SELECT key FROM llm_responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        ).rowcount
+        self._count('evictions', expired + overflow)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must stay on the thread that opened them
+        db = getattr(self._local, 'connection', None)
+        if db is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            except OSError as e:
+                raise sqlite3.OperationalError(f'cannot create cache directory: {e}') from e
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS llm_responses ('
+                'key TEXT PRIMARY KEY, content TEXT NOT NULL, usage TEXT NOT NULL, '
+                'created_at REAL NOT NULL, accessed_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS llm_responses_accessed_at ON llm_responses (accessed_at)')
+            self._local.connection = db
+        return db
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _record_error(self, error):
+        self._count('errors')
+        logger.warning('LLM response cache unavailable: %s', error)
+
+
+_llm_response_cache = None
+_llm_response_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """
+    Return the process-wide LLM response cache, or None when AI_LLM_RESPONSE_CACHE_PATH is empty
+    The database file is only opened on first use
+    """
+    global _llm_response_cache
+    if not settings.AI_LLM_RESPONSE_CACHE_PATH:
+        return None
+    with _llm_response_cache_lock:
+        if _llm_response_cache is None:
+            _llm_response_cache = LLMResponseCache(
+                path=settings.AI_LLM_RESPONSE_CACHE_PATH,
+                ttl=settings.AI_LLM_RESPONSE_CACHE_TTL,
+                max_entries=settings.AI_LLM_RESPONSE_CACHE_SIZE,
+            )
+        return _llm_response_cache
+
+
+summary_cache = SummaryCache(
+    max_entries=settings.AI_SUMMARY_CACHE_SIZE,
+    ttl=settings.AI_SUMMARY_CACHE_TTL,
+)
+
+summary_flight = SingleFlight()
+
+
+def compute_fingerprints(agents: Iterable[InsuranceAgent]) -> Dict[int, str]:
+    """
+    Fingerprint the book of business for each agent
+    Uses one grouped aggregate per table regardless of how many agents are passed
+    """
+    agents = list(agents)
+    agent_pks = [agent.pk for agent in agents]
+
+    clients = {
+        row['agent_id']: row for row in
+        Client.objects.filter(agent_id__in=agent_pks).order_by().values('agent_id')
+        .annotate(count=Count('id'), latest=Max('updated_at'))
+    }
+    applications = {
+        row['agent_id']: row for row in
+        PolicyApplication.objects.filter(agent_id__in=agent_pks).order_by().values('agent_id')
+        .annotate(count=Count('id'), latest=Max('updated_at'))
+    }
+    commissions = {
+        row['agent_id']: row for row in
+        AgentCommission.objects.filter(agent_id__in=agent_pks).order_by().values('agent_id')
+        .annotate(count=Count('id'), latest=Max('updated_at'), total=Sum('amount'))
+    }
+    plans = InsurancePlan.objects.filter(is_active=True).aggregate(count=Count('id'), latest=Max('updated_at'))
+
+    # Context windows are relative to today, so the day is part of the fingerprint
+    today = datetime.now().date().isoformat()
+    empty = {}
+
+    fingerprints = {}
+    for agent in agents:
+        parts = [
+            today,
+            agent.updated_at.isoformat(),
+            _fingerprint_part(clients.get(agent.pk, empty)),
+            _fingerprint_part(applications.get(agent.pk, empty)),
+            _fingerprint_part(commissions.get(agent.pk, empty)),
+            _fingerprint_part(plans),
+        ]
+        fingerprints[agent.pk] = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+    return fingerprints
+
+
+def agent_fingerprint(agent: InsuranceAgent) -> str:
+    """Fingerprint the book of business for a single agent"""
+    return compute_fingerprints([agent])[agent.pk]
+
+
+def _fingerprint_part(row: Dict[str, Any]) -> str:
+    return ':'.join(str(row.get(name)) for name in ('count', 'latest', 'total'))
@@ -0,0 +1,107 @@
+"""
+Agent context builder for the Insurance Agent AI Assistant
+Collects every scalar metric the AI pipeline needs in a single query (AgentStats rollups plus
+date-windowed aggregates) and returns fully evaluated, immutable context objects
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, List, Optional
+
+from django.db.models import Count, IntegerField, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .aggregates import agent_count, agent_sum
+from .models import InsuranceAgent, InsurancePlan, PolicyApplication, AgentCommission
+from .rollups import get_agent_stats
+
+
+@dataclass(frozen=True)
+class PlanSummary:
+    """Lightweight snapshot of an insurance plan referenced by the AI context"""
+    plan_name: str
+    monthly_premium: Decimal
+
+
+@dataclass(frozen=True)
+class AgentContext:
+    """Fully evaluated view of an agent's book of business; never touches the database"""
+    agent: InsuranceAgent
+    total_clients: int
+    active_clients: int
+    prospect_clients: int
+    total_applications: int
+    pending_applications: int
+    approved_applications: int
+    recent_applications: int
+    total_commissions: Decimal
+    recent_commissions: Decimal
+    available_plans: int
+    top_plan: Optional[PlanSummary]
+    last_30_days: date
+    last_7_days: date
+
+
+def build_agent_contexts(agents: Iterable[InsuranceAgent]) -> List[AgentContext]:
+    """
+    Build AI contexts for the given agents (with their users loaded) in one query
+    Agents missing from the database are skipped
+    """
+    agents = list(agents)
+    last_30_days = datetime.now().date() - timedelta(days=30)
+    last_7_days = datetime.now().date() - timedelta(days=7)
+
+    active_plans = InsurancePlan.objects.filter(is_active=True).order_by()
+    top_plans = active_plans.order_by('-monthly_premium', 'id')
+
+    # Status counts come from the AgentStats rollup; only the date windows are aggregated here
+    rows = InsuranceAgent.objects.filter(pk__in=[agent.pk for agent in agents]).select_related('stats').annotate(
+        recent_applications=agent_count(PolicyApplication, Q(submitted_at__gte=last_30_days)),
+        recent_commissions=agent_sum(AgentCommission, 'amount', Q(created_at__gte=last_30_days)),
+        available_plans=Coalesce(
+            Subquery(
+                active_plans.values('is_active').annotate(value=Count('id')).values('value')[:1],
+                output_field=IntegerField()
+            ),
+            Value(0)
+        ),
+        top_plan_name=Subquery(top_plans.values('plan_name')[:1]),
+        top_plan_premium=Subquery(top_plans.values('monthly_premium')[:1]),
+    )
+    metrics = {row.pk: row for row in rows}
+
+    contexts = []
+    for agent in agents:
+        row = metrics.get(agent.pk)
+        if row is None:
+            continue
+        stats = get_agent_stats(row)
+        contexts.append(AgentContext(
+            agent=agent,
+            total_clients=stats.total_clients,
+            active_clients=stats.clients_active,
+            prospect_clients=stats.clients_prospect,
+            total_applications=stats.total_applications,
+            # SUBMITTED + UNDER_REVIEW, as on the agent dashboard; the old status='PENDING' filter
+            # matched no application status and always reported 0
+            pending_applications=stats.pending_applications,
+            approved_applications=stats.applications_approved,
+            recent_applications=row.recent_applications,
+            total_commissions=stats.total_commission_amount,
+            recent_commissions=row.recent_commissions,
+            available_plans=row.available_plans,
+            top_plan=PlanSummary(row.top_plan_name, row.top_plan_premium) if row.top_plan_name is not None else None,
+            last_30_days=last_30_days,
+            last_7_days=last_7_days,
+        ))
+
+    return contexts
+
+
+def build_agent_context(agent: InsuranceAgent) -> AgentContext:
+    """Build the AI context for a single agent (with its user loaded) in one query"""
+    contexts = build_agent_contexts([agent])
+    if not contexts:
+        raise InsuranceAgent.DoesNotExist(f'Agent {agent.agent_id} not found')
+    return contexts[0]
@@ -0,0 +1,202 @@
+"""
+Instrumentation for the Insurance Agent AI Assistant
+Per-request pipeline traces (stage durations, query counts, prompt/response sizes, token usage
+and fallbacks) rendered as Server-Timing headers and aggregated into in-process histograms
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Sequence
+
+from django.db import connection
+
+
+logger = logging.getLogger('insurance.ai')
+
+DURATION_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS_CHARS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; percentiles are reported as the upper bound of the bucket they fall in
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if bucket_count and seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f'le_{bound}' for bound in self.buckets] + ['inf']
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'mean': round(self.sum / self.count, 3) if self.count else None,
+            'min': round(self.min, 3) if self.min is not None else None,
+            'max': round(self.max, 3) if self.max is not None else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe process-wide histograms and counters for the AI pipeline
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = DURATION_BUCKETS_MS) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'counters': dict(sorted(self._counters.items())),
+                'histograms': {name: self._histograms[name].snapshot() for name in sorted(self._histograms)},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+ai_metrics = MetricsRegistry()
+
+
+class PipelineTrace:
+    """
+    Timing and size record for one AI request
+    Stages may run on LLM pool threads, so recording is lock-protected; every observation is
+    also fed to the process-wide registry as it happens
+    """
+
+    def __init__(self, registry: MetricsRegistry = ai_metrics):
+        self.registry = registry
+        self.started = time.perf_counter()
+        self.stages = []
+        self.llm_calls = []
+        self.fallbacks = []
+        self.source = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block and count the queries it runs on this thread's connection"""
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_query):
+                yield
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.stages.append({'name': name, 'duration_ms': round(duration_ms, 3), 'queries': len(queries)})
+            self.registry.observe(f'stage.{name}.duration_ms', duration_ms)
+            self.registry.observe(f'stage.{name}.queries', len(queries), QUERY_BUCKETS)
+
+    def record_llm_call(self, name: str, prompt: str, response_text: str, usage: Dict[str, Any],
+                        cached: bool = False) -> None:
+        """Record prompt/response sizes and provider-reported token usage for one LLM call"""
+        call = {
+            'name': name,
+            'cached': cached,
+            'prompt_chars': len(prompt),
+            'response_chars': len(response_text),
+            'input_tokens': usage.get('input_tokens'),
+            'output_tokens': usage.get('output_tokens'),
+            'total_tokens': usage.get('total_tokens'),
+        }
+        with self._lock:
+            self.llm_calls.append(call)
+
+        # Responses served from the persistent cache cost no upstream time or tokens
+        if cached:
+            self.registry.increment(f'llm.{name}.cached')
+            return
+
+        self.registry.increment(f'llm.{name}.calls')
+        self.registry.observe('llm.prompt_chars', call['prompt_chars'], SIZE_BUCKETS_CHARS)
+        self.registry.observe('llm.response_chars', call['response_chars'], SIZE_BUCKETS_CHARS)
+        for field in ('input_tokens', 'output_tokens', 'total_tokens'):
+            if call[field] is not None:
+                self.registry.observe(f'llm.{field}', call[field], TOKEN_BUCKETS)
+
+    def record_fallback(self, section: str, reason: Any) -> None:
+        """Record that a section was produced by rule-based fallback logic instead of the LLM"""
+        with self._lock:
+            self.fallbacks.append({'section': section, 'reason': str(reason)})
+        self.registry.increment(f'fallback.{section}')
+        # Upstream errors are worth a warning; a missing backend or spent budget is routine
+        log = logger.warning if isinstance(reason, Exception) else logger.info
+        log('AI %s fell back to rule-based logic: %s', section, reason)
+
+    def record_source(self, source: str) -> None:
+        """Record where the summary came from: cache, snapshot, coalesced or generated"""
+        self.source = source
+        self.registry.increment(f'summary.{source}')
+
+    def finish(self) -> None:
+        self.registry.observe('request.duration_ms', (time.perf_counter() - self.started) * 1000)
+
+    def server_timing(self) -> str:
+        """Render stage durations as a Server-Timing header value, merging repeated stages"""
+        with self._lock:
+            totals = {}
+            for stage in self.stages:
+                totals[stage['name']] = totals.get(stage['name'], 0) + stage['duration_ms']
+            fallback_sections = sorted({fallback['section'] for fallback in self.fallbacks})
+
+        entries = [f'{name};dur={duration:.1f}' for name, duration in totals.items()]
+        entries.append(f'total;dur={(time.perf_counter() - self.started) * 1000:.1f}')
+        if self.source:
+            entries.append(f'source;desc="{self.source}"')
+        if fallback_sections:
+            entries.append(f'fallback;desc="{" ".join(fallback_sections)}"')
+        return ', '.join(entries)
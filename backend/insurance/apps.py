@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class InsuranceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'insurance'
-    verbose_name = 'Insurance Management'
\ No newline at end of file
+    verbose_name = 'Insurance Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,88 @@
+"""
+Synthetic rows for query-budget checks and serializer benchmarks
+create_benchmark_rows(n) inserts n rows of every API model, each linked to its own related rows,
+so per-row lazy loading shows up as query counts that grow with n
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.contrib.auth.models import User
+
+from .models import (
+    InsuranceAgent, InsuranceCarrier, InsurancePlan, Client,
+    PolicyApplication, AgentCommission, AgentActivity
+)
+from .rollups import rebuild_agent_stats
+
+
+def create_benchmark_rows(count: int, prefix: str = 'bench') -> Dict[str, List]:
+    """Bulk-create count agents, carriers, plans, clients, applications, commissions and activities"""
+    users = User.objects.bulk_create([
+        User(username=f'{prefix}_agent_{index}', first_name=f'Agent{index}', last_name='Benchmark',
+             email=f'{prefix}.agent{index}@navicare.com')
+        for index in range(count)
+    ])
+    agents = InsuranceAgent.objects.bulk_create([
+        InsuranceAgent(
+            user=user, agent_id=f'{prefix.upper()}{index:05d}', license_number=f'LIC{index:07d}',
+            agency_name=f'Benchmark Agency {index % 10}', phone_number=f'+1-555-{index % 10000:04d}',
+            email=user.email, specialties=['Health Insurance', 'Medicare'], certification_level='ADVANCED',
+            active_since=date(2020, 1, 1)
+        )
+        for index, user in enumerate(users)
+    ])
+    carriers = InsuranceCarrier.objects.bulk_create([
+        InsuranceCarrier(name=f'{prefix} Carrier {index}', code=f'{prefix[:3].upper()}{index:05d}', type='HEALTH',
+                         contact_phone='+1-800-555-0100', website=f'https://carrier{index}.example.com')
+        for index in range(count)
+    ])
+    plans = InsurancePlan.objects.bulk_create([
+        InsurancePlan(
+            carrier=carrier, plan_name=f'{carrier.name} PPO Silver', plan_code=f'{carrier.code}_PPO', plan_type='PPO',
+            tier='SILVER', monthly_premium=Decimal('412.50'), annual_deductible=Decimal('2500.00'),
+            max_out_of_pocket=Decimal('7500.00'), pcp_copay=Decimal('25.00'), specialist_copay=Decimal('50.00'),
+            urgent_care_copay=Decimal('75.00'), er_copay=Decimal('350.00'), commission_percentage=Decimal('5.00'),
+            effective_date=date(2026, 1, 1), expiration_date=date(2026, 12, 31)
+        )
+        for carrier in carriers
+    ])
+    clients = Client.objects.bulk_create([
+        Client(
+            agent=agent, first_name=f'Client{index}', last_name='Sample', date_of_birth=date(1980, 1, 1) + timedelta(days=index),
+            email=f'{prefix}.client{index}@email.com', phone_number=f'+1-555-{index % 10000:04d}',
+            address_line1=f'{index} Main St', city='Springfield', state='IL', zip_code='62701', status='ACTIVE',
+            first_contact_date=date(2026, 1, 1), last_contact_date=date(2026, 6, 1)
+        )
+        for index, agent in enumerate(agents)
+    ])
+    applications = PolicyApplication.objects.bulk_create([
+        PolicyApplication(
+            agent=client.agent, client=client, plan=plan, application_number=f'{prefix.upper()}-APP-{index:06d}',
+            application_date=date(2026, 6, 1), requested_effective_date=date(2026, 7, 1), status='APPROVED',
+            monthly_premium=plan.monthly_premium, commission_amount=Decimal('247.50'), notes='Benchmark application'
+        )
+        for index, (client, plan) in enumerate(zip(clients, plans))
+    ])
+    commissions = AgentCommission.objects.bulk_create([
+        AgentCommission(
+            agent=application.agent, application=application, commission_type='INITIAL', amount=Decimal('247.50'),
+            percentage=Decimal('5.00'), pay_period='2026-06', status='PAID'
+        )
+        for application in applications
+    ])
+    activities = AgentActivity.objects.bulk_create([
+        AgentActivity(
+            agent=client.agent, client=client, activity_type='CALL', subject=f'Follow-up call {index}',
+            description='Reviewed coverage options', outcome='Interested', next_action='Send quote'
+        )
+        for index, client in enumerate(clients)
+    ])
+    # bulk_create skips the rollup signals
+    rebuild_agent_stats([agent.pk for agent in agents])
+
+    return {
+        'agents': agents, 'carriers': carriers, 'plans': plans, 'clients': clients,
+        'applications': applications, 'commissions': commissions, 'activities': activities,
+    }
@@ -0,0 +1,212 @@
+"""
+Bulk create and update endpoints
+Items arrive as a JSON array or NDJSON and are validated in one pass with the list endpoint's
+serializer: field checks run per item, while uniqueness and foreign key existence are checked with
+one query per field for the whole batch. A valid batch is written with bulk_create() / bulk_update()
+in a single transaction; any invalid item rejects the batch with a per-item error report
+Bulk writes skip model signals, so AgentStats rollups and cached dashboards are updated here, once per batch
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import generics, serializers, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import empty
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+from .dashboard_cache import invalidate_agent_dashboard
+from .parsers import NDJSONParser
+from .rollups import ROLLUP_MODELS, apply_rollup_changes, rollup_state
+
+
+DOES_NOT_EXIST = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+DUPLICATE_ID = 'This id appears more than once in the request.'
+
+
+class BulkWriteView(generics.GenericAPIView):
+    """
+    POST creates every item; PATCH partially updates the row named by each item's "id"
+    Responds with {"count", "ids"} in item order, or 400 with {"count", "errors": [{"index", "errors"}]}
+    """
+    parser_classes = [JSONParser, NDJSONParser]
+    id_field = serializers.IntegerField()
+
+    def post(self, request, *args, **kwargs):
+        return self.bulk_write(request, partial=False)
+
+    def patch(self, request, *args, **kwargs):
+        return self.bulk_write(request, partial=True)
+
+    def bulk_write(self, request, partial: bool):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Request body must be a non-empty JSON array or NDJSON'}, status=400)
+        if len(items) > settings.BULK_WRITE_MAX_ITEMS:
+            return Response({'error': f'At most {settings.BULK_WRITE_MAX_ITEMS} items per request'}, status=400)
+
+        serializer = self.get_serializer(partial=partial)
+        model = serializer.Meta.model
+        with transaction.atomic():
+            instances, errors = self.lookup_instances(items) if partial else (None, {})
+            validated = validate_items(serializer, items, instances, errors)
+            if errors:
+                return Response({
+                    'count': len(items),
+                    'errors': [{'index': index, 'errors': errors[index]} for index in sorted(errors)],
+                }, status=400)
+
+            rows = update_rows(model, validated, instances) if partial else create_rows(model, validated)
+
+        return Response(
+            {'count': len(rows), 'ids': [row.pk for row in rows]},
+            status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED
+        )
+
+    def lookup_instances(self, items: list) -> Tuple[Dict[int, object], Dict[int, dict]]:
+        """Rows to update by item index, locked for the transaction, plus errors for unknown or repeated ids"""
+        ids, errors = {}, {}
+        seen = set()
+        for index, item in enumerate(items):
+            try:
+                pk = self.id_field.run_validation(item.get('id', empty) if isinstance(item, dict) else empty)
+            except ValidationError as exc:
+                errors[index] = {'id': exc.detail}
+                continue
+            if pk in seen:
+                errors[index] = {'id': [DUPLICATE_ID]}
+            else:
+                seen.add(pk)
+                ids[index] = pk
+
+        rows = self.get_queryset().select_for_update().in_bulk(list(ids.values()))
+        instances = {}
+        for index, pk in ids.items():
+            if pk in rows:
+                instances[index] = rows[pk]
+            else:
+                errors[index] = {'id': [DOES_NOT_EXIST.format(pk_value=pk)]}
+        return instances, errors
+
+
+def validate_items(serializer, items: list, instances: Optional[Dict[int, object]],
+                   errors: Dict[int, dict]) -> Dict[int, dict]:
+    """
+    Validated data by item index for every item that passes; errors collects the rest by index
+    instances maps item indexes to the rows they update (None when creating)
+    """
+    unique_fields = pop_unique_validators(serializer)
+    validated = {}
+    for index, item in enumerate(items):
+        if index in errors:
+            continue
+        serializer.instance = instances[index] if instances is not None else None
+        try:
+            validated[index] = serializer.run_validation(item)
+        except ValidationError as exc:
+            errors[index] = exc.detail
+    serializer.instance = None
+
+    check_unique(serializer.Meta.model, unique_fields, validated, instances, errors)
+    check_related(serializer, validated, errors)
+    return {index: data for index, data in validated.items() if index not in errors}
+
+
+def pop_unique_validators(serializer) -> List[Tuple[str, str, str]]:
+    """Remove per-item UniqueValidators, returning (field name, source, message) to check per batch"""
+    unique_fields = []
+    for name, field in serializer.fields.items():
+        unique = [validator for validator in field.validators if isinstance(validator, UniqueValidator)]
+        if unique:
+            field.validators = [validator for validator in field.validators if validator not in unique]
+            unique_fields.append((name, field.source, str(unique[0].message)))
+    return unique_fields
+
+
+def check_unique(model, unique_fields, validated: Dict[int, dict], instances, errors: Dict[int, dict]) -> None:
+    """One query per unique field for values already stored, plus duplicates within the batch"""
+    for name, source, message in unique_fields:
+        owners = {}
+        for index, data in validated.items():
+            if data.get(source) is None:
+                continue
+            if data[source] in owners:
+                errors.setdefault(index, {})[name] = [message]
+            else:
+                owners[data[source]] = index
+        if not owners:
+            continue
+        for value, pk in model._base_manager.filter(**{f'{source}__in': list(owners)}).values_list(source, 'pk'):
+            index = owners.get(value)
+            # An update may keep its own value
+            if index is not None and (instances is None or instances[index].pk != pk):
+                errors.setdefault(index, {})[name] = [message]
+
+
+def check_related(serializer, validated: Dict[int, dict], errors: Dict[int, dict]) -> None:
+    """One query per foreign key for the ids the batch references, instead of an IntegrityError on write"""
+    names = {field.source: name for name, field in serializer.fields.items()}
+    for model_field in serializer.Meta.model._meta.concrete_fields:
+        if not model_field.many_to_one or model_field.attname not in names:
+            continue
+        owners = defaultdict(list)
+        for index, data in validated.items():
+            if data.get(model_field.attname) is not None:
+                owners[data[model_field.attname]].append(index)
+        if not owners:
+            continue
+        found = set(model_field.related_model._base_manager.filter(pk__in=list(owners)).values_list('pk', flat=True))
+        for pk, indexes in owners.items():
+            if pk not in found:
+                for index in indexes:
+                    errors.setdefault(index, {})[names[model_field.attname]] = [DOES_NOT_EXIST.format(pk_value=pk)]
+
+
+def create_rows(model, validated: Dict[int, dict]) -> list:
+    rows = model.objects.bulk_create([model(**data) for _, data in sorted(validated.items())])
+    after_bulk_write(model, [(None, _rollup_state(model, row)) for row in rows], {row.agent_id for row in rows})
+    return rows
+
+
+def update_rows(model, validated: Dict[int, dict], instances: Dict[int, object]) -> list:
+    rows, changes, fields = [], [], set()
+    agent_ids = set()
+    now = timezone.now()
+    auto_now = [field.name for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+    for index, data in sorted(validated.items()):
+        row = instances[index]
+        previous = _rollup_state(model, row)
+        agent_ids.add(row.agent_id)  # a reassigned row leaves its previous agent's dashboard too
+        for attr, value in data.items():
+            setattr(row, attr, value)
+        for name in auto_now:
+            setattr(row, name, now)
+        changes.append((previous, _rollup_state(model, row)))
+        agent_ids.add(row.agent_id)
+        fields.update(model._meta.get_field(attr).name for attr in data)
+        rows.append(row)
+
+    model.objects.bulk_update(rows, sorted(fields.union(auto_now)))
+    after_bulk_write(model, changes, agent_ids)
+    return rows
+
+
+def _rollup_state(model, row):
+    return rollup_state(model, row) if model in ROLLUP_MODELS else None
+
+
+def after_bulk_write(model, changes: list, agent_ids: set) -> None:
+    """What the post_save signals do per row, once per batch: one rollup UPDATE per agent, then dashboards"""
+    if model in ROLLUP_MODELS:
+        apply_rollup_changes(model, changes)
+
+    def invalidate_dashboards():
+        for agent_id in agent_ids:
+            invalidate_agent_dashboard(agent_id)
+
+    transaction.on_commit(invalidate_dashboards)
@@ -0,0 +1,133 @@
+"""
+Conditional GET support (ETag / Last-Modified) for the insurance API
+Validators come from one aggregate query per request - row count and latest updated_at of the
+filtered queryset and of the related models its serializer nests - so a 304 Not Modified is
+answered without loading or serializing any rows
+"""
+
+import hashlib
+from functools import wraps
+from typing import Iterable, Optional, Tuple
+
+from django.db.models import Count, F, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .aggregates import agent_count, agent_latest
+from .models import InsuranceAgent
+
+Validators = Tuple[Optional[str], Optional[float]]
+
+
+def queryset_validators(request, queryset, related: Iterable[str] = ()) -> Validators:
+    """
+    Compute (etag, last_modified timestamp) for a queryset's representation
+    related lists relation paths whose updated_at also changes the serialized output
+    """
+    # The pk sum catches a row leaving and another entering the set without changing the count
+    aggregates = {'count': Count('pk'), 'pk_sum': Sum('pk'), 'latest': Max('updated_at')}
+    for index, path in enumerate(related):
+        aggregates[f'latest_{index}'] = Max(f'{path}__updated_at')
+    values = queryset.order_by().aggregate(**aggregates)
+
+    timestamps = [value for name, value in values.items() if name.startswith('latest') and value is not None]
+    last_modified = max(timestamps).timestamp() if timestamps else None
+    return make_etag(request, queryset.model._meta.label, *values.values()), last_modified
+
+
+def agent_validators(request, agent_id, models: Iterable = (), latest: Iterable[Tuple] = (),
+                     parts: Iterable = ()) -> Validators:
+    """
+    Validators for a per-agent view from one agent query: the agent's and its stats row's
+    updated_at, plus row count and latest updated_at of the agent's rows in each of models
+    latest adds (model, field) timestamps of related rows, e.g. the plans of the agent's applications;
+    parts are further values the representation depends on
+    Returns (None, None) for unknown agents so the view answers its own 404
+    """
+    annotations = {'stats_updated_at': F('stats__updated_at')}
+    for model in models:
+        name = model._meta.model_name
+        annotations[f'{name}_count'] = agent_count(model)
+        annotations[f'{name}_latest'] = agent_latest(model)
+    for model, field in latest:
+        annotations[f'{model._meta.model_name}_{field}'] = agent_latest(model, field)
+
+    row = InsuranceAgent.objects.filter(pk=agent_id).annotate(**annotations).values('updated_at', *annotations).first()
+    if row is None:
+        return None, None
+
+    timestamps = [value for name, value in row.items() if not name.endswith('_count') and value is not None]
+    return make_etag(request, *row.values(), *parts), max(timestamps).timestamp()
+
+
+def make_etag(request, *parts) -> str:
+    """Weak ETag over validator parts and the full request path (query string included)"""
+    material = '|'.join(str(part) for part in (request.get_full_path(), *parts))
+    return f'W/"{hashlib.sha1(material.encode()).hexdigest()}"'
+
+
+def not_modified_response(request, etag: Optional[str], last_modified: Optional[float]):
+    """Return a 304 response when the request's validators match, else None"""
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified) if last_modified is not None else None
+    )
+
+
+def set_validators(response, etag: Optional[str], last_modified: Optional[float]):
+    if response.status_code != 200:
+        return response
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Browsers must revalidate before reusing, so edits show up on the next navigation
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer GETs on generic list/detail views with ETag / Last-Modified validators
+    Set validator_related to the relation paths nested by the view's serializer
+    """
+    validator_related = ()
+
+    def get_validator_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            return queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        # Keyset pagination limits validation to the rows of the requested page
+        if hasattr(self.paginator, 'window_queryset'):
+            return self.paginator.window_queryset(queryset, self.request)
+        return queryset
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = queryset_validators(request, self.get_validator_queryset(), self.validator_related)
+        response = not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(super().get(request, *args, **kwargs), etag, last_modified)
+
+
+def conditional_get(validator_func):
+    """
+    Decorator for function views: validator_func(request, *args, **kwargs) returns (etag, last_modified)
+    and the view only runs when the client's copy is stale
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            etag, last_modified = validator_func(request, *args, **kwargs)
+            # Lets the view key server-side caches on the same data version
+            request.validators = (etag, last_modified)
+            response = not_modified_response(request, etag, last_modified)
+            if response is not None:
+                return response
+            return set_validators(view_func(request, *args, **kwargs), etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,42 @@
+"""
+Per-agent cache of assembled agent dashboard payloads
+Each entry records the version (the conditional GET ETag) of the data it was built from and is only
+served for that version, so a cache that is not shared between worker processes cannot outlive its
+data; write-through invalidation by the model signals in signals.py frees entries early, and changes
+that can touch every dashboard (plans, carriers) bump a shared generation instead of deleting keys
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+GENERATION_KEY = 'agent_dashboard:generation'
+
+
+def dashboard_cache_key(agent_pk: int) -> str:
+    # Month-to-date statistics roll over at midnight, so the date is part of the key
+    generation = cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+    return f'agent_dashboard:{generation}:{agent_pk}:{timezone.now().date().isoformat()}'
+
+
+def get_cached_dashboard(agent_pk: int, version: str):
+    entry = cache.get(dashboard_cache_key(agent_pk))
+    if entry is None or entry[0] != version:
+        return None
+    return entry[1]
+
+
+def set_cached_dashboard(agent_pk: int, version: str, payload) -> None:
+    cache.set(dashboard_cache_key(agent_pk), (version, payload), timeout=settings.AGENT_DASHBOARD_CACHE_TTL)
+
+
+def invalidate_agent_dashboard(agent_pk: int) -> None:
+    cache.delete(dashboard_cache_key(agent_pk))
+
+
+def invalidate_all_dashboards() -> None:
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, timeout=None)
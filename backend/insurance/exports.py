@@ -0,0 +1,199 @@
+"""
+Streaming CSV / NDJSON exports of commissions, applications and activities
+Exports take the same filter parameters as the matching list views (see filters.py) and stream a
+flat column projection straight from values_list() rows, read through iterator(chunk_size=...) -
+a server-side cursor on PostgreSQL - so memory stays constant however many rows are exported
+"""
+
+import csv
+import io
+import json
+import re
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import models
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .filters import filter_activities, filter_applications, filter_commissions
+from .models import AgentActivity, AgentCommission, PolicyApplication
+from .renderers import orjson
+
+
+# (column header, values_list() lookup); related objects are flattened into their own columns
+COMMISSION_COLUMNS = [
+    ('id', 'id'),
+    ('agent_code', 'agent__agent_id'),
+    ('agent_first_name', 'agent__user__first_name'),
+    ('agent_last_name', 'agent__user__last_name'),
+    ('application_number', 'application__application_number'),
+    ('commission_type', 'commission_type'),
+    ('amount', 'amount'),
+    ('percentage', 'percentage'),
+    ('pay_period', 'pay_period'),
+    ('status', 'status'),
+    ('paid_date', 'paid_date'),
+    ('notes', 'notes'),
+    ('created_at', 'created_at'),
+]
+
+APPLICATION_COLUMNS = [
+    ('id', 'id'),
+    ('application_number', 'application_number'),
+    ('agent_code', 'agent__agent_id'),
+    ('client_id', 'client_id'),
+    ('client_first_name', 'client__first_name'),
+    ('client_last_name', 'client__last_name'),
+    ('carrier_code', 'plan__carrier__code'),
+    ('plan_code', 'plan__plan_code'),
+    ('plan_name', 'plan__plan_name'),
+    ('status', 'status'),
+    ('application_date', 'application_date'),
+    ('requested_effective_date', 'requested_effective_date'),
+    ('monthly_premium', 'monthly_premium'),
+    ('commission_amount', 'commission_amount'),
+    ('submitted_at', 'submitted_at'),
+    ('approved_at', 'approved_at'),
+    ('declined_reason', 'declined_reason'),
+    ('notes', 'notes'),
+    ('created_at', 'created_at'),
+]
+
+ACTIVITY_COLUMNS = [
+    ('id', 'id'),
+    ('agent_code', 'agent__agent_id'),
+    ('client_id', 'client_id'),
+    ('client_first_name', 'client__first_name'),
+    ('client_last_name', 'client__last_name'),
+    ('activity_type', 'activity_type'),
+    ('subject', 'subject'),
+    ('description', 'description'),
+    ('outcome', 'outcome'),
+    ('next_action', 'next_action'),
+    ('scheduled_follow_up', 'scheduled_follow_up'),
+    ('created_at', 'created_at'),
+]
+
+FORMATS = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+
+# Spreadsheets evaluate CSV cells starting with these as formulas (OWASP CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+NUMBER = re.compile(r'[+-]?\d+(\.\d+)?')
+
+
+@require_GET
+def export_commissions(request):
+    """?format=csv|ndjson plus the /commissions/ filters"""
+    return export_response(request, filter_commissions(AgentCommission.objects.all(), request.GET),
+                           COMMISSION_COLUMNS, 'commissions')
+
+
+@require_GET
+def export_applications(request):
+    """?format=csv|ndjson plus the /applications/ filters"""
+    return export_response(request, filter_applications(PolicyApplication.objects.all(), request.GET),
+                           APPLICATION_COLUMNS, 'applications')
+
+
+@require_GET
+def export_activities(request):
+    """?format=csv|ndjson plus the /activities/ filters"""
+    return export_response(request, filter_activities(AgentActivity.objects.all(), request.GET),
+                           ACTIVITY_COLUMNS, 'activities')
+
+
+def export_response(request, queryset, columns: List[Tuple[str, str]], name: str):
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in FORMATS:
+        return JsonResponse({'error': f'format must be one of: {", ".join(FORMATS)}'}, status=400)
+
+    headers = [header for header, _ in columns]
+    # Newest first, like the list views; the id tie-break keeps the order deterministic
+    rows = queryset.order_by('-created_at', '-id').values_list(*[lookup for _, lookup in columns])
+    rows = convert_rows(rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE), column_converters(queryset.model, columns))
+    chunks = csv_chunks(headers, rows) if export_format == 'csv' else ndjson_chunks(headers, rows)
+
+    response = StreamingHttpResponse(chunks, content_type=FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{name}.{export_format}"'
+    return response
+
+
+def column_converters(model, columns: List[Tuple[str, str]]) -> List[Optional[Callable]]:
+    """Per-column formatter for values that are not plain JSON/CSV scalars, resolved once from the model fields"""
+    converters = []
+    for _, lookup in columns:
+        field_model = model
+        for part in lookup.split('__'):
+            field = field_model._meta.get_field(part)
+            field_model = field.related_model
+        if isinstance(field, models.DateTimeField):
+            converters.append(format_datetime)
+        elif isinstance(field, models.DateField):
+            converters.append(format_date)
+        elif isinstance(field, models.DecimalField):
+            converters.append(str)  # exact, as the API renders money
+        else:
+            converters.append(None)
+    return converters
+
+
+def format_datetime(value) -> str:
+    # ISO 8601 with 'Z' for UTC, as the API renders datetimes
+    value = value.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def format_date(value) -> str:
+    return value.isoformat()
+
+
+def convert_rows(rows: Iterable[tuple], converters: List[Optional[Callable]]) -> Iterator[list]:
+    converting = [(index, convert) for index, convert in enumerate(converters) if convert is not None]
+    for row in rows:
+        row = list(row)
+        for index, convert in converting:
+            if row[index] is not None:
+                row[index] = convert(row[index])
+        yield row
+
+
+def batches(rows: Iterator[list]) -> Iterator[List[list]]:
+    """Rows grouped per fetched chunk, so each response chunk is one write instead of one per row"""
+    while True:
+        batch = list(islice(rows, settings.EXPORT_CHUNK_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def escape_formula(value):
+    # Quote text such as "=HYPERLINK(...)" so it is shown, not run; plain numbers like -12.50 stay numeric
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) and not NUMBER.fullmatch(value):
+        return "'" + value
+    return value
+
+
+def csv_chunks(headers: List[str], rows: Iterator[list]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for batch in batches(rows):
+        writer.writerows([escape_formula(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # header only: nothing matched the filters
+
+
+def ndjson_chunks(headers: List[str], rows: Iterator[list]) -> Iterator[bytes]:
+    if orjson is not None:
+        dumps = orjson.dumps
+    else:
+        def dumps(line):
+            return json.dumps(line, ensure_ascii=False, separators=(',', ':')).encode()
+
+    for batch in batches(rows):
+        yield b''.join(dumps(dict(zip(headers, row))) + b'\n' for row in batch)
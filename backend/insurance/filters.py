@@ -0,0 +1,52 @@
+"""
+Query parameter filters shared by the list views and the streaming exports, so an export
+returns exactly the rows the matching list pages through
+"""
+
+
+def filter_applications(queryset, params):
+    """?agent=, ?client= and ?status="""
+    agent_id = params.get('agent')
+    client_id = params.get('client')
+    status_filter = params.get('status')
+
+    if agent_id:
+        queryset = queryset.filter(agent_id=agent_id)
+    if client_id:
+        queryset = queryset.filter(client_id=client_id)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    return queryset
+
+
+def filter_commissions(queryset, params):
+    """?agent=, ?period= and ?status="""
+    agent_id = params.get('agent')
+    pay_period = params.get('period')
+    status_filter = params.get('status')
+
+    if agent_id:
+        queryset = queryset.filter(agent_id=agent_id)
+    if pay_period:
+        queryset = queryset.filter(pay_period=pay_period)
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    return queryset
+
+
+def filter_activities(queryset, params):
+    """?agent=, ?client= and ?type="""
+    agent_id = params.get('agent')
+    client_id = params.get('client')
+    activity_type = params.get('type')
+
+    if agent_id:
+        queryset = queryset.filter(agent_id=agent_id)
+    if client_id:
+        queryset = queryset.filter(client_id=client_id)
+    if activity_type:
+        queryset = queryset.filter(activity_type=activity_type)
+
+    return queryset
@@ -0,0 +1,361 @@
+"""
+LLM backends for the Insurance Agent AI Assistant
+A small interface over chat models so the AI pipeline can run against Groq or an offline stand-in
+Backends are built through a provider registry on first use, so importing this module (and the
+URLconf that depends on it) never pulls in a provider SDK
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger('insurance.ai')
+
+
+@dataclass
+class LLMResponse:
+    """Text returned by a backend, with token usage when the provider reports it"""
+    content: str
+    usage: Dict[str, Any] = field(default_factory=dict)
+
+
+class LLMBackendError(RuntimeError):
+    """Raised by a backend when the upstream model call fails"""
+
+
+class LLMUnavailableError(LLMBackendError):
+    """Raised instead of calling upstream when the circuit is open or the deadline budget is spent"""
+
+
+class LLMBackend:
+    """
+    Interface for chat model backends used by InsuranceAgentAI
+    Subclasses implement invoke(); stream() defaults to a single chunk
+    """
+    name = 'base'
+    model_name = ''
+    temperature = 0.0
+
+    def invoke(self, prompt: str) -> LLMResponse:
+        raise NotImplementedError
+
+    def stream(self, prompt: str) -> Iterator[LLMResponse]:
+        yield self.invoke(prompt)
+
+
+class GroqBackend(LLMBackend):
+    """Groq-hosted chat model via langchain_groq"""
+    name = 'groq'
+
+    def __init__(self, api_key: str, model_name: str = 'mixtral-8x7b-32768',
+                 temperature: float = 0.1, max_tokens: int = 1024, timeout: Optional[float] = None):
+        from langchain_groq import ChatGroq
+
+        self.model_name = model_name
+        self.temperature = temperature
+        self.client = ChatGroq(
+            groq_api_key=api_key,
+            model_name=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout
+        )
+
+    def invoke(self, prompt: str) -> LLMResponse:
+        message = self.client.invoke(prompt)
+        return LLMResponse(message.content, getattr(message, 'usage_metadata', None) or {})
+
+    def stream(self, prompt: str) -> Iterator[LLMResponse]:
+        for chunk in self.client.stream(prompt):
+            yield LLMResponse(chunk.content, getattr(chunk, 'usage_metadata', None) or {})
+
+
+class Deadline:
+    """Time budget shared by every LLM stage of one request"""
+
+    def __init__(self, budget_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.budget_seconds = budget_seconds
+        self.clock = clock
+        self.expires_at = clock() + budget_seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - self.clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.clock() >= self.expires_at
+
+
+class CircuitBreaker:
+    """
+    Trips to fallback-only mode after consecutive failed or slow LLM calls
+    After reset_timeout a single half-open probe is let through; success closes the circuit again
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, slow_call_seconds: float = 8, reset_timeout: float = 30,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._consecutive_failures = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            'successes': 0,
+            'failures': 0,
+            'slow_calls': 0,
+            'rejected': 0,
+            'trips': 0,
+            'recoveries': 0,
+        }
+
+    def allow(self) -> bool:
+        """Return True if a call may go upstream now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    self._counters['rejected'] += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self._counters['rejected'] += 1
+                    return False
+                self._probe_in_flight = True
+
+            return True
+
+    def record_success(self, duration: float) -> None:
+        if duration >= self.slow_call_seconds:
+            self.record_failure(slow=True)
+            return
+
+        with self._lock:
+            self._counters['successes'] += 1
+            self._consecutive_failures = 0
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self._probe_in_flight = False
+                self._counters['recoveries'] += 1
+
+    def record_failure(self, slow: bool = False) -> None:
+        with self._lock:
+            self._counters['slow_calls' if slow else 'failures'] += 1
+            self._consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self._counters['trips'] += 1
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                'state': self.state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'slow_call_seconds': self.slow_call_seconds,
+                'reset_timeout_seconds': self.reset_timeout,
+            }
+
+
+# Canned replies for the offline backend, matched against the prompt in order
+FAKE_COMBINED_RESPONSE = json.dumps({
+    'insights': [
+        {
+            'type': 'client_portfolio',
+            'title': 'Client Portfolio Health',
+            'insight': 'Active clients make up most of the book, with a steady prospect pipeline behind them.',
+            'metric': 'Conversion rate above 60%',
+            'recommendation': 'Keep nurturing prospects with scheduled follow-ups.'
+        },
+        {
+            'type': 'application_performance',
+            'title': 'Application Pipeline',
+            'insight': 'Applications are moving through review at a healthy pace.',
+            'metric': 'Approval rate steady month over month',
+            'recommendation': 'Review submissions older than two weeks.'
+        }
+    ],
+    'recommendations': [
+        {
+            'type': 'revenue_optimization',
+            'priority': 'medium',
+            'action': 'Promote Gold and Platinum Tiers',
+            'description': 'Present higher-tier plans to clients with comprehensive coverage needs.',
+            'expected_impact': 'Higher average commission per sale'
+        }
+    ],
+    'executive_summary': 'The agent maintains a healthy book with solid conversion and a steady application '
+                         'pipeline. The main opportunity is moving more clients onto higher-tier plans.'
+})
+
+FAKE_RESPONSES = [
+    ('"executive_summary"', FAKE_COMBINED_RESPONSE),
+    ('executive summary', json.loads(FAKE_COMBINED_RESPONSE)['executive_summary']),
+    ('recommendations', json.dumps(json.loads(FAKE_COMBINED_RESPONSE)['recommendations'][0])),
+    ('insights', json.dumps(json.loads(FAKE_COMBINED_RESPONSE)['insights'][0])),
+]
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Offline stand-in for a hosted model, for local development and benchmarking
+    Simulates time to first token from a latency distribution, token throughput and upstream errors
+    """
+    name = 'fake'
+    model_name = 'fake-llm'
+
+    LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, latency: str = 'lognormal', latency_ms: float = 800, jitter: float = 0.5,
+                 tokens_per_second: float = 250, error_rate: float = 0.0,
+                 responses: Optional[List[Tuple[str, str]]] = None, seed: Optional[int] = None):
+        if latency not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(f'Unknown latency distribution: {latency}')
+
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.responses = list(responses or []) + FAKE_RESPONSES
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt: str) -> LLMResponse:
+        text = self._respond(prompt)
+        tokens = text.split()
+        time.sleep(self._first_token_delay() + self._token_delay() * len(tokens))
+        return LLMResponse(text, self._usage(prompt, tokens))
+
+    def stream(self, prompt: str) -> Iterator[LLMResponse]:
+        text = self._respond(prompt)
+        time.sleep(self._first_token_delay())
+        for token in text.split():
+            time.sleep(self._token_delay())
+            yield LLMResponse(token + ' ')
+
+    def _respond(self, prompt: str) -> str:
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            time.sleep(self._first_token_delay())
+            raise LLMBackendError('Simulated upstream failure')
+
+        for needle, text in self.responses:
+            if needle in prompt:
+                return text
+        return 'No analysis available.'
+
+    def _first_token_delay(self) -> float:
+        mean = self.latency_ms / 1000
+        with self._lock:
+            if self.latency == 'fixed':
+                delay = mean
+            elif self.latency == 'uniform':
+                delay = self._random.uniform(mean * (1 - self.jitter), mean * (1 + self.jitter))
+            elif self.latency == 'normal':
+                delay = self._random.gauss(mean, mean * self.jitter)
+            else:
+                # Parameterised so the distribution mean equals latency_ms
+                sigma = self.jitter
+                delay = self._random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma) if mean > 0 else 0
+        return max(delay, 0)
+
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+
+    def _usage(self, prompt: str, tokens: List[str]) -> Dict[str, int]:
+        input_tokens = len(prompt.split())
+        return {
+            'input_tokens': input_tokens,
+            'output_tokens': len(tokens),
+            'total_tokens': input_tokens + len(tokens),
+        }
+
+
+# Provider name -> factory taking the backend options; factories return None when the
+# provider cannot be used here (fallback logic is used instead)
+LLM_PROVIDERS: Dict[str, Callable[[Dict[str, Any]], Optional[LLMBackend]]] = {}
+
+
+def register_llm_provider(name: str):
+    """
+    Register a backend factory under name for AI_LLM_BACKEND
+    Factories should import their SDK inside the function body to keep module import cheap
+    """
+    def decorator(factory):
+        LLM_PROVIDERS[name] = factory
+        return factory
+    return decorator
+
+
+@register_llm_provider('fake')
+def _build_fake_backend(options: Dict[str, Any]) -> LLMBackend:
+    logger.info("Fake LLM backend initialized (offline mode)")
+    return FakeLLMBackend(**options)
+
+
+@register_llm_provider('groq')
+def _build_groq_backend(options: Dict[str, Any]) -> Optional[LLMBackend]:
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        groq_api_key = os.getenv("GROQ_API_KEY")
+        backend = GroqBackend(groq_api_key, **options) if groq_api_key and groq_api_key.startswith("gsk_") else None
+        logger.info("Groq LLM %s", 'initialized' if backend else 'not available (using fallback logic)')
+        return backend
+
+    except ImportError:
+        logger.warning("Groq dependencies not installed. Using fallback AI logic.")
+        return None
+
+
+def build_llm_backend(name: str, options: Optional[Dict[str, Any]] = None) -> Optional[LLMBackend]:
+    """
+    Construct the named backend, or None when it is unavailable (fallback logic is used)
+    """
+    try:
+        factory = LLM_PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f'Unknown LLM backend: {name}') from None
+    return factory(options or {})
+
+
+_llm_backend = None
+_llm_backend_loaded = False
+_llm_backend_lock = threading.Lock()
+
+
+def get_llm_backend() -> Optional[LLMBackend]:
+    """
+    Return the process-wide backend configured by AI_LLM_BACKEND, building it on first call
+    """
+    global _llm_backend, _llm_backend_loaded
+    with _llm_backend_lock:
+        if not _llm_backend_loaded:
+            from django.conf import settings
+
+            name = settings.AI_LLM_BACKEND
+            _llm_backend = build_llm_backend(name, settings.AI_LLM_BACKEND_OPTIONS.get(name))
+            _llm_backend_loaded = True
+        return _llm_backend
@@ -0,0 +1,96 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+
+from insurance.ai_agent import InsuranceAgentAI
+from insurance.ai_cache import summary_cache
+from insurance.llm import FakeLLMBackend
+from insurance.models import InsuranceAgent
+
+
+class Command(BaseCommand):
+    help = 'Benchmark AI dashboard generation under concurrent load against the offline fake LLM'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Total summaries to generate')
+        parser.add_argument('--concurrency', type=int, default=8, help='Simultaneous callers')
+        parser.add_argument('--mode', choices=['combined', 'parallel'], help='Override AI_GENERATION_MODE')
+        parser.add_argument(
+            '--cache', action='store_true',
+            help='Serve from the summary cache, snapshots and persistent LLM response cache when possible'
+        )
+        parser.add_argument(
+            '--latency', choices=FakeLLMBackend.LATENCY_DISTRIBUTIONS, default='lognormal',
+            help='Fake LLM time-to-first-token distribution'
+        )
+        parser.add_argument('--latency-ms', type=float, default=800, help='Mean time to first token')
+        parser.add_argument('--jitter', type=float, default=0.5, help='Relative spread of the latency distribution')
+        parser.add_argument('--tokens-per-second', type=float, default=250, help='Fake LLM output throughput')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of fake LLM calls that fail')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible runs')
+
+    def handle(self, *args, **options):
+        agent_ids = list(InsuranceAgent.objects.filter(is_active=True).values_list('agent_id', flat=True))
+        if not agent_ids:
+            raise CommandError('No active agents found. Run populate_sample_data first.')
+
+        llm = FakeLLMBackend(
+            latency=options['latency'],
+            latency_ms=options['latency_ms'],
+            jitter=options['jitter'],
+            tokens_per_second=options['tokens_per_second'],
+            error_rate=options['error_rate'],
+            seed=options['seed'],
+        )
+        settings_override = {'AI_GENERATION_MODE': options['mode']} if options['mode'] else {}
+        use_cache = options['cache']
+        if use_cache:
+            summary_cache.invalidate()
+
+        def run(index):
+            agent_id = agent_ids[index % len(agent_ids)]
+            started = time.perf_counter()
+            ai_assistant = InsuranceAgentAI(llm=llm)
+            if not use_cache:
+                ai_assistant.response_cache = None
+            try:
+                summary = ai_assistant.generate_agent_dashboard_summary(agent_id, use_cache=use_cache)
+            finally:
+                connections.close_all()
+            return time.perf_counter() - started, 'error' not in summary
+
+        self.stdout.write(
+            f"Benchmarking {options['requests']} summaries at concurrency {options['concurrency']} "
+            f"({options['latency']} latency, mean {options['latency_ms']:.0f}ms, "
+            f"error rate {options['error_rate']:.0%}, cache {'on' if use_cache else 'off'})..."
+        )
+
+        with override_settings(**settings_override):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(options['concurrency'], 1)) as executor:
+                results = list(executor.map(run, range(options['requests'])))
+            wall_time = time.perf_counter() - started
+
+        latencies = sorted(duration for duration, _ in results)
+        failures = sum(1 for _, ok in results if not ok)
+
+        self.stdout.write(f'  p50:        {percentile(latencies, 50) * 1000:8.1f} ms')
+        self.stdout.write(f'  p95:        {percentile(latencies, 95) * 1000:8.1f} ms')
+        self.stdout.write(f'  p99:        {percentile(latencies, 99) * 1000:8.1f} ms')
+        self.stdout.write(f'  max:        {latencies[-1] * 1000:8.1f} ms')
+        self.stdout.write(f'  throughput: {len(latencies) / wall_time:8.2f} summaries/s')
+        self.stdout.write(f'  failures:   {failures:8d}')
+        if use_cache:
+            self.stdout.write(f'  cache:      {summary_cache.stats()}')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[min(max(rank - 1, 0), len(sorted_values) - 1)]
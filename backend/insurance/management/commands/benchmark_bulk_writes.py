@@ -0,0 +1,97 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client as TestClient
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from insurance.benchmark_data import create_benchmark_rows
+from insurance.models import AgentStats
+from insurance.rollups import compute_agent_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark writing activities and applications one POST at a time against the bulk endpoints '
+        '(JSON array and NDJSON), checking that AgentStats rollups stay exact'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=500, help='Items written by each method')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Database vendor: {connection.vendor}')
+        setup_test_environment()  # allows the test client's host
+        try:
+            self.benchmark(options['items'])
+        finally:
+            teardown_test_environment()
+
+    def benchmark(self, count):
+        client = TestClient()
+        with transaction.atomic():
+            rows = create_benchmark_rows(2, prefix='bulkbench')
+            agent, customer, plan = rows['agents'][0], rows['clients'][0], rows['plans'][0]
+            payloads = [
+                ('activities', 'activity_list', 'activity_bulk', lambda method, index: {
+                    'agent_id': agent.pk, 'client_id': customer.pk, 'activity_type': 'CALL',
+                    'subject': f'Call {method} {index}', 'description': 'Benchmark call',
+                }),
+                ('applications', 'application_list', 'application_bulk', lambda method, index: {
+                    'agent_id': agent.pk, 'client_id': customer.pk, 'plan_id': plan.pk,
+                    'application_number': f'BULKBENCH-{method}-{index:06d}',
+                    'application_date': '2025-12-01', 'requested_effective_date': '2026-01-01',
+                    'monthly_premium': str(plan.monthly_premium), 'status': 'SUBMITTED',
+                }),
+            ]
+
+            self.stdout.write(f'{"payload":<14} {"method":<12} {"items/s":>10} {"queries":>8} {"speedup":>8}')
+            for label, list_name, bulk_name, make_item in payloads:
+                single = self.run(
+                    lambda: [
+                        client.post(reverse(list_name), make_item('single', index), content_type='application/json')
+                        for index in range(count)
+                    ]
+                )
+                self.report(label, 'one by one', count, *single, single[0])
+
+                array = self.run(lambda: [client.post(
+                    reverse(bulk_name), json.dumps([make_item('array', index) for index in range(count)]),
+                    content_type='application/json'
+                )])
+                self.report(label, 'JSON array', count, *array, single[0])
+
+                ndjson = self.run(lambda: [client.post(
+                    reverse(bulk_name), ''.join(json.dumps(make_item('ndjson', index)) + '\n' for index in range(count)),
+                    content_type='application/x-ndjson'
+                )])
+                self.report(label, 'NDJSON', count, *ndjson, single[0])
+
+            expected = compute_agent_stats([agent.pk])[agent.pk]
+            stats = AgentStats.objects.get(agent=agent)
+            drift = {
+                field: (getattr(stats, field), value) for field, value in expected.items()
+                if getattr(stats, field) != value
+            }
+            if drift:
+                raise CommandError(f'AgentStats drifted after bulk writes: {drift}')
+            transaction.set_rollback(True)
+
+    def run(self, write):
+        """Seconds and queries for one method, failing on any non-2xx response"""
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            responses = write()
+            elapsed = time.perf_counter() - started
+        for response in responses:
+            if response.status_code >= 300:
+                raise CommandError(f'{response.status_code}: {response.content[:500]!r}')
+        return elapsed, len(context.captured_queries)
+
+    def report(self, label, method, count, elapsed, queries, baseline):
+        self.stdout.write(
+            f'{label:<14} {method:<12} {count / elapsed:>10,.0f} {queries:>8} {baseline / elapsed:>7.1f}x'
+        )
@@ -0,0 +1,131 @@
+import random
+import statistics
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from insurance.models import Client, InsuranceAgent
+from insurance.search import search_clients
+
+
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+    'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Carlos', 'Karen',
+    'Daniel', 'Lisa', 'Matthew', 'Nancy', 'Anthony', 'Betty', 'Mark', 'Sandra', 'Donald', 'Ashley',
+    'Steven', 'Kimberly', 'Andrew', 'Emily', 'Joshua', 'Donna', 'Kenneth', 'Michelle', 'Kevin', 'Carol',
+    'Brian', 'Amanda', 'Timothy', 'Melissa', 'Ronald', 'Deborah', 'Jason', 'Stephanie', 'Ryan', 'Rebecca',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Ramirez', 'Lewis', 'Robinson',
+    'Walker', 'Young', 'Allen', 'King', 'Wright', 'Scott', 'Torres', 'Nguyen', 'Hill', 'Flores',
+    'Green', 'Adams', 'Nelson', 'Baker', 'Hall', 'Rivera', 'Campbell', 'Mitchell', 'Carter', 'Roberts',
+]
+DOMAINS = ['email.com', 'mail.net', 'inbox.org', 'example.com']
+
+
+def legacy_search(queryset, search):
+    """The leading-wildcard LIKE search that ClientListCreateView used before indexed search"""
+    return queryset.filter(
+        Q(first_name__icontains=search) |
+        Q(last_name__icontains=search) |
+        Q(email__icontains=search)
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark indexed client search against the legacy icontains scan on a generated client table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=1_000_000, help='Clients to generate')
+        parser.add_argument('--queries', type=int, default=20, help='Sample queries per query kind')
+        parser.add_argument('--page-size', type=int, default=20, help='Rows fetched per query, as a list page would')
+        parser.add_argument('--batch-size', type=int, default=5000, help='bulk_create batch size')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible data')
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Commit the generated clients instead of rolling them back'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.stdout.write(f'Database vendor: {connection.vendor}')
+
+        with transaction.atomic():
+            agent = self.create_agent()
+            started = time.perf_counter()
+            self.generate_clients(agent, options['clients'], options['batch_size'], rng)
+            self.stdout.write(f'Generated {options["clients"]:,} clients in {time.perf_counter() - started:.1f}s '
+                              f'(search index maintained by the database)')
+
+            clients = Client.objects.filter(agent=agent)
+            samples = list(clients.order_by('?').values('first_name', 'last_name', 'email', 'phone_number')[:options['queries']])
+            query_kinds = {
+                'type-ahead (3 letters)': [sample['last_name'][:3] for sample in samples],
+                'full name': [f'{sample["first_name"]} {sample["last_name"]}' for sample in samples],
+                'email': [sample['email'] for sample in samples],
+                'phone': [sample['phone_number'] for sample in samples],
+            }
+
+            self.stdout.write(f'{"query kind":<24} {"backend":<8} {"median ms":>10} {"p95 ms":>10} {"avg matches":>12}')
+            for kind, queries in query_kinds.items():
+                for label, search in (('legacy', legacy_search), ('indexed', search_clients)):
+                    timings, matches = self.run_queries(clients, search, queries, options['page_size'])
+                    self.stdout.write(
+                        f'{kind:<24} {label:<8} {statistics.median(timings):>10.2f} '
+                        f'{percentile(timings, 95):>10.2f} {statistics.mean(matches):>12.1f}'
+                    )
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def create_agent(self):
+        suffix = int(time.time())
+        user = User.objects.create(username=f'search_benchmark_{suffix}', first_name='Search', last_name='Benchmark')
+        return InsuranceAgent.objects.create(
+            user=user, agent_id=f'BENCH{suffix}', license_number=f'BENCH-{suffix}',
+            phone_number='+1-555-0000', email=f'benchmark{suffix}@navicare.com'
+        )
+
+    def generate_clients(self, agent, total, batch_size, rng):
+        batch = []
+        for index in range(total):
+            first_name = rng.choice(FIRST_NAMES)
+            last_name = rng.choice(LAST_NAMES)
+            batch.append(Client(
+                agent=agent,
+                first_name=first_name,
+                last_name=f'{last_name}{rng.choice(["", "", "son", "-" + rng.choice(LAST_NAMES)])}',
+                date_of_birth=date(rng.randint(1940, 2005), rng.randint(1, 12), rng.randint(1, 28)),
+                email=f'{first_name.lower()}.{last_name.lower()}{index}@{rng.choice(DOMAINS)}',
+                phone_number=f'+1-{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}',
+                address_line1=f'{rng.randint(1, 9999)} Main St',
+                city='Springfield', state='IL', zip_code=f'{rng.randint(10000, 99999)}',
+            ))
+            if len(batch) >= batch_size:
+                Client.objects.bulk_create(batch, batch_size=batch_size)
+                batch = []
+        if batch:
+            Client.objects.bulk_create(batch, batch_size=batch_size)
+
+    def run_queries(self, clients, search, queries, page_size):
+        """Time a count plus the first page for each query, as the paginated list view does"""
+        timings = []
+        matches = []
+        for query in queries:
+            started = time.perf_counter()
+            results = search(clients, query)
+            matches.append(results.count())
+            list(results[:page_size])
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings, matches
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
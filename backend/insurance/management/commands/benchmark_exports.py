@@ -0,0 +1,79 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client as TestClient
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from insurance.benchmark_data import create_benchmark_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the streaming commission export (CSV and NDJSON) against paging through /commissions/, '
+        'with the peak memory of each export at two table sizes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Commissions in the larger table')
+        parser.add_argument('--page-size', type=int, default=20, help='Page size when paging through the list')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Database vendor: {connection.vendor}')
+        setup_test_environment()  # allows the test client's host
+        try:
+            self.benchmark(options['rows'], options['page_size'])
+        finally:
+            teardown_test_environment()
+
+    def benchmark(self, rows, page_size):
+        client = TestClient()
+        self.stdout.write(f'{"rows":>8} {"method":<22} {"rows/s":>10} {"peak KB":>9}')
+        with transaction.atomic():
+            created = 0
+            for prefix, size in (('exa', rows // 10), ('exb', rows)):
+                # The prefix keeps generated carrier codes unique between the two batches
+                create_benchmark_rows(size - created, prefix=prefix)
+                created = size
+
+                for export_format in ('csv', 'ndjson'):
+                    url = reverse('commission_export')
+                    elapsed, _ = self.stream(client, url, export_format, trace=False)
+                    _, peak = self.stream(client, url, export_format, trace=True)
+                    self.stdout.write(
+                        f'{size:>8} {export_format + " export":<22} {size / elapsed:>10,.0f} {peak / 1024:>9,.0f}'
+                    )
+
+                elapsed = self.page_through(client, page_size)
+                self.stdout.write(f'{size:>8} {f"list, {page_size} per page":<22} {size / elapsed:>10,.0f} {"":>9}')
+            transaction.set_rollback(True)
+
+    def stream(self, client, url, export_format, trace):
+        """Seconds (or peak traced bytes) to consume one export without keeping its chunks"""
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        response = client.get(url, {'format': export_format})
+        if response.status_code != 200:
+            raise CommandError(f'{url}: {response.status_code}')
+        for _ in response.streaming_content:
+            pass
+        elapsed = time.perf_counter() - started
+        peak = 0
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return elapsed, peak
+
+    def page_through(self, client, page_size):
+        """Seconds to follow the list's next links from the first page to the last"""
+        started = time.perf_counter()
+        url, params = reverse('commission_list'), {'page_size': page_size}
+        while url:
+            response = client.get(url, params)
+            if response.status_code != 200:
+                raise CommandError(f'{url}: {response.status_code}')
+            url, params = response.json()['next'], None
+        return time.perf_counter() - started
@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from insurance.benchmark_data import create_benchmark_rows
+from insurance.models import InsurancePlan, PolicyApplication
+from insurance.renderers import FastJSONRenderer, orjson
+from insurance.serializers import (
+    InsurancePlanSerializer, PolicyApplicationSerializer, parse_field_paths, shape_queryset
+)
+
+
+# (label, model, serializer, ?expand= value) for the payloads the frontend requests most
+PAYLOADS = [
+    ('/plans/?expand=carrier', InsurancePlan, InsurancePlanSerializer, 'carrier'),
+    ('/applications/', PolicyApplication, PolicyApplicationSerializer, ''),
+    ('/applications/ expanded', PolicyApplication, PolicyApplicationSerializer, 'agent.user,client.agent.user,plan.carrier'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark FastJSONRenderer against DRF\'s JSONRenderer on plan and application list payloads, '
+        'with decimals as strings and as numbers, checking that both render identical bytes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Rows per payload (one list page)')
+        parser.add_argument('--repeat', type=int, default=200, help='Timed renders per payload')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer uses the stock encoder'))
+
+        with transaction.atomic():
+            create_benchmark_rows(options['rows'], prefix='renderbench')
+            self.stdout.write(
+                f'{"payload":<28} {"decimals":<8} {"KB":>7} {"stock ms":>9} {"fast ms":>8} {"speedup":>8}'
+            )
+            for decimals_as_strings in (True, False):
+                rest_framework = {**settings.REST_FRAMEWORK, 'COERCE_DECIMAL_TO_STRING': decimals_as_strings}
+                with override_settings(REST_FRAMEWORK=rest_framework):
+                    for label, model, serializer_class, expand in PAYLOADS:
+                        self.run_payload(
+                            label, 'strings' if decimals_as_strings else 'numbers',
+                            self.build_payload(model, serializer_class, expand, options['rows']), options['repeat']
+                        )
+            transaction.set_rollback(True)
+
+    def build_payload(self, model, serializer_class, expand, rows):
+        """A paginated list response body, as the view hands it to the renderer"""
+        serializer = serializer_class(expand=parse_field_paths(expand))
+        queryset = shape_queryset(model.objects.order_by('-id'), serializer)[:rows]
+        return {
+            'count': rows,
+            'next': 'http://testserver/api/?page=2',
+            'previous': None,
+            'results': serializer_class(queryset, many=True, expand=parse_field_paths(expand)).data,
+        }
+
+    def run_payload(self, label, decimals, payload, repeat):
+        stock, fast = JSONRenderer(), FastJSONRenderer()
+        content = stock.render(payload)
+        if fast.render(payload) != content:
+            raise CommandError(f'{label} ({decimals}): FastJSONRenderer output differs from JSONRenderer')
+
+        stock_ms = self.median_ms(stock, payload, repeat)
+        fast_ms = self.median_ms(fast, payload, repeat)
+        self.stdout.write(
+            f'{label:<28} {decimals:<8} {len(content) / 1024:>7.1f} {stock_ms:>9.3f} {fast_ms:>8.3f} '
+            f'{stock_ms / fast_ms:>7.1f}x'
+        )
+
+    def median_ms(self, renderer, payload, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            renderer.render(payload)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
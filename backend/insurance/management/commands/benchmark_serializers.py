@@ -0,0 +1,122 @@
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+
+from insurance.benchmark_data import create_benchmark_rows
+from insurance.models import AgentActivity, AgentCommission, Client, PolicyApplication
+from insurance.pagination import KeysetPagination
+from insurance.readers import compile_reader
+from insurance.renderers import FastJSONRenderer
+from insurance.serializers import (
+    AgentActivitySerializer, AgentCommissionSerializer, ClientSerializer, IncludedEntities,
+    PolicyApplicationSerializer, parse_field_paths, shape_queryset
+)
+
+
+APPLICATION_EXPAND = 'agent.user,client.agent.user,plan.carrier'
+
+# (label, model, serializer, ?expand= value) for the large list endpoints
+SHAPES = [
+    ('clients', Client, ClientSerializer, ''),
+    ('clients ?expand=agent.user', Client, ClientSerializer, 'agent.user'),
+    ('applications', PolicyApplication, PolicyApplicationSerializer, ''),
+    ('applications expanded', PolicyApplication, PolicyApplicationSerializer, APPLICATION_EXPAND),
+    ('commissions', AgentCommission, AgentCommissionSerializer, ''),
+    ('commissions expanded', AgentCommission, AgentCommissionSerializer,
+     'agent.user,application.agent.user,application.client.agent.user,application.plan.carrier'),
+    ('activities', AgentActivity, AgentActivitySerializer, ''),
+    ('activities ?expand=client', AgentActivity, AgentActivitySerializer, 'client'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark list serialization: DRF serializers over model instances against the values() read path, '
+        'checking that both render byte-identical JSON, then nested against ?shape=normalized for one agent'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows of every model to generate')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per shape')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Database vendor: {connection.vendor}')
+        renderer = JSONRenderer()
+        rows = options['rows']
+
+        with transaction.atomic():
+            rows_created = create_benchmark_rows(rows, prefix='serbench')
+            self.stdout.write(
+                f'{"shape":<28} {"serializer rows/s":>18} {"values rows/s":>14} {"speedup":>8}'
+            )
+            for label, model, serializer_class, expand in SHAPES:
+                serializer = serializer_class(expand=parse_field_paths(expand))
+                reader = compile_reader(serializer)
+                if reader is None:
+                    raise CommandError(f'{label}: shape has no values() read path')
+                queryset = shape_queryset(model.objects.all(), serializer, KeysetPagination.required_fields)
+                queryset = queryset.order_by('-created_at', '-id')
+
+                def serializer_path():
+                    return serializer_class(list(queryset), many=True, expand=parse_field_paths(expand)).data
+
+                def values_path():
+                    return reader.render(list(reader.values(queryset, KeysetPagination.required_fields)))
+
+                if renderer.render(serializer_path()) != renderer.render(values_path()):
+                    raise CommandError(f'{label}: values() read path renders different JSON')
+
+                slow = self.rows_per_second(serializer_path, options['repeat'])
+                fast = self.rows_per_second(values_path, options['repeat'])
+                self.stdout.write(f'{label:<28} {slow:>18,.0f} {fast:>14,.0f} {fast / slow:>7.1f}x')
+
+            self.compare_normalized(rows_created['agents'][0], rows_created['plans'][:5], options['repeat'])
+            transaction.set_rollback(True)
+
+    def compare_normalized(self, agent, plans, repeat):
+        """One agent's application page, every relation expanded: nested objects against side-loading"""
+        client = agent.clients.first()
+        PolicyApplication.objects.bulk_create([
+            PolicyApplication(
+                agent=agent, client=client, plan=plans[index % len(plans)], application_number=f'SERBENCH-N-{index:04d}',
+                requested_effective_date=date(2026, 7, 1), monthly_premium=plans[index % len(plans)].monthly_premium
+            )
+            for index in range(100)
+        ])
+        renderer = FastJSONRenderer()
+        expand = parse_field_paths(APPLICATION_EXPAND)
+        probe = PolicyApplicationSerializer(expand=expand)
+        queryset = shape_queryset(PolicyApplication.objects.filter(agent=agent), probe).order_by('-created_at', '-id')[:100]
+
+        def nested():
+            reader = compile_reader(PolicyApplicationSerializer(expand=expand))
+            return renderer.render({'results': reader.render(reader.values(queryset))})
+
+        def normalized():
+            included = IncludedEntities()
+            reader = compile_reader(PolicyApplicationSerializer(expand=expand, context={'included': included}))
+            results = reader.render(reader.values(queryset))
+            return renderer.render({'results': results, 'included': included.collections})
+
+        self.stdout.write(f'\n{"one agent, 100 applications":<28} {"KB":>8} {"ms":>8}')
+        for label, render in (('nested', nested), ('?shape=normalized', normalized)):
+            size = len(render())
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                render()
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(f'{label:<28} {size / 1024:>8.1f} {statistics.median(timings):>8.2f}')
+
+    def rows_per_second(self, render, repeat):
+        """Median rows per second over repeat runs, query time included"""
+        rates = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            count = len(render())
+            rates.append(count / (time.perf_counter() - started))
+        return statistics.median(rates)
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Cold-start a worker the way a WSGI server does, then load the URLconf as the first request would
+BOOT_SNIPPET = (
+    "import navicare_backend.wsgi; "
+    "from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+
+# Heavy LLM SDKs must only be imported on the first AI request
+LAZY_MODULES = ('langchain_groq', 'langchain_core', 'langchain', 'groq', 'dotenv')
+
+
+class Command(BaseCommand):
+    help = 'Measure cold import time of navicare_backend.wsgi with python -X importtime and fail past a budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=float, default=1000, help='Maximum total import time')
+        parser.add_argument('--runs', type=int, default=3, help='Cold imports to measure; the fastest run is reported')
+        parser.add_argument('--top', type=int, default=10, help='Slowest modules (self time) to list')
+
+    def handle(self, *args, **options):
+        runs = [self.measure() for _ in range(max(options['runs'], 1))]
+        timings = min(runs, key=total_import_ms)
+        total_ms = total_import_ms(timings)
+
+        self.stdout.write(f'Cold import of navicare_backend.wsgi + URLconf: {total_ms:.1f} ms '
+                          f'(best of {len(runs)}, budget {options["budget_ms"]:.0f} ms)')
+        self.stdout.write('Slowest modules by self time:')
+        for name, self_us, cumulative_us, _ in sorted(timings, key=lambda row: row[1], reverse=True)[:options['top']]:
+            self.stdout.write(f'  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}')
+
+        eager = sorted({
+            name for name, _, _, _ in timings
+            if name.split('.')[0] in LAZY_MODULES
+        })
+        if eager:
+            raise CommandError(f'LLM modules imported at startup: {", ".join(eager)}')
+        if total_ms > options['budget_ms']:
+            raise CommandError(f'Import time {total_ms:.1f} ms exceeds budget of {options["budget_ms"]:.0f} ms')
+
+        self.stdout.write(self.style.SUCCESS('Import time within budget'))
+
+    def measure(self):
+        """Run one cold import in a fresh interpreter and return (module, self_us, cumulative_us, depth) rows"""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SNIPPET],
+            cwd=settings.BASE_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Cold import failed:\n{result.stderr[-2000:]}')
+        return parse_importtime(result.stderr)
+
+
+def parse_importtime(output):
+    """Parse `import time: self [us] | cumulative | imported package` lines"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def total_import_ms(rows):
+    return sum(cumulative_us for _, _, cumulative_us, depth in rows if depth == 0) / 1000
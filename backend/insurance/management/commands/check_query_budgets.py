@@ -0,0 +1,13 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Assert per-endpoint SQL query budgets at several table sizes, so N+1 regressions fail CI; '
+        'runs insurance.tests.QueryBudgetTests against a throwaway test database'
+    )
+
+    def handle(self, *args, **options):
+        # The budgets live in the test suite; a failing budget exits non-zero with the offending SQL
+        call_command('test', 'insurance.tests.QueryBudgetTests', verbosity=options['verbosity'])
@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from insurance.ai_agent import InsuranceAgentAI
+from insurance.ai_cache import compute_fingerprints
+from insurance.models import InsuranceAgent, AgentDashboardSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Precompute AI dashboard summaries for active agents and store them as snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Agents generated in parallel (LLM calls are further capped by AI_LLM_MAX_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--agents', nargs='+', metavar='AGENT_ID',
+            help='Only precompute these agent IDs'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate snapshots that are still fresh'
+        )
+
+    def handle(self, *args, **options):
+        agents = InsuranceAgent.objects.filter(is_active=True).select_related('user')
+        if options['agents']:
+            agents = agents.filter(agent_id__in=options['agents'])
+        agents = list(agents)
+
+        fingerprints = compute_fingerprints(agents)
+        snapshots = {
+            snapshot.agent_id: snapshot
+            for snapshot in AgentDashboardSnapshot.objects.filter(agent__in=agents)
+        }
+        max_age = timedelta(seconds=settings.AI_SNAPSHOT_MAX_AGE)
+
+        pending = [
+            agent for agent in agents
+            if options['force']
+            or agent.pk not in snapshots
+            or not snapshots[agent.pk].is_fresh(fingerprints[agent.pk], max_age)
+        ]
+        self.stdout.write(
+            f'Precomputing AI dashboards for {len(pending)} of {len(agents)} active agents '
+            f'with {options["workers"]} workers...'
+        )
+
+        generated = failed = 0
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as executor:
+            futures = {
+                executor.submit(self.generate_summary, agent): agent
+                for agent in pending
+            }
+            # Snapshots are written from this thread only, so workers never contend on writes
+            for future in as_completed(futures):
+                agent = futures[future]
+                try:
+                    AgentDashboardSnapshot.objects.update_or_create(
+                        agent=agent,
+                        defaults={
+                            'summary': future.result(),
+                            'context_fingerprint': fingerprints[agent.pk],
+                            'generated_at': timezone.now(),
+                        }
+                    )
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'Failed to precompute dashboard for agent {agent.agent_id}: {e}')
+                else:
+                    generated += 1
+                    self.stdout.write(f'Precomputed dashboard for agent {agent.agent_id}')
+
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(
+            f'Precomputed {generated} dashboards, {failed} failed, '
+            f'{len(agents) - len(pending)} already fresh'
+        ))
+
+    def generate_summary(self, agent):
+        """Generate one agent's summary; runs on a worker thread"""
+        try:
+            return InsuranceAgentAI().generate_summary_for_agent(agent)
+        finally:
+            connections.close_all()
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from insurance.models import InsuranceAgent
+from insurance.rollups import rebuild_agent_stats
+
+
+class Command(BaseCommand):
+    help = 'Verify AgentStats rollups against the raw tables and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--agents', nargs='+', metavar='AGENT_ID',
+            help='Only check these agent IDs'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drift without repairing it'
+        )
+
+    def handle(self, *args, **options):
+        agents = InsuranceAgent.objects.all()
+        if options['agents']:
+            agents = agents.filter(agent_id__in=options['agents'])
+        agent_ids = dict(agents.values_list('pk', 'agent_id'))
+
+        drift = rebuild_agent_stats(agent_ids, dry_run=options['dry_run'])
+
+        for agent_pk, fields in sorted(drift.items()):
+            if all(stored is None for stored, _ in fields.values()):
+                self.stdout.write(f'Agent {agent_ids[agent_pk]}: stats row missing')
+                continue
+            changes = ', '.join(f'{field} {stored} -> {expected}' for field, (stored, expected) in fields.items())
+            self.stdout.write(f'Agent {agent_ids[agent_pk]}: {changes}')
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS(f'Checked {len(agent_ids)} agents, no drift found'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Checked {len(agent_ids)} agents, {len(drift)} drifted (not repaired)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Checked {len(agent_ids)} agents, repaired {len(drift)}'))
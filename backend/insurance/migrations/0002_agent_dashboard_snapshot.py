@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentDashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summary', models.JSONField()),
+                ('context_fingerprint', models.CharField(max_length=64)),
+                ('generated_at', models.DateTimeField()),
+                ('agent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_snapshot', to='insurance.insuranceagent')),
+            ],
+            options={
+                'db_table': 'agent_dashboard_snapshots',
+            },
+        ),
+    ]
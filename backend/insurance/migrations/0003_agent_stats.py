@@ -0,0 +1,89 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:42
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+# Frozen copy of insurance.rollups.compute_agent_stats() as of this migration:
+# model label -> (count field prefix, amount field prefix, amount field on the model)
+ROLLUP_MODELS = {
+    'Client': ('clients', None, None),
+    'PolicyApplication': ('applications', None, None),
+    'AgentCommission': ('commissions', 'commission_amount', 'amount'),
+}
+
+
+def build_agent_stats(apps, schema_editor):
+    # Existing agents get exact rollups up front rather than on their first dashboard read
+    InsuranceAgent = apps.get_model('insurance', 'InsuranceAgent')
+    AgentStats = apps.get_model('insurance', 'AgentStats')
+    stat_fields = [
+        field.name for field in AgentStats._meta.concrete_fields
+        if field.name not in ('agent', 'updated_at')
+    ]
+
+    stats = {
+        pk: {field: Decimal('0.00') if field.startswith('commission_amount') else 0 for field in stat_fields}
+        for pk in InsuranceAgent.objects.values_list('pk', flat=True)
+    }
+    for model_name, (count_prefix, amount_prefix, amount_field) in ROLLUP_MODELS.items():
+        aggregates = {'count': Count('id')}
+        if amount_field:
+            aggregates['amount'] = Sum(amount_field)
+        rows = apps.get_model('insurance', model_name).objects.order_by().values('agent_id', 'status')
+        for row in rows.annotate(**aggregates):
+            values = stats[row['agent_id']]
+            count_field = f'{count_prefix}_{row["status"].lower()}'
+            if count_field not in values:
+                continue  # status outside the model's choices
+            values[count_field] = row['count']
+            if amount_prefix:
+                values[f'{amount_prefix}_{row["status"].lower()}'] = row['amount'] or Decimal('0.00')
+
+    AgentStats.objects.bulk_create(
+        [AgentStats(agent_id=pk, **values) for pk, values in stats.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0002_agent_dashboard_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentStats',
+            fields=[
+                ('agent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='insurance.insuranceagent')),
+                ('clients_prospect', models.IntegerField(default=0)),
+                ('clients_active', models.IntegerField(default=0)),
+                ('clients_lapsed', models.IntegerField(default=0)),
+                ('clients_cancelled', models.IntegerField(default=0)),
+                ('applications_draft', models.IntegerField(default=0)),
+                ('applications_submitted', models.IntegerField(default=0)),
+                ('applications_under_review', models.IntegerField(default=0)),
+                ('applications_approved', models.IntegerField(default=0)),
+                ('applications_declined', models.IntegerField(default=0)),
+                ('applications_withdrawn', models.IntegerField(default=0)),
+                ('commissions_pending', models.IntegerField(default=0)),
+                ('commissions_calculated', models.IntegerField(default=0)),
+                ('commissions_paid', models.IntegerField(default=0)),
+                ('commissions_disputed', models.IntegerField(default=0)),
+                ('commission_amount_pending', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('commission_amount_calculated', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('commission_amount_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('commission_amount_disputed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'agent stats',
+                'db_table': 'agent_stats',
+            },
+        ),
+        migrations.RunPython(build_agent_stats, migrations.RunPython.noop),
+    ]
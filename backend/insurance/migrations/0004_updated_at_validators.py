@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0003_agent_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agentactivity',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='agentcommission',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='insurancecarrier',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
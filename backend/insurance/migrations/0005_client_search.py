@@ -0,0 +1,125 @@
+from django.db import migrations
+
+
+# Phone numbers are indexed as bare digits; SQLite has no regexp_replace, so strip the usual punctuation
+PHONE_PUNCTUATION = (' ', '-', '(', ')', '+', '.')
+
+
+def sqlite_phone_digits(column):
+    expression = column
+    for character in PHONE_PUNCTUATION:
+        expression = f"replace({expression}, '{character}', '')"
+    return expression
+
+
+def sqlite_phone_tokens(column):
+    # Index national numbers without the leading country code too, so "555" finds "+1-555-..."
+    digits = sqlite_phone_digits(column)
+    return f"CASE WHEN {digits} LIKE '1%' THEN {digits} || ' ' || substr({digits}, 2) ELSE {digits} END"
+
+
+def sqlite_fts_values(row):
+    return f"{row}.id, {row}.first_name, {row}.last_name, {row}.email, {sqlite_phone_tokens(f'{row}.phone_number')}"
+
+
+SQLITE_FORWARD = [
+    # Contentless: the table stores only the index; rows are removed with the 'delete' command
+    """
+    CREATE VIRTUAL TABLE clients_fts USING fts5(
+        first_name, last_name, email, phone_digits,
+        content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER clients_fts_insert AFTER INSERT ON clients BEGIN
+        INSERT INTO clients_fts(rowid, first_name, last_name, email, phone_digits)
+        VALUES ({sqlite_fts_values('new')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER clients_fts_delete AFTER DELETE ON clients BEGIN
+        INSERT INTO clients_fts(clients_fts, rowid, first_name, last_name, email, phone_digits)
+        VALUES ('delete', {sqlite_fts_values('old')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER clients_fts_update AFTER UPDATE OF id, first_name, last_name, email, phone_number ON clients BEGIN
+        INSERT INTO clients_fts(clients_fts, rowid, first_name, last_name, email, phone_digits)
+        VALUES ('delete', {sqlite_fts_values('old')});
+        INSERT INTO clients_fts(rowid, first_name, last_name, email, phone_digits)
+        VALUES ({sqlite_fts_values('new')});
+    END
+    """,
+    f"""
+    INSERT INTO clients_fts(rowid, first_name, last_name, email, phone_digits)
+    SELECT {sqlite_fts_values('clients')} FROM clients
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS clients_fts_update',
+    'DROP TRIGGER IF EXISTS clients_fts_delete',
+    'DROP TRIGGER IF EXISTS clients_fts_insert',
+    'DROP TABLE IF EXISTS clients_fts',
+]
+
+# Expressions must stay identical to those in insurance/search.py for the planner to use the indexes
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    """
+    CREATE INDEX clients_search_document ON clients USING GIN ((
+        to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, ''))
+    ))
+    """,
+    """
+    CREATE INDEX clients_search_name_trgm ON clients
+    USING GIN ((lower(first_name || ' ' || last_name)) gin_trgm_ops)
+    """,
+    'CREATE INDEX clients_search_email_trgm ON clients USING GIN ((lower(email)) gin_trgm_ops)',
+    r"""
+    CREATE INDEX clients_search_phone_digits ON clients
+    ((regexp_replace(phone_number, '\D', '', 'g')) text_pattern_ops)
+    """,
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS clients_search_phone_digits',
+    'DROP INDEX IF EXISTS clients_search_email_trgm',
+    'DROP INDEX IF EXISTS clients_search_name_trgm',
+    'DROP INDEX IF EXISTS clients_search_document',
+]
+
+
+def fts5_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    elif connection.vendor == 'sqlite' and fts5_available(connection):
+        statements = SQLITE_FORWARD
+    else:
+        return  # insurance.search falls back to unindexed matching
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    statements = {'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0004_updated_at_validators'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
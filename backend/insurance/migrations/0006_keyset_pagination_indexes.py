@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0005_client_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agentactivity',
+            index=models.Index(fields=['created_at', 'id'], name='activities_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agentactivity',
+            index=models.Index(fields=['agent', 'created_at', 'id'], name='activities_agent_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agentcommission',
+            index=models.Index(fields=['created_at', 'id'], name='commissions_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agentcommission',
+            index=models.Index(fields=['agent', 'created_at', 'id'], name='commissions_agent_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['created_at', 'id'], name='clients_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['agent', 'created_at', 'id'], name='clients_agent_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policyapplication',
+            index=models.Index(fields=['created_at', 'id'], name='applications_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policyapplication',
+            index=models.Index(fields=['agent', 'created_at', 'id'], name='applications_agent_created_idx'),
+        ),
+    ]
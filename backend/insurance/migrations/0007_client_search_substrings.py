@@ -0,0 +1,105 @@
+from importlib import import_module
+
+from django.db import migrations
+
+
+# Rebuilds the search indexes from 0005_client_search for substring matching: every term, and the
+# national digits of a phone query, may appear anywhere in the indexed value
+client_search = import_module('insurance.migrations.0005_client_search')
+
+
+def sqlite_fts_values(row):
+    # Substring matching finds national numbers inside "+1..." digits, so one digits token is enough
+    return (
+        f"{row}.id, {row}.first_name, {row}.last_name, {row}.email, "
+        f"{client_search.sqlite_phone_digits(f'{row}.phone_number')}"
+    )
+
+
+SQLITE_FORWARD = [
+    # Contentless: the table stores only the index; rows are removed with the 'delete' command
+    """
+    CREATE VIRTUAL TABLE clients_fts USING fts5(
+        first_name, last_name, email, phone_digits,
+        content='', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER clients_fts_insert AFTER INSERT ON clients BEGIN
+        INSERT INTO clients_fts(rowid, first_name, last_name, email, phone_digits)
+        VALUES ({sqlite_fts_values('new')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER clients_fts_delete AFTER DELETE ON clients BEGIN
+        INSERT INTO clients_fts(clients_fts, rowid, first_name, last_name, email, phone_digits)
+        VALUES ('delete', {sqlite_fts_values('old')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER clients_fts_update AFTER UPDATE OF id, first_name, last_name, email, phone_number ON clients BEGIN
+        INSERT INTO clients_fts(clients_fts, rowid, first_name, last_name, email, phone_digits)
+        VALUES ('delete', {sqlite_fts_values('old')});
+        INSERT INTO clients_fts(rowid, first_name, last_name, email, phone_digits)
+        VALUES ({sqlite_fts_values('new')});
+    END
+    """,
+    f"""
+    INSERT INTO clients_fts(rowid, first_name, last_name, email, phone_digits)
+    SELECT {sqlite_fts_values('clients')} FROM clients
+    """,
+]
+
+# Expression must stay identical to PG_PHONE_DIGITS in insurance/search.py
+POSTGRES_FORWARD = [
+    'DROP INDEX IF EXISTS clients_search_phone_digits',
+    r"""
+    CREATE INDEX clients_search_phone_trgm ON clients
+    USING GIN ((regexp_replace(phone_number, '\D', '', 'g')) gin_trgm_ops)
+    """,
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS clients_search_phone_trgm',
+    client_search.POSTGRES_FORWARD[-1],
+]
+
+
+def trigram_available(connection):
+    # The FTS5 trigram tokenizer ships with SQLite 3.34+
+    return client_search.fts5_available(connection) and connection.Database.sqlite_version_info >= (3, 34, 0)
+
+
+def rebuild_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    elif connection.vendor == 'sqlite':
+        # Without trigrams the prefix-only table is dropped too, so insurance.search matches unindexed
+        statements = client_search.SQLITE_REVERSE + (SQLITE_FORWARD if trigram_available(connection) else [])
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def restore_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for statement in POSTGRES_REVERSE:
+            schema_editor.execute(statement)
+    elif connection.vendor == 'sqlite':
+        for statement in client_search.SQLITE_REVERSE:
+            schema_editor.execute(statement)
+        client_search.create_search_indexes(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_indexes, restore_search_indexes),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 
@@ -52,6 +52,7 @@ class InsuranceCarrier(models.Model):
     website = models.URLField(blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} ({self.code})"
@@ -118,7 +119,18 @@ class InsurancePlan(models.Model):
         unique_together = ['carrier', 'plan_code']
 
 
-class Client(models.Model):
+class RolledUpModel(models.Model):
+    """Rows counted in AgentStats; each save is one transaction so the rollup signals can lock the stored row"""
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class Client(RolledUpModel):
     """Clients managed by insurance agents"""
     agent = models.ForeignKey(InsuranceAgent, on_delete=models.CASCADE, related_name='clients')
     
@@ -164,9 +176,14 @@ class Client(models.Model):
 
     class Meta:
         db_table = 'clients'
+        indexes = [
+            # Keyset pagination on (created_at, id), overall and per agent
+            models.Index(fields=['created_at', 'id'], name='clients_created_id_idx'),
+            models.Index(fields=['agent', 'created_at', 'id'], name='clients_agent_created_idx'),
+        ]
 
 
-class PolicyApplication(models.Model):
+class PolicyApplication(RolledUpModel):
     """Insurance policy applications submitted by agents"""
     agent = models.ForeignKey(InsuranceAgent, on_delete=models.CASCADE, related_name='applications')
     client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name='applications')
@@ -207,9 +224,13 @@ class PolicyApplication(models.Model):
 
     class Meta:
         db_table = 'policy_applications'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='applications_created_id_idx'),
+            models.Index(fields=['agent', 'created_at', 'id'], name='applications_agent_created_idx'),
+        ]
 
 
-class AgentCommission(models.Model):
+class AgentCommission(RolledUpModel):
     """Commission tracking for agents"""
     agent = models.ForeignKey(InsuranceAgent, on_delete=models.CASCADE, related_name='commissions')
     application = models.ForeignKey(PolicyApplication, on_delete=models.CASCADE, related_name='commissions')
@@ -242,12 +263,17 @@ class AgentCommission(models.Model):
     paid_date = models.DateField(null=True, blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.agent.agent_id} - ${self.amount} ({self.commission_type})"
 
     class Meta:
         db_table = 'agent_commissions'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='commissions_created_id_idx'),
+            models.Index(fields=['agent', 'created_at', 'id'], name='commissions_agent_created_idx'),
+        ]
 
 
 class AgentActivity(models.Model):
@@ -276,10 +302,99 @@ class AgentActivity(models.Model):
     scheduled_follow_up = models.DateTimeField(null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.agent.agent_id} - {self.activity_type} - {self.subject}"
 
     class Meta:
         db_table = 'agent_activities'
-        ordering = ['-created_at']
\ No newline at end of file
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='activities_created_id_idx'),
+            models.Index(fields=['agent', 'created_at', 'id'], name='activities_agent_created_idx'),
+        ]
+        ordering = ['-created_at']
+
+
+class AgentDashboardSnapshot(models.Model):
+    """Precomputed AI dashboard summary for an agent"""
+    agent = models.OneToOneField(InsuranceAgent, on_delete=models.CASCADE, related_name='dashboard_snapshot')
+    summary = models.JSONField()
+    context_fingerprint = models.CharField(max_length=64)  # Book-of-business fingerprint the summary was generated for
+    generated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Dashboard snapshot for {self.agent.agent_id} ({self.generated_at:%Y-%m-%d %H:%M})"
+
+    def is_fresh(self, fingerprint, max_age):
+        return (
+            self.context_fingerprint == fingerprint
+            and self.generated_at >= timezone.now() - max_age
+        )
+
+    class Meta:
+        db_table = 'agent_dashboard_snapshots'
+
+
+class AgentStats(models.Model):
+    """Incrementally maintained per-status rollup of an agent's clients, applications and commissions"""
+    agent = models.OneToOneField(InsuranceAgent, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    
+    # Clients by status
+    clients_prospect = models.IntegerField(default=0)
+    clients_active = models.IntegerField(default=0)
+    clients_lapsed = models.IntegerField(default=0)
+    clients_cancelled = models.IntegerField(default=0)
+    
+    # Applications by status
+    applications_draft = models.IntegerField(default=0)
+    applications_submitted = models.IntegerField(default=0)
+    applications_under_review = models.IntegerField(default=0)
+    applications_approved = models.IntegerField(default=0)
+    applications_declined = models.IntegerField(default=0)
+    applications_withdrawn = models.IntegerField(default=0)
+    
+    # Commissions by status
+    commissions_pending = models.IntegerField(default=0)
+    commissions_calculated = models.IntegerField(default=0)
+    commissions_paid = models.IntegerField(default=0)
+    commissions_disputed = models.IntegerField(default=0)
+    commission_amount_pending = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    commission_amount_calculated = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    commission_amount_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    commission_amount_disputed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.agent_id}"
+
+    @property
+    def total_clients(self):
+        return self.clients_prospect + self.clients_active + self.clients_lapsed + self.clients_cancelled
+
+    @property
+    def total_applications(self):
+        return (
+            self.applications_draft + self.applications_submitted + self.applications_under_review
+            + self.applications_approved + self.applications_declined + self.applications_withdrawn
+        )
+
+    @property
+    def pending_applications(self):
+        return self.applications_submitted + self.applications_under_review
+
+    @property
+    def total_commission_amount(self):
+        return (
+            self.commission_amount_pending + self.commission_amount_calculated
+            + self.commission_amount_paid + self.commission_amount_disputed
+        )
+
+    @property
+    def pending_commission_amount(self):
+        return self.commission_amount_pending + self.commission_amount_calculated
+
+    class Meta:
+        db_table = 'agent_stats'
+        verbose_name_plural = 'agent stats'
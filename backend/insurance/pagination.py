@@ -0,0 +1,185 @@
+"""
+Keyset pagination for the large, ever-growing list endpoints
+Pages are addressed by an opaque cursor holding the (created_at, id) of the row at the page
+boundary, so every page is an index range scan with no OFFSET and no COUNT(*); requests with
+?page= (or querysets already ordered, e.g. by search relevance) fall back to page numbers
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PageNumberFallbackPagination(PageNumberPagination):
+    """Numbered pages that honour the same ?page_size= as the keyset pages they stand in for"""
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first pagination on (created_at, id)
+    ?count=exact adds a COUNT(*); ?count=estimate uses planner statistics on PostgreSQL
+    (other databases count exactly). settings.KEYSET_PAGINATION_COUNT sets the default mode
+    """
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+    fallback_class = PageNumberFallbackPagination
+    # Read from page rows to build cursors, so views must not defer them
+    required_fields = ('created_at',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fallback = None
+        if self.use_fallback(queryset, request):
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        self.count, self.count_estimated = self.get_count(queryset, request)
+        cursor, rows = self.keyset_rows(queryset, request)
+        reverse = cursor is not None and cursor[2]
+
+        page = list(rows[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = page
+        return page
+
+    def use_fallback(self, queryset, request):
+        return self.fallback_class.page_query_param in request.query_params or bool(queryset.query.order_by)
+
+    def keyset_rows(self, queryset, request):
+        """Return (cursor, queryset ordered and filtered from the cursor position)"""
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            return cursor, queryset.order_by('-created_at', '-id')
+
+        created_at, pk, reverse = cursor
+        # created_at <= boundary bounds the index range scan; the OR breaks created_at ties by id
+        if reverse:
+            rows = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+            return cursor, rows.filter(created_at__gte=created_at).order_by('created_at', 'id')
+        rows = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        return cursor, rows.filter(created_at__lte=created_at).order_by('-created_at', '-id')
+
+    def window_queryset(self, queryset, request):
+        """
+        Rows the requested page can contain, for conditional GET validators; scanning the page's
+        key range instead of the whole table keeps validation as cheap as the page itself
+        """
+        if self.use_fallback(queryset, request) or self.count_mode(request):
+            return queryset  # page numbers and counts depend on every row
+        _, rows = self.keyset_rows(queryset, request)
+        return queryset.filter(pk__in=rows.values('pk')[:self.get_page_size(request) + 1])
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+
+        body = OrderedDict()
+        if self.count is not None:
+            body['count'] = self.count
+            body['count_estimated'] = self.count_estimated
+        body['next'] = self.get_next_link()
+        body['previous'] = self.get_previous_link()
+        body['results'] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer'},
+                'count_estimated': {'type': 'boolean'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def count_mode(self, request):
+        return request.query_params.get(self.count_query_param, settings.KEYSET_PAGINATION_COUNT)
+
+    def get_count(self, queryset, request):
+        mode = self.count_mode(request)
+        if mode == 'estimate' and connections[queryset.db].vendor == 'postgresql':
+            return estimate_count(queryset), True
+        if mode in ('exact', 'estimate'):
+            return queryset.count(), False
+        return None, False
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.cursor_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.cursor_link(self.page[0], reverse=True)
+
+    def cursor_link(self, row, reverse):
+        # Rows are model instances, or dicts from values() (see insurance/readers.py)
+        created_at, pk = (row['created_at'], row['pk']) if isinstance(row, dict) else (row.created_at, row.pk)
+        position = {'c': created_at.isoformat(), 'i': pk, 'r': reverse}
+        token = base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode().rstrip('=')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            created_at = parse_datetime(position['c'])
+            pk = int(position['i'])
+            reverse = bool(position.get('r'))
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+        # Cursors are only issued with an offset; a naive time is an edited token
+        if created_at is None or (settings.USE_TZ and timezone.is_naive(created_at)):
+            raise ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+        return created_at, pk, reverse
+
+
+def estimate_count(queryset) -> int:
+    """Row estimate from the PostgreSQL planner; no rows are read"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,33 @@
+"""
+Request body parsers
+NDJSONParser reads newline-delimited JSON (one value per line, blank lines ignored) into a list,
+so bulk endpoints accept the same items as a JSON array or as an NDJSON export streamed from a CRM
+"""
+
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            text = stream.read().decode(encoding)
+        except UnicodeDecodeError as exc:
+            raise ParseError(f'NDJSON parse error - {exc}')
+
+        items = []
+        # Only '\n' ends a line: str.splitlines() would also split on U+2028 inside JSON strings
+        for number, line in enumerate(text.split('\n'), 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(f'NDJSON parse error on line {number} - {exc}')
+        return items
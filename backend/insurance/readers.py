@@ -0,0 +1,242 @@
+"""
+Read-only serialization from values() rows
+compile_reader() turns a dynamic serializer, already shaped by ?fields= / ?expand=, into the column
+paths to fetch with values() and one precompiled converter per field, so list pages render without
+model instances or per-field DRF dispatch. Side-loaded relations (normalized responses) are fetched
+in batches of distinct ids into context['included']. The output is identical to serializer.data;
+shapes it cannot reproduce (e.g. a computed field without a <name>_from_values getter) return None
+"""
+
+import decimal
+from operator import itemgetter
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.fields import ISO_8601
+from rest_framework.settings import api_settings
+
+from .serializers import SideloadedField
+
+
+class ValuesReader:
+    """Column paths for values() plus a function building one representation from a values() row"""
+
+    def __init__(self, columns: List[str], build: Callable[[dict], dict], loaders: Iterable['SideloadLoader'] = ()):
+        self.columns = columns
+        self.build = build
+        self.loaders = list(loaders)
+
+    def values(self, queryset, required: Iterable[str] = ()):
+        # pk and the required columns (e.g. keyset cursor positions) are fetched even if not rendered
+        return queryset.prefetch_related(None).values(*dict.fromkeys(['pk', *required, *self.columns]))
+
+    def render(self, rows) -> list:
+        build = self.build
+        results = [build(row) for row in rows]
+        # Side-loaded objects may reference further side-loaded objects; load until none are pending
+        while any(loader.pending for loader in self.loaders):
+            for loader in self.loaders:
+                loader.load()
+        return results
+
+
+class SideloadLoader:
+    """Fetch the related objects a side-loaded relation references, one values() query per batch of ids"""
+
+    def __init__(self, field: SideloadedField, reader: ValuesReader):
+        self.model = field.serializer.Meta.model
+        self.resource_name = field.resource_name
+        self.shape_key = field.shape_key
+        self.included = field.context['included']
+        self.reader = reader
+        self.requested = set()
+        self.pending = []
+
+    def request(self, pk) -> None:
+        if pk not in self.requested:
+            self.requested.add(pk)
+            self.pending.append(pk)
+
+    def load(self) -> None:
+        if not self.pending:
+            return
+        pks, self.pending = self.pending, []
+        rows = {row['pk']: row for row in self.reader.values(self.model._base_manager.filter(pk__in=pks))}
+        for pk in pks:
+            if pk in rows:
+                self.included.add(self.resource_name, self.shape_key, pk, self.reader.build, rows[pk])
+
+
+def compile_reader(serializer) -> Optional[ValuesReader]:
+    columns = []
+    loaders = {}
+    build = _compile(serializer, '', columns, loaders)
+    if build is None:
+        return None
+    return ValuesReader(list(dict.fromkeys(columns)), build, loaders.values())
+
+
+def _sideload_loader(field: SideloadedField, loaders: dict) -> Optional[SideloadLoader]:
+    """One loader per resource and nested shape, shared by every path that side-loads it"""
+    key = (field.resource_name, field.shape_key)
+    if key not in loaders:
+        columns = []
+        build = _compile(field.serializer, '', columns, loaders)
+        if build is None:
+            return None
+        loaders[key] = SideloadLoader(field, ValuesReader(list(dict.fromkeys(columns)), build))
+    return loaders[key]
+
+
+def _compile(serializer, prefix: str, columns: list, loaders: dict) -> Optional[Callable[[dict], dict]]:
+    model = serializer.Meta.model
+    dependencies = getattr(serializer.Meta, 'field_dependencies', {})
+    # Every rendered field reads one column; the dict is built in C from (name, value) pairs and
+    # only fields whose representation differs from the column value are fixed up in Python
+    names: List[str] = []
+    paths: List[str] = []
+    converted: List[Tuple[str, Callable]] = []
+    nested: List[Tuple[str, Callable]] = []
+    sideloaded: List[Tuple[str, SideloadLoader]] = []
+    computed: List[Tuple[str, Callable, Callable]] = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+
+        if isinstance(field, SideloadedField):
+            loader = _sideload_loader(field, loaders)
+            if loader is None:
+                return None
+            # The foreign key column is the rendered value; the object itself is fetched by the loader
+            names.append(name)
+            paths.append(prefix + field.source.replace('.', '__'))
+            sideloaded.append((name, loader))
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            if isinstance(field, serializers.ListSerializer):
+                return None
+            path = prefix + field.source.replace('.', '__') + '__'
+            build_nested = _compile(field, path, columns, loaders)
+            if build_nested is None:
+                return None
+            # A null foreign key renders as None
+            names.append(name)
+            paths.append(path + field.Meta.model._meta.pk.name)
+            nested.append((name, build_nested))
+            continue
+
+        from_values = getattr(serializer, f'{name}_from_values', None)
+        if from_values is not None and name in dependencies:
+            arguments = [prefix + path for path in dependencies[name]]
+            names.append(name)
+            paths.append(arguments[0])
+            columns.extend(arguments)
+            computed.append((name, from_values, _row_getter(arguments)))
+            continue
+
+        if isinstance(field, serializers.SerializerMethodField) or '.' in field.source or field.source == '*':
+            return None
+        if isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField)) and \
+                not isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None
+        try:
+            model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        names.append(name)
+        paths.append(prefix + field.source)
+        convert = _converter(field)
+        if convert is not None:
+            converted.append((name, convert))
+
+    columns.extend(paths)
+    get_values = _row_getter(paths)
+
+    def build(row):
+        representation = dict(zip(names, get_values(row)))
+        for name, convert in converted:
+            value = representation[name]
+            # Serializer.to_representation() renders None without calling the field
+            if value is not None:
+                representation[name] = convert(value)
+        for name, build_nested in nested:
+            if representation[name] is not None:
+                representation[name] = build_nested(row)
+        for name, loader in sideloaded:
+            pk = representation[name]
+            if pk is not None:
+                loader.request(pk)
+        for name, from_values, get_arguments in computed:
+            representation[name] = from_values(*get_arguments(row))
+        return representation
+    return build
+
+
+def _row_getter(paths: List[str]) -> Callable[[dict], tuple]:
+    """Tuple of the values at paths, whatever their number"""
+    if len(paths) > 1:
+        return itemgetter(*paths)
+    if paths:
+        path = paths[0]
+        return lambda row: (row[path],)
+    return lambda row: ()
+
+
+def _converter(field) -> Optional[Callable]:
+    """Equivalent of field.to_representation() for database values; None means the value is used as is"""
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # values('relation') yields the foreign key, as the pk-only optimization renders it
+        return None if field.pk_field is None else field.pk_field.to_representation
+    if isinstance(field, serializers.ChoiceField):
+        choices = field.choice_strings_to_values
+        return lambda value: value if value == '' else choices.get(str(value), value)
+    if isinstance(field, (serializers.CharField, serializers.IntegerField, serializers.ReadOnlyField)):
+        return None
+    if isinstance(field, serializers.JSONField) and not field.binary:
+        return None
+    if isinstance(field, serializers.BooleanField):
+        return bool
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.DateField):
+        if getattr(field, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+            return lambda value: value if isinstance(value, str) else value.isoformat()
+    return field.to_representation
+
+
+def _decimal_converter(field):
+    if field.localize or field.decimal_places is None:
+        return field.to_representation
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        quantized = value.quantize(exponent, rounding=rounding, context=context)
+        return format(quantized, 'f') if coerce_to_string else quantized
+    return convert
+
+
+def _datetime_converter(field):
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT) != ISO_8601:
+        return field.to_representation
+    # The active timezone is fixed for the request the reader is compiled for
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or value.tzinfo is None:
+            return field.to_representation(value)
+        text = value.astimezone(field_timezone).isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return convert
@@ -0,0 +1,45 @@
+"""
+Drop-in replacement for DRF's JSONRenderer backed by orjson
+orjson encodes dicts, lists, strings, numbers, dates and datetimes natively; everything else
+(Decimal, QuerySet, lazy strings, ...) goes through DRF's JSONEncoder.default, so responses
+keep DRF's format: compact separators, UTF-8 output, ISO 8601 dates with 'Z' for UTC and
+escaped U+2028/U+2029. Without orjson, or for indented and non-UTF-8 output, the stock renderer is used
+Floats only differ in exponent notation (1e16 instead of 1e+16) and NaN/Infinity render as null
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    # Same datetime format as JSONEncoder: '+00:00' becomes 'Z'; OPT_NON_STR_KEYS matches json.dumps
+    orjson_options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+    default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=self.orjson_options)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; the stock renderer raises the usual error if it must
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict JavaScript subset, as JSONRenderer does
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
@@ -0,0 +1,184 @@
+"""
+Per-agent statistics rollups
+AgentStats rows hold per-status counts (and commission amounts) for each agent. Model signals
+apply each save/delete as a single F() update that moves the row between buckets, so reads are
+a primary-key lookup; rebuild_agent_stats() recomputes from the raw tables to repair drift
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import InsuranceAgent, Client, PolicyApplication, AgentCommission, AgentStats
+
+
+# Rolled-up model -> (count field prefix, amount field prefix, amount field on the model)
+ROLLUP_MODELS = {
+    Client: ('clients', None, None),
+    PolicyApplication: ('applications', None, None),
+    AgentCommission: ('commissions', 'commission_amount', 'amount'),
+}
+
+STAT_FIELDS = [
+    field.name for field in AgentStats._meta.concrete_fields
+    if field.name not in ('agent', 'updated_at')
+]
+STAT_FIELD_SET = frozenset(STAT_FIELDS)
+
+# (agent_id, status, amount) of one row, as it affects the rollup
+RollupState = Tuple[int, str, Decimal]
+
+
+def rollup_state(model, values) -> Optional[RollupState]:
+    """Rollup contribution of a row given as an instance or a values() dict"""
+    if values is None:
+        return None
+    get = values.get if isinstance(values, dict) else lambda name: getattr(values, name)
+    amount_field = ROLLUP_MODELS[model][2]
+    return get('agent_id'), get('status'), (get(amount_field) or Decimal('0')) if amount_field else Decimal('0')
+
+
+def stored_rollup_state(model, pk) -> Optional[RollupState]:
+    """
+    Rollup contribution of a row as currently stored in the database
+    The row stays locked until the surrounding transaction ends, so a concurrent save cannot move
+    it out of the bucket this state is later subtracted from
+    """
+    amount_field = ROLLUP_MODELS[model][2]
+    fields = ['agent_id', 'status'] + ([amount_field] if amount_field else [])
+    return rollup_state(model, model.objects.select_for_update().filter(pk=pk).values(*fields).first())
+
+
+def apply_rollup_change(model, previous: Optional[RollupState], current: Optional[RollupState]) -> None:
+    """
+    Move one row's contribution from its previous to its current bucket
+    Each agent's change is a single UPDATE, so a status transition never shows up in both buckets
+    """
+    if previous != current:
+        apply_rollup_changes(model, [(previous, current)])
+
+
+def apply_rollup_changes(model, changes: Iterable[Tuple[Optional[RollupState], Optional[RollupState]]]) -> None:
+    """
+    Apply (previous, current) contributions of many rows, e.g. a bulk write, with one UPDATE per agent
+    """
+    count_prefix, amount_prefix, _ = ROLLUP_MODELS[model]
+    deltas = defaultdict(lambda: defaultdict(int))
+    for previous, current in changes:
+        for state, sign in ((previous, -1), (current, 1)):
+            if state is None:
+                continue
+            agent_id, status, amount = state
+            count_field = f'{count_prefix}_{status.lower()}'
+            if count_field not in STAT_FIELD_SET:
+                continue  # status outside the model's choices, as compute_agent_stats() skips it
+            deltas[agent_id][count_field] += sign
+            if amount_prefix:
+                deltas[agent_id][f'{amount_prefix}_{status.lower()}'] += sign * amount
+
+    now = timezone.now()
+    with transaction.atomic():
+        for agent_id, agent_deltas in deltas.items():
+            updates = {field: F(field) + delta for field, delta in agent_deltas.items() if delta}
+            if updates and not AgentStats.objects.filter(agent_id=agent_id).update(updated_at=now, **updates):
+                create_agent_stats_row(agent_id, updates, now)
+
+
+def create_agent_stats_row(agent_id: int, updates: dict, now) -> None:
+    """
+    Build a missing stats row from the raw tables, which already include the change being applied
+    A row created concurrently in the meantime has not seen it, so the delta is applied to that one
+    """
+    values = compute_agent_stats([agent_id]).get(agent_id)
+    if values is None:
+        return  # the agent itself is gone
+    _, created = AgentStats.objects.get_or_create(agent_id=agent_id, defaults=values)
+    if not created:
+        AgentStats.objects.filter(agent_id=agent_id).update(updated_at=now, **updates)
+
+
+def compute_agent_stats(agent_pks: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, object]]:
+    """
+    Recompute rollup values from the raw tables with one grouped query per model
+    Returns {agent pk: {field: value}} for every requested agent, zeros included
+    """
+    agents = InsuranceAgent.objects.all()
+    if agent_pks is not None:
+        agents = agents.filter(pk__in=list(agent_pks))
+
+    stats = {}
+    for pk in agents.values_list('pk', flat=True):
+        stats[pk] = {
+            field: Decimal('0.00') if field.startswith('commission_amount') else 0
+            for field in STAT_FIELDS
+        }
+
+    for model, (count_prefix, amount_prefix, amount_field) in ROLLUP_MODELS.items():
+        rows = model.objects.filter(agent_id__in=list(stats)).order_by().values('agent_id', 'status')
+        aggregates = {'count': Count('id')}
+        if amount_field:
+            aggregates['amount'] = Sum(amount_field)
+        for row in rows.annotate(**aggregates):
+            values = stats[row['agent_id']]
+            count_field = f'{count_prefix}_{row["status"].lower()}'
+            if count_field not in values:
+                continue  # status outside the model's choices
+            values[count_field] = row['count']
+            if amount_prefix:
+                values[f'{amount_prefix}_{row["status"].lower()}'] = row['amount'] or Decimal('0.00')
+
+    return stats
+
+
+def rebuild_agent_stats(agent_pks: Optional[Iterable[int]] = None, dry_run: bool = False) -> Dict[int, Dict[str, tuple]]:
+    """
+    Compare stored rollups with recomputed values and repair any drift
+    Returns {agent pk: {field: (stored, expected)}}; missing rows are reported with stored None
+    """
+    expected = compute_agent_stats(agent_pks)
+    stored = {stats.agent_id: stats for stats in AgentStats.objects.filter(agent_id__in=list(expected))}
+
+    drift = {}
+    to_create = []
+    to_update = []
+    for agent_pk, values in expected.items():
+        stats = stored.get(agent_pk)
+        if stats is None:
+            drift[agent_pk] = {field: (None, value) for field, value in values.items()}
+            to_create.append(AgentStats(agent_id=agent_pk, **values))
+            continue
+
+        changed = {
+            field: (getattr(stats, field), value)
+            for field, value in values.items()
+            if getattr(stats, field) != value
+        }
+        if changed:
+            drift[agent_pk] = changed
+            for field, value in values.items():
+                setattr(stats, field, value)
+            to_update.append(stats)
+
+    if not dry_run:
+        with transaction.atomic():
+            AgentStats.objects.bulk_create(to_create, ignore_conflicts=True)
+            AgentStats.objects.bulk_update(to_update, STAT_FIELDS)
+
+    return drift
+
+
+def get_agent_stats(agent: InsuranceAgent) -> AgentStats:
+    """
+    Return the agent's rollup row (use select_related('stats') to avoid a query), building it if missing
+    """
+    try:
+        return agent.stats
+    except AgentStats.DoesNotExist:
+        rebuild_agent_stats([agent.pk])
+        # Drop the cached miss so the freshly built row is loaded
+        InsuranceAgent.stats.related.delete_cached_value(agent)
+        return agent.stats
@@ -0,0 +1,176 @@
+"""
+Indexed client search
+Every backend matches each search term as a substring of the first name, last name or email, and
+number-like input as a substring of the phone number's digits. PostgreSQL serves those LIKEs from
+trigram indexes (and ranks with the tsvector document); the SQLite fallback uses the trigram-tokenized
+clients_fts FTS5 table kept in sync by triggers. Both are created by migrations 0005_client_search and
+0007_client_search_substrings; without them search falls back to unindexed matching
+"""
+
+import re
+import unicodedata
+from typing import List, NamedTuple
+
+from django.db import connections
+from django.db.models import BooleanField, Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+
+MAX_TERMS = 8
+MIN_PHONE_DIGITS = 3
+
+# Trigram indexes only serve terms of at least this many characters; shorter ones are scanned
+TRIGRAM_LENGTH = 3
+
+# Queries made only of digits and phone punctuation search phone numbers
+PHONE_QUERY = re.compile(r'[\d\s()+.\-]+')
+
+FTS_TABLE = 'clients_fts'
+
+# Must stay identical to the index expressions in migrations 0005 / 0007
+PG_DOCUMENT = (
+    "to_tsvector('simple', coalesce(clients.first_name, '') || ' ' || "
+    "coalesce(clients.last_name, '') || ' ' || coalesce(clients.email, ''))"
+)
+PG_FULL_NAME = "lower(clients.first_name || ' ' || clients.last_name)"
+PG_EMAIL = 'lower(clients.email)'
+PG_PHONE_DIGITS = r"regexp_replace(clients.phone_number, '\D', '', 'g')"
+
+_fts_available = {}
+
+
+class ParsedQuery(NamedTuple):
+    text: str
+    terms: List[str]
+    phone_digits: str
+
+
+def normalize_phone(value: str) -> str:
+    return re.sub(r'\D', '', value or '')
+
+
+def parse_query(query: str) -> ParsedQuery:
+    """Normalize a free-text search into word terms, plus national phone digits for number-like input"""
+    text = unicodedata.normalize('NFKC', query or '').strip().lower()
+    digits = normalize_phone(text)
+    if PHONE_QUERY.fullmatch(text):
+        # Without a +1 country code the digits are a substring of numbers stored with or without one
+        if digits.startswith('1') and (text.startswith('+1') or len(digits) == 11):
+            digits = digits[1:]
+        if len(digits) >= MIN_PHONE_DIGITS:
+            # Bare digits can also be part of an email (e.g. jane.doe2792@...), as they were before indexing
+            return ParsedQuery(text, [text] if text.isdigit() else [], digits)
+    return ParsedQuery(text, re.findall(r'\w+', text)[:MAX_TERMS], '')
+
+
+def fts_available(alias: str) -> bool:
+    if alias not in _fts_available:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_available[alias] = cursor.fetchone() is not None
+    return _fts_available[alias]
+
+
+def search_clients(queryset, query: str):
+    """
+    Filter a Client queryset by a search string, ordered by relevance
+    Every term is substring-matched against names and email, so partial input works for type-ahead
+    and finds everything the old icontains search did; number-like input also matches phone numbers
+    regardless of formatting
+    """
+    parsed = parse_query(query)
+    if not parsed.terms and not parsed.phone_digits:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        queryset = _search_postgres(queryset, parsed)
+    elif vendor == 'sqlite' and fts_available(queryset.db):
+        queryset = _search_sqlite(queryset, parsed)
+    else:
+        queryset = queryset.filter(_unindexed_condition(parsed))
+
+    if parsed.phone_digits:
+        return queryset.order_by('id')
+    if vendor == 'postgresql':
+        return queryset.order_by('-search_rank', 'id')
+    return queryset.annotate(search_rank=_name_rank(parsed.terms)).order_by(
+        '-search_rank', 'last_name', 'first_name', 'id'
+    )
+
+
+def _terms_condition(terms: List[str]) -> Q:
+    condition = Q()
+    for term in terms:
+        condition &= Q(first_name__icontains=term) | Q(last_name__icontains=term) | Q(email__icontains=term)
+    return condition
+
+
+def _unindexed_condition(parsed: ParsedQuery) -> Q:
+    if parsed.phone_digits:
+        # Without a digits index, compare against the stored value as typed
+        condition = Q(phone_number__icontains=parsed.text)
+        return condition | _terms_condition(parsed.terms) if parsed.terms else condition
+    return _terms_condition(parsed.terms)
+
+
+def _fts_match(parsed: ParsedQuery, terms: List[str]) -> str:
+    # Trigram tokens make every phrase a substring match. Terms are \w+ runs and digits, so quoting
+    # them cannot break out of an FTS5 string
+    groups = []
+    if parsed.phone_digits:
+        groups.append(f'phone_digits : "{parsed.phone_digits}"')
+    if terms:
+        groups.append('{first_name last_name email} : (' + ' AND '.join(f'"{term}"' for term in terms) + ')')
+    return ' OR '.join(groups)
+
+
+def _search_sqlite(queryset, parsed: ParsedQuery):
+    indexed = [term for term in parsed.terms if len(term) >= TRIGRAM_LENGTH]
+    short = [term for term in parsed.terms if len(term) < TRIGRAM_LENGTH]
+    if parsed.phone_digits or indexed:
+        # An uncorrelated IN subquery runs the MATCH once; joining clients_fts instead would let SQLite
+        # drive the join from an indexed clients filter (e.g. agent) and re-run the MATCH for every row
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_fts_match(parsed, indexed)])
+        queryset = queryset.filter(id__in=matches)
+    # Trigrams cannot match one- or two-character terms, so those are checked on the matched rows
+    return queryset.filter(_terms_condition(short))
+
+
+def _name_rank(terms: List[str]):
+    """Relevance of a matched row: name prefix hits outrank substring and email-only hits"""
+    score = Value(0)
+    for term in terms:
+        score = score + Case(
+            When(Q(last_name__istartswith=term) | Q(first_name__istartswith=term), then=Value(2)),
+            default=Value(1),
+        )
+    return score
+
+
+def _like_pattern(value: str) -> str:
+    return '%' + value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _search_postgres(queryset, parsed: ParsedQuery):
+    # Each LIKE is served by a trigram index: names and email per term, digits for phone numbers
+    conditions, params = [], []
+    if parsed.terms:
+        conditions.append(' AND '.join(f'({PG_FULL_NAME} LIKE %s OR {PG_EMAIL} LIKE %s)' for _ in parsed.terms))
+        for term in parsed.terms:
+            params += [_like_pattern(term)] * 2
+    if parsed.phone_digits:
+        conditions.append(f'{PG_PHONE_DIGITS} LIKE %s')
+        params.append(_like_pattern(parsed.phone_digits))
+    queryset = queryset.filter(
+        RawSQL(' OR '.join(f'({condition})' for condition in conditions), params, output_field=BooleanField())
+    )
+    if parsed.phone_digits:
+        return queryset
+
+    # Whole-word prefix hits (tsvector) and name similarity rank the substring matches
+    tsquery = ' & '.join(f'{term}:*' for term in parsed.terms)
+    return queryset.annotate(search_rank=RawSQL(
+        f"ts_rank({PG_DOCUMENT}, to_tsquery('simple', %s)) + similarity({PG_FULL_NAME}, %s)",
+        [tsquery, parsed.text], output_field=FloatField(),
+    ))
@@ -1,48 +1,233 @@
+from functools import cached_property
+from typing import Dict, Iterable
+
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
 from .models import (
     InsuranceAgent, InsuranceCarrier, InsurancePlan, Client,
     PolicyApplication, AgentCommission, AgentActivity
 )
 
 
-class UserSerializer(serializers.ModelSerializer):
+def parse_field_paths(value) -> Dict[str, dict]:
+    """Parse a ?fields= / ?expand= value such as 'id,client.first_name' into {'id': {}, 'client': {'first_name': {}}}"""
+    tree = {}
+    for path in (value or '').split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer with sparse fieldsets and opt-in expansion
+    Related objects listed in Meta.expandable_fields render as primary keys unless expanded with
+    ?expand=client,plan.carrier; ?fields=id,status,client.first_name limits the output (a nested
+    field implies expanding its relation). Nested serializers receive the dotted remainder
+    Meta.field_dependencies lists the model fields read by computed fields, for shape_queryset();
+    a <name>_from_values(*dependencies) method lets list pages render the field from values() rows
+    With an IncludedEntities in context['included'] (normalized responses), expanded relations
+    render as primary keys and each related object is side-loaded once under Meta.resource_name
+    """
+
+    def __init__(self, *args, fields: Dict[str, dict] = None, expand: Dict[str, dict] = None,
+                 normalized: bool = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        # Writes validate against the full field set; ?fields= / ?expand= only shape reads
+        if fields is None and expand is None and request is not None and request.method in SAFE_METHODS:
+            fields = parse_field_paths(request.query_params.get('fields'))
+            expand = parse_field_paths(request.query_params.get('expand'))
+        fields = fields or {}
+        expand = expand or {}
+        if normalized is None:
+            normalized = 'included' in self.context
+
+        for name, serializer_class in getattr(self.Meta, 'expandable_fields', {}).items():
+            if name in expand or fields.get(name):
+                serializer = serializer_class(
+                    read_only=True, fields=fields.get(name, {}), expand=expand.get(name, {}), normalized=normalized
+                )
+                self.fields[name] = SideloadedField(serializer) if normalized else serializer
+            else:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+        if fields:
+            for name in list(self.fields):
+                if name not in fields and not self.fields[name].write_only:
+                    self.fields.pop(name)
+
+
+class IncludedEntities:
+    """
+    Related objects side-loaded by one normalized response
+    Each object is rendered once per nested shape; representations of the same object in different
+    shapes (e.g. different ?fields= along two paths) are merged when the response is built
+    """
+
+    def __init__(self):
+        self.entities: Dict[tuple, dict] = {}  # (resource name, shape key) -> {pk: representation}
+
+    def add(self, resource: str, shape: tuple, pk, render, *args) -> None:
+        entities = self.entities.setdefault((resource, shape), {})
+        if pk not in entities:
+            entities[pk] = render(*args)
+
+    @property
+    def collections(self) -> Dict[str, dict]:
+        """{resource name: {pk: representation}}, sorted by name and pk whatever order objects were added in"""
+        collections = {}
+        for (resource, _), entities in sorted(self.entities.items(), key=lambda item: (item[0][0], repr(item[0][1]))):
+            merged = collections.setdefault(resource, {})
+            for pk, representation in entities.items():
+                if pk not in merged:
+                    merged[pk] = dict(representation)
+                    continue
+                for name, value in representation.items():
+                    merged[pk].setdefault(name, value)
+        return {resource: dict(sorted(entities.items())) for resource, entities in sorted(collections.items())}
+
+
+class SideloadedField(serializers.Field):
+    """Render a related object as its primary key and add its nested representation to context['included']"""
+
+    def __init__(self, serializer, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.serializer = serializer
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        # Bound under this field, so the nested serializer shares the root serializer's context
+        self.serializer.bind(field_name, self)
+
+    @property
+    def resource_name(self) -> str:
+        return self.serializer.Meta.resource_name
+
+    @cached_property
+    def shape_key(self) -> tuple:
+        """Identifies what the nested serializer renders, its own side-loaded relations included"""
+        return tuple(
+            (name, field.shape_key if isinstance(field, SideloadedField) else None)
+            for name, field in self.serializer.fields.items() if not field.write_only
+        )
+
+    def to_representation(self, value):
+        self.context['included'].add(
+            self.resource_name, self.shape_key, value.pk, self.serializer.to_representation, value
+        )
+        return value.pk
+
+
+def shape_queryset(queryset, serializer, required: Iterable[str] = ()):
+    """
+    Limit a queryset's joins and columns to what a dynamic serializer will read:
+    select_related() for expanded relations only and only() for the rendered fields;
+    side-loaded relations are prefetched, so each related object is fetched once
+    """
+    columns = set(required)
+    relations = set()
+    prefetches = {}
+    known = _collect_shape(serializer, '', columns, relations, prefetches)
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*sorted(relations))
+    if prefetches:
+        queryset = queryset.prefetch_related(*[
+            Prefetch(lookup, queryset=related) for lookup, related in sorted(prefetches.items())
+        ])
+    # Without a complete column list (an unmapped computed field), load whole rows
+    return queryset.only(*sorted(columns)) if known else queryset
+
+
+def _collect_shape(serializer, prefix: str, columns: set, relations: set, prefetches: dict) -> bool:
+    model = serializer.Meta.model
+    dependencies = getattr(serializer.Meta, 'field_dependencies', {})
+    known = True
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in dependencies:
+            for path in dependencies[name]:
+                columns.add(prefix + path)
+                if '__' in path:
+                    relation = prefix + path.rsplit('__', 1)[0]
+                    relations.add(relation)
+                    columns.add(relation)
+            continue
+
+        source = field.source.replace('.', '__')
+        if isinstance(field, SideloadedField):
+            columns.add(prefix + source)
+            related = field.serializer
+            prefetches[prefix + source] = shape_queryset(related.Meta.model._base_manager.all(), related)
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            relations.add(prefix + source)
+            columns.add(prefix + source)
+            known = _collect_shape(field, f'{prefix}{source}__', columns, relations, prefetches) and known
+            continue
+        try:
+            model._meta.get_field(source)
+        except FieldDoesNotExist:
+            known = False
+            continue
+        columns.add(prefix + source)
+    return known
+
+
+class UserSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = User
+        resource_name = 'users'
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
 
-class InsuranceAgentSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+class InsuranceAgentSerializer(DynamicFieldsModelSerializer):
     full_name = serializers.SerializerMethodField()
 
     class Meta:
         model = InsuranceAgent
+        resource_name = 'agents'
         fields = [
             'id', 'user', 'agent_id', 'license_number', 'agency_name',
             'phone_number', 'email', 'specialties', 'certification_level',
             'active_since', 'is_active', 'full_name'
         ]
+        expandable_fields = {'user': UserSerializer}
+        field_dependencies = {'full_name': ['user__first_name', 'user__last_name']}
 
     def get_full_name(self, obj):
         return obj.user.get_full_name()
 
+    @staticmethod
+    def full_name_from_values(first_name, last_name):
+        # Same as User.get_full_name()
+        return f'{first_name} {last_name}'.strip()
 
-class InsuranceCarrierSerializer(serializers.ModelSerializer):
+
+class InsuranceCarrierSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = InsuranceCarrier
+        resource_name = 'carriers'
         fields = [
             'id', 'name', 'code', 'type', 'contact_phone',
             'website', 'is_active'
         ]
 
 
-class InsurancePlanSerializer(serializers.ModelSerializer):
-    carrier = InsuranceCarrierSerializer(read_only=True)
+class InsurancePlanSerializer(DynamicFieldsModelSerializer):
     carrier_id = serializers.IntegerField(write_only=True)
 
     class Meta:
         model = InsurancePlan
+        resource_name = 'plans'
         fields = [
             'id', 'carrier', 'carrier_id', 'plan_name', 'plan_code', 'plan_type',
             'tier', 'monthly_premium', 'annual_deductible', 'max_out_of_pocket',
@@ -51,66 +236,82 @@ class InsurancePlanSerializer(serializers.ModelSerializer):
             'out_of_network_coverage', 'commission_percentage',
             'effective_date', 'expiration_date', 'is_active'
         ]
+        expandable_fields = {'carrier': InsuranceCarrierSerializer}
 
 
-class ClientSerializer(serializers.ModelSerializer):
-    agent = InsuranceAgentSerializer(read_only=True)
+class ClientSerializer(DynamicFieldsModelSerializer):
     agent_id = serializers.IntegerField(write_only=True)
     full_name = serializers.ReadOnlyField()
 
     class Meta:
         model = Client
+        resource_name = 'clients'
         fields = [
             'id', 'agent', 'agent_id', 'first_name', 'last_name', 'full_name',
             'date_of_birth', 'email', 'phone_number', 'address_line1',
             'address_line2', 'city', 'state', 'zip_code', 'status',
             'first_contact_date', 'last_contact_date'
         ]
+        expandable_fields = {'agent': InsuranceAgentSerializer}
+        field_dependencies = {'full_name': ['first_name', 'last_name']}
+
+    @staticmethod
+    def full_name_from_values(first_name, last_name):
+        # Same as Client.full_name
+        return f'{first_name} {last_name}'
 
 
-class PolicyApplicationSerializer(serializers.ModelSerializer):
-    agent = InsuranceAgentSerializer(read_only=True)
-    client = ClientSerializer(read_only=True)
-    plan = InsurancePlanSerializer(read_only=True)
+class PolicyApplicationSerializer(DynamicFieldsModelSerializer):
     agent_id = serializers.IntegerField(write_only=True)
     client_id = serializers.IntegerField(write_only=True)
     plan_id = serializers.IntegerField(write_only=True)
 
     class Meta:
         model = PolicyApplication
+        resource_name = 'applications'
         fields = [
             'id', 'agent', 'client', 'plan', 'agent_id', 'client_id', 'plan_id',
             'application_number', 'application_date', 'requested_effective_date',
             'status', 'monthly_premium', 'commission_amount', 'notes',
             'submitted_at', 'approved_at', 'declined_reason'
         ]
+        expandable_fields = {
+            'agent': InsuranceAgentSerializer,
+            'client': ClientSerializer,
+            'plan': InsurancePlanSerializer,
+        }
 
 
-class AgentCommissionSerializer(serializers.ModelSerializer):
-    agent = InsuranceAgentSerializer(read_only=True)
-    application = PolicyApplicationSerializer(read_only=True)
-
+class AgentCommissionSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = AgentCommission
+        resource_name = 'commissions'
         fields = [
             'id', 'agent', 'application', 'commission_type', 'amount',
             'percentage', 'pay_period', 'status', 'paid_date', 'notes'
         ]
+        expandable_fields = {
+            'agent': InsuranceAgentSerializer,
+            'application': PolicyApplicationSerializer,
+        }
 
 
-class AgentActivitySerializer(serializers.ModelSerializer):
-    agent = InsuranceAgentSerializer(read_only=True)
-    client = ClientSerializer(read_only=True)
+class AgentActivitySerializer(DynamicFieldsModelSerializer):
     agent_id = serializers.IntegerField(write_only=True)
     client_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
 
     class Meta:
         model = AgentActivity
+        resource_name = 'activities'
         fields = [
             'id', 'agent', 'client', 'agent_id', 'client_id', 'activity_type',
             'subject', 'description', 'outcome', 'next_action',
             'scheduled_follow_up', 'created_at'
         ]
+        expandable_fields = {
+            'agent': InsuranceAgentSerializer,
+            'client': ClientSerializer,
+        }
 
 
 # Simplified serializers for dashboard/summary views
@@ -0,0 +1,107 @@
+"""
+Model signal handlers for the insurance app
+Keep AgentStats rollups, cached agent dashboards and conditional GET validators consistent with
+writes made through the ORM; bulk queryset.update() calls bypass signals, so rollup drift is
+repaired by the rebuild_agent_stats command and cached dashboards expire after AGENT_DASHBOARD_CACHE_TTL
+"""
+
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .dashboard_cache import invalidate_agent_dashboard, invalidate_all_dashboards
+from .models import (
+    InsuranceAgent, InsuranceCarrier, InsurancePlan, Client,
+    PolicyApplication, AgentCommission, AgentActivity, AgentStats
+)
+from .rollups import apply_rollup_change, rollup_state, stored_rollup_state
+
+
+# User fields rendered in agent responses (UserSerializer, agent names)
+AGENT_USER_FIELDS = frozenset({'username', 'first_name', 'last_name', 'email'})
+
+@receiver(pre_save, sender=Client)
+@receiver(pre_save, sender=PolicyApplication)
+@receiver(pre_save, sender=AgentCommission)
+def remember_rollup_state(sender, instance, **kwargs):
+    # RolledUpModel.save() runs in a transaction, so the row stays locked until post_save applies the change
+    instance._rollup_previous = None if instance._state.adding else stored_rollup_state(sender, instance.pk)
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=PolicyApplication)
+@receiver(post_save, sender=AgentCommission)
+def update_rollup_on_save(sender, instance, **kwargs):
+    apply_rollup_change(sender, getattr(instance, '_rollup_previous', None), rollup_state(sender, instance))
+
+
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=PolicyApplication)
+@receiver(post_delete, sender=AgentCommission)
+def update_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    # Deleting an agent cascades to its rows and its stats row; there is nothing left to update
+    if isinstance(origin, InsuranceAgent) or (isinstance(origin, QuerySet) and origin.model is InsuranceAgent):
+        return
+    apply_rollup_change(sender, rollup_state(sender, instance), None)
+
+
+@receiver(post_save, sender=InsuranceAgent)
+def create_agent_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AgentStats.objects.get_or_create(agent=instance)
+
+
+@receiver(pre_save, sender=AgentActivity)
+def remember_previous_agent(sender, instance, **kwargs):
+    # Rolled-up models get the previous agent from remember_rollup_state()
+    instance._previous_agent_id = None if instance._state.adding else (
+        sender.objects.filter(pk=instance.pk).values_list('agent_id', flat=True).first()
+    )
+
+
+@receiver([post_save, post_delete], sender=Client)
+@receiver([post_save, post_delete], sender=PolicyApplication)
+@receiver([post_save, post_delete], sender=AgentCommission)
+@receiver([post_save, post_delete], sender=AgentActivity)
+def invalidate_dashboard_for_agent_row(sender, instance, signal=None, **kwargs):
+    agent_ids = {instance.agent_id}
+    if signal is post_save:
+        # A row reassigned to another agent also leaves the previous agent's dashboard
+        previous = getattr(instance, '_rollup_previous', None)
+        agent_ids.add(previous[0] if previous else getattr(instance, '_previous_agent_id', None))
+    for agent_id in agent_ids - {None}:
+        invalidate_agent_dashboard(agent_id)
+
+
+@receiver([post_save, post_delete], sender=InsuranceAgent)
+def invalidate_dashboard_for_agent(sender, instance, **kwargs):
+    invalidate_agent_dashboard(instance.pk)
+
+
+def agent_user_fields_changed(update_fields) -> bool:
+    # Saves limited to other fields (e.g. last_login on every login) leave agent responses unchanged
+    return update_fields is None or not AGENT_USER_FIELDS.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=User)
+def invalidate_dashboard_for_user(sender, instance, update_fields=None, **kwargs):
+    # Agent names on the dashboard come from the linked user
+    if agent_user_fields_changed(update_fields):
+        for agent_pk in InsuranceAgent.objects.filter(user=instance).values_list('pk', flat=True):
+            invalidate_agent_dashboard(agent_pk)
+
+
+@receiver(post_save, sender=User)
+def touch_agent_for_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    # User has no updated_at; bump the agent's so conditional GET validators see name changes
+    if not raw and agent_user_fields_changed(update_fields):
+        InsuranceAgent.objects.filter(user=instance).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=InsurancePlan)
+@receiver([post_save, post_delete], sender=InsuranceCarrier)
+def invalidate_dashboards_for_catalog(sender, instance, **kwargs):
+    # Plan names appear on every agent's recent applications
+    invalidate_all_dashboards()
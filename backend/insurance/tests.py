@@ -0,0 +1,1520 @@
+import asyncio
+import base64
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import warnings
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.paginator import UnorderedObjectListWarning
+from django.db.models import Q
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from django.utils import timezone
+
+from .ai_cache import LLMResponseCache, SingleFlight, SummaryCache, compute_fingerprints, summary_cache
+from .ai_metrics import MetricsRegistry, PipelineTrace, ai_metrics
+from .ai_context import build_agent_context
+from .benchmark_data import create_benchmark_rows
+from .bulk import after_bulk_write
+from .dashboard_cache import dashboard_cache_key
+from .exports import escape_formula
+from .management.commands.benchmark_ai_dashboard import percentile
+from .management.commands.check_import_time import parse_importtime, total_import_ms
+from .ai_agent import InsuranceAgentAI, _run_llm_stage, get_llm_executor
+from .llm import (
+    CircuitBreaker, Deadline, FakeLLMBackend, LLMBackendError, LLMResponse, LLMUnavailableError, get_llm_backend
+)
+from .pagination import KeysetPagination
+from .models import (
+    AgentActivity, AgentCommission, AgentDashboardSnapshot, AgentStats, Client, InsuranceAgent, InsuranceCarrier,
+    InsurancePlan, PolicyApplication
+)
+from .readers import compile_reader
+from .renderers import FastJSONRenderer
+from .rollups import compute_agent_stats
+from .search import search_clients
+from .serializers import (
+    AgentActivitySerializer, AgentCommissionSerializer, ClientSerializer, InsuranceAgentSerializer,
+    InsuranceCarrierSerializer, InsurancePlanSerializer, PolicyApplicationSerializer, parse_field_paths
+)
+
+
+# Deepest expansion of each serializer, so nested relations are covered too
+AGENT_EXPAND = 'user'
+PLAN_EXPAND = 'carrier'
+CLIENT_EXPAND = 'agent.user'
+APPLICATION_EXPAND = 'agent.user,client.agent.user,plan.carrier'
+COMMISSION_EXPAND = 'agent.user,application.agent.user,application.client.agent.user,application.plan.carrier'
+ACTIVITY_EXPAND = 'agent.user,client.agent.user'
+
+# (label, url name, url kwarg -> benchmark rows key, query params, max queries)
+# Exact counts, including the conditional GET validator query; page-number lists (and relevance-ordered
+# search) add a COUNT(*) and ?shape=normalized one query per side-loaded resource. Keyset lists
+# request their largest page size
+ENDPOINTS = [
+    ('agent list', 'agent_list', {}, {}, 3),
+    ('agent list expanded', 'agent_list', {}, {'expand': AGENT_EXPAND}, 3),
+    ('agent detail', 'agent_detail', {'pk': 'agents'}, {'expand': AGENT_EXPAND}, 2),
+    ('carrier list', 'carrier_list', {}, {}, 3),
+    ('plan list', 'plan_list', {}, {}, 3),
+    ('plan list expanded', 'plan_list', {}, {'expand': PLAN_EXPAND}, 3),
+    ('plan detail', 'plan_detail', {'pk': 'plans'}, {'expand': PLAN_EXPAND}, 2),
+    ('client list', 'client_list', {}, {'page_size': 100}, 2),
+    ('client list expanded', 'client_list', {}, {'page_size': 100, 'expand': CLIENT_EXPAND}, 2),
+    ('client search', 'client_list', {}, {'search': 'client', 'expand': CLIENT_EXPAND}, 3),
+    ('client detail', 'client_detail', {'pk': 'clients'}, {'expand': CLIENT_EXPAND}, 2),
+    ('application list', 'application_list', {}, {'page_size': 100}, 2),
+    ('application list expanded', 'application_list', {}, {'page_size': 100, 'expand': APPLICATION_EXPAND}, 2),
+    ('application list normalized', 'application_list', {},
+     {'page_size': 100, 'expand': APPLICATION_EXPAND, 'shape': 'normalized'}, 7),
+    ('application detail', 'application_detail', {'pk': 'applications'}, {'expand': APPLICATION_EXPAND}, 2),
+    ('commission list', 'commission_list', {}, {'page_size': 100}, 2),
+    ('commission list expanded', 'commission_list', {}, {'page_size': 100, 'expand': COMMISSION_EXPAND}, 2),
+    ('commission list normalized', 'commission_list', {},
+     {'page_size': 100, 'expand': COMMISSION_EXPAND, 'shape': 'normalized'}, 8),
+    ('activity list', 'activity_list', {}, {'page_size': 100}, 2),
+    ('activity list expanded', 'activity_list', {}, {'page_size': 100, 'expand': ACTIVITY_EXPAND}, 2),
+    ('activity list normalized', 'activity_list', {},
+     {'page_size': 100, 'expand': ACTIVITY_EXPAND, 'shape': 'normalized'}, 5),
+    ('agent dashboard', 'agent_dashboard', {'agent_id': 'agents'}, {}, 5),
+    ('commission summary', 'agent_commissions', {'agent_id': 'agents'}, {}, 3),
+]
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError('Timed out waiting for condition')
+        time.sleep(0.001)
+
+
+CLIENT_PAYLOAD = {
+    'first_name': 'Dana', 'last_name': 'Miller', 'date_of_birth': '1958-04-12', 'email': 'dana.miller@email.com',
+    'phone_number': '+1 (555) 279-2001', 'address_line1': '12 Elm St', 'city': 'Springfield', 'state': 'IL',
+    'zip_code': '62701', 'status': 'ACTIVE', 'first_contact_date': '2026-01-05', 'last_contact_date': '2026-02-10',
+}
+
+
+class FieldsOnWritesTests(TestCase):
+    """?fields= shapes responses to reads only; writes always validate the full field set"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rows = create_benchmark_rows(1, prefix='writes')
+        cls.agent = cls.rows['agents'][0]
+
+    def test_create_with_fields(self):
+        response = self.client.post(
+            reverse('client_list') + '?fields=id', {**CLIENT_PAYLOAD, 'agent_id': self.agent.pk},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        client = Client.objects.get(pk=response.json()['id'])
+        self.assertEqual(str(client.date_of_birth), CLIENT_PAYLOAD['date_of_birth'])
+
+    def test_partial_update_with_fields(self):
+        client = self.rows['clients'][0]
+        response = self.client.patch(
+            reverse('client_detail', kwargs={'pk': client.pk}) + '?fields=id', {'city': 'Shelbyville'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        client.refresh_from_db()
+        self.assertEqual(client.city, 'Shelbyville')
+
+    def test_bulk_create_with_fields(self):
+        response = self.client.post(
+            reverse('client_bulk') + '?fields=id', json.dumps([{**CLIENT_PAYLOAD, 'agent_id': self.agent.pk}]),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Client.objects.get(pk=response.json()['ids'][0]).city, 'Springfield')
+
+    def test_reads_still_use_fields(self):
+        client = self.rows['clients'][0]
+        response = self.client.get(reverse('client_detail', kwargs={'pk': client.pk}), {'fields': 'id,city'})
+        self.assertEqual(response.json(), {'id': client.pk, 'city': client.city})
+
+
+class BulkWriteTests(TestCase):
+    """A bulk batch is written whole or not at all, and keeps every touched agent's rollups exact"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rows = create_benchmark_rows(2, prefix='bulk')
+        cls.agent, cls.other_agent = cls.rows['agents']
+
+    def send(self, name, items, method='post'):
+        return getattr(self.client, method)(reverse(name), json.dumps(items), content_type='application/json')
+
+    def application(self, number, **values):
+        client = self.rows['clients'][0]
+        return {
+            'agent_id': client.agent_id, 'client_id': client.pk, 'plan_id': self.rows['plans'][0].pk,
+            'application_number': number, 'application_date': '2026-06-01', 'requested_effective_date': '2026-07-01',
+            'status': 'SUBMITTED', 'monthly_premium': '120.00', **values,
+        }
+
+    def assert_rejected(self, name, items, errors):
+        model = {'client_bulk': Client, 'application_bulk': PolicyApplication}[name]
+        before = model.objects.count()
+        response = self.send(name, items)
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(response.json(), {'count': len(items), 'errors': errors})
+        self.assertEqual(model.objects.count(), before)
+
+    def test_mixed_batch_is_rejected_whole(self):
+        valid = {**CLIENT_PAYLOAD, 'agent_id': self.agent.pk}
+        self.assert_rejected('client_bulk', [valid, {**valid, 'date_of_birth': 'not a date'}, valid], [
+            {'index': 1, 'errors': {'date_of_birth': [
+                'Date has wrong format. Use one of these formats instead: YYYY-MM-DD.'
+            ]}},
+        ])
+
+    def test_unique_conflicts(self):
+        message = 'policy application with this application number already exists.'
+        stored = self.rows['applications'][0].application_number
+        self.assert_rejected('application_bulk', [
+            self.application('BULK-NEW-1'), self.application('BULK-NEW-1'), self.application(stored),
+        ], [
+            {'index': 1, 'errors': {'application_number': [message]}},
+            {'index': 2, 'errors': {'application_number': [message]}},
+        ])
+
+    def test_unknown_foreign_key(self):
+        self.assert_rejected('application_bulk', [self.application('BULK-FK-1', plan_id=999999)], [
+            {'index': 0, 'errors': {'plan_id': ['Invalid pk "999999" - object does not exist.']}},
+        ])
+
+    def test_patch_reassigning_agent_updates_both_rollups(self):
+        client = Client.objects.filter(agent=self.agent).first()
+        expected = {
+            agent.pk: AgentStats.objects.get(agent=agent).total_clients for agent in (self.agent, self.other_agent)
+        }
+        with mock.patch('insurance.bulk.after_bulk_write', wraps=after_bulk_write) as after_write:
+            response = self.send('client_bulk', [{'id': client.pk, 'agent_id': self.other_agent.pk}], method='patch')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(after_write.call_count, 1)
+        self.assertEqual(after_write.call_args.args[2], {self.agent.pk, self.other_agent.pk})
+
+        computed = compute_agent_stats(expected)
+        for agent_pk, total_before in expected.items():
+            with self.subTest(agent=agent_pk):
+                stats = AgentStats.objects.get(agent_id=agent_pk)
+                for field, value in computed[agent_pk].items():
+                    self.assertEqual(getattr(stats, field), value, field)
+                delta = 1 if agent_pk == self.other_agent.pk else -1
+                self.assertEqual(stats.total_clients, total_before + delta)
+
+
+class ListOrderingTests(TestCase):
+    """Page-number lists have a deterministic order, so pages never overlap or skip rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_benchmark_rows(25, prefix='order')  # two pages of PAGE_SIZE 20
+
+    def test_pages_are_ordered(self):
+        for name, key in (('agent_list', 'agent_id'), ('carrier_list', 'name')):
+            with self.subTest(endpoint=name), warnings.catch_warnings():
+                warnings.simplefilter('error', UnorderedObjectListWarning)
+                values = []
+                for page in (1, 2):
+                    response = self.client.get(reverse(name), {'page': page})
+                    values += [row[key] for row in response.json()['results']]
+                self.assertEqual(values, sorted(values))
+                self.assertEqual(len(set(values)), 25)
+
+
+class ExpandTests(TestCase):
+    """Relations render as ids unless ?expand= (or a nested ?fields= path) names them, at any depth"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_benchmark_rows(1, prefix='expand')['applications'][0]
+
+    def get(self, **params):
+        url = reverse('application_detail', kwargs={'pk': self.application.pk})
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_ids_by_default(self):
+        data = self.get()
+        application = self.application
+        self.assertEqual(
+            (data['agent'], data['client'], data['plan']),
+            (application.agent_id, application.client_id, application.plan_id),
+        )
+
+    def test_nested_paths(self):
+        plan = self.application.plan
+        data = self.get(expand='plan')
+        self.assertEqual((data['plan']['id'], data['plan']['carrier']), (plan.pk, plan.carrier_id))
+        self.assertIsInstance(data['client'], int)
+
+        data = self.get(expand='plan.carrier')
+        self.assertEqual(data['plan']['carrier']['code'], plan.carrier.code)
+
+        data = self.get(expand='client.agent.user,plan.carrier')
+        user = data['client']['agent']['user']
+        self.assertEqual(user['username'], self.application.client.agent.user.username)
+        self.assertIsInstance(data['agent'], int)
+
+    def test_nested_fields_imply_expand(self):
+        data = self.get(fields='id,plan.carrier.name')
+        carrier = self.application.plan.carrier
+        self.assertEqual(data, {'id': self.application.pk, 'plan': {'carrier': {'name': carrier.name}}})
+
+    def test_list_endpoint(self):
+        response = self.client.get(reverse('plan_list'), {'expand': 'carrier'})
+        plan = response.json()['results'][0]
+        self.assertEqual(plan['carrier']['id'], InsurancePlan.objects.get(pk=plan['id']).carrier_id)
+
+
+class DashboardCacheTests(TestCase):
+    """Cached dashboards never outlive their data, even when a write is not seen by this process's cache"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rows = create_benchmark_rows(2, prefix='dash')
+        cls.agent, cls.other_agent = cls.rows['agents']
+
+    def setUp(self):
+        cache.clear()
+
+    def get_dashboard(self, agent):
+        response = self.client.get(reverse('agent_dashboard', kwargs={'agent_id': agent.pk}))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_write_missed_by_invalidation(self):
+        client = self.rows['clients'][0]
+        self.assertEqual(self.get_dashboard(self.agent)['recent_clients'][0]['status'], 'ACTIVE')
+        self.assertIsNotNone(cache.get(dashboard_cache_key(self.agent.pk)))
+
+        # queryset.update() skips the signals, like a write handled by another worker process
+        Client.objects.filter(pk=client.pk).update(status='LAPSED', updated_at=timezone.now())
+        self.assertEqual(self.get_dashboard(self.agent)['recent_clients'][0]['status'], 'LAPSED')
+
+    def test_reassignment_invalidates_previous_agent(self):
+        for row in (self.rows['clients'][0], self.rows['activities'][0]):
+            with self.subTest(model=type(row).__name__):
+                self.get_dashboard(self.agent)
+                self.assertIsNotNone(cache.get(dashboard_cache_key(self.agent.pk)))
+                row.agent = self.other_agent
+                row.save()
+                self.assertIsNone(cache.get(dashboard_cache_key(self.agent.pk)))
+                row.agent = self.agent
+                row.save()
+
+
+@override_settings(AI_LLM_RESPONSE_CACHE_PATH='')
+class AIQueryCountTests(TestCase):
+    """The AI context is one query, whatever the size of the agent's book of business"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = create_benchmark_rows(3, prefix='aiq')['agents'][0]
+
+    def setUp(self):
+        summary_cache.invalidate()
+
+    def test_build_agent_context(self):
+        agent = InsuranceAgent.objects.select_related('user').get(pk=self.agent.pk)
+        with self.assertNumQueries(1):
+            build_agent_context(agent)
+
+    def test_ai_dashboard(self):
+        llm = FakeLLMBackend(latency='fixed', latency_ms=0, tokens_per_second=0)
+        url = reverse('agent_ai_dashboard', kwargs={'agent_id': self.agent.agent_id})
+        # Agent lookup, four book-of-business fingerprint aggregates, snapshot lookup and the context
+        with mock.patch('insurance.ai_agent.get_llm_backend', return_value=llm), self.assertNumQueries(7):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('error', response.json()['data'])
+
+
+class AIContextTests(TestCase):
+    """The AI context reports the same application counts as the agent dashboard"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = create_benchmark_rows(1, prefix='context')['agents'][0]
+
+    def test_pending_applications(self):
+        application = PolicyApplication.objects.get(agent=self.agent)
+        for index, status in enumerate(('SUBMITTED', 'UNDER_REVIEW', 'DRAFT')):
+            application.pk = None
+            application.application_number = f'CONTEXT-PENDING-{index}'
+            application.status = status
+            application.save()
+
+        agent = InsuranceAgent.objects.select_related('user').get(pk=self.agent.pk)
+        pending = build_agent_context(agent).pending_applications
+        self.assertEqual(pending, 2)
+        dashboard = self.client.get(reverse('agent_dashboard', kwargs={'agent_id': self.agent.pk})).json()
+        self.assertEqual(dashboard['statistics']['applications']['pending'], pending)
+
+
+@override_settings(AI_LLM_RESPONSE_CACHE_PATH='')
+class AIBatchTests(TestCase):
+    """The batch endpoint rejects malformed requests up front and reports unknown agents in the stream"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agents = create_benchmark_rows(2, prefix='batch')['agents']
+
+    def setUp(self):
+        summary_cache.invalidate()
+
+    def post(self, body):
+        return self.client.post(reverse('agent_ai_dashboard_batch'), body, content_type='application/json')
+
+    def test_invalid_requests(self):
+        agent_ids = [agent.agent_id for agent in self.agents]
+        cases = {
+            'not JSON': ('{"agent_ids": [', 'Request body must be JSON'),
+            'not an object': ('["BATCH00000"]', 'Request body must be a JSON object'),
+            'ids not a list': ('{"agent_ids": "BATCH00000"}', 'agent_ids must be a list of agent IDs'),
+            'ids not strings': ('{"agent_ids": [1, 2]}', 'agent_ids must be a list of agent IDs'),
+            'no selector': ('{}', 'Provide agent_ids or agency_name'),
+            'empty body': ('', 'Provide agent_ids or agency_name'),
+            'too many agents': (json.dumps({'agent_ids': agent_ids}), 'At most 1 agents per batch'),
+        }
+        for name, (body, error) in cases.items():
+            with self.subTest(body=name), self.settings(AI_BATCH_MAX_AGENTS=1):
+                response = self.post(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': error})
+        self.assertEqual(self.client.get(reverse('agent_ai_dashboard_batch')).status_code, 405)
+
+    def test_missing_agents(self):
+        agent = self.agents[0]
+        llm = FakeLLMBackend(latency='fixed', latency_ms=0, tokens_per_second=0)
+        with mock.patch('insurance.ai_agent.get_llm_backend', return_value=llm):
+            response = self.post(json.dumps({'agent_ids': ['NOPE', agent.agent_id, 'NOPE']}))
+            lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        # Unknown ids come first, once each, followed by one line per found agent
+        self.assertEqual(lines[0], {'agent_id': 'NOPE', 'status': 'error', 'error': 'Agent NOPE not found'})
+        self.assertEqual([(line['agent_id'], line['status']) for line in lines[1:]], [(agent.agent_id, 'success')])
+        self.assertTrue(lines[1]['data']['executive_summary'])
+
+
+@override_settings(AI_LLM_RESPONSE_CACHE_PATH='')
+class PrecomputeDashboardsTests(TransactionTestCase):
+    """precompute_ai_dashboards stores a snapshot per active agent and skips snapshots that are still fresh"""
+
+    # Agents are generated on worker threads, whose connections only see committed rows
+    def setUp(self):
+        self.agents = create_benchmark_rows(3, prefix='precompute')['agents']
+        InsuranceAgent.objects.filter(pk=self.agents[2].pk).update(is_active=False)
+        llm = FakeLLMBackend(latency='fixed', latency_ms=0, tokens_per_second=0)
+        patcher = mock.patch('insurance.ai_agent.get_llm_backend', return_value=llm)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def precompute(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('precompute_ai_dashboards', *args, stdout=stdout, stderr=stderr)
+        self.assertEqual(stderr.getvalue(), '')
+        return stdout.getvalue()
+
+    def snapshots(self):
+        return {snapshot.agent_id: snapshot for snapshot in AgentDashboardSnapshot.objects.all()}
+
+    def test_writes_snapshots(self):
+        output = self.precompute('--workers', '2')
+        self.assertIn('Precomputed 2 dashboards, 0 failed, 0 already fresh', output)
+        snapshots = self.snapshots()
+        active = InsuranceAgent.objects.filter(is_active=True)
+        self.assertEqual(set(snapshots), {agent.pk for agent in active})
+        for agent_pk, fingerprint in compute_fingerprints(active).items():
+            with self.subTest(agent=agent_pk):
+                self.assertEqual(snapshots[agent_pk].context_fingerprint, fingerprint)
+                self.assertTrue(snapshots[agent_pk].summary['executive_summary'])
+
+    def test_fresh_snapshots_are_skipped(self):
+        self.precompute()
+        generated_at = {pk: snapshot.generated_at for pk, snapshot in self.snapshots().items()}
+        self.assertIn('Precomputed 0 dashboards, 0 failed, 2 already fresh', self.precompute())
+        self.assertEqual({pk: snapshot.generated_at for pk, snapshot in self.snapshots().items()}, generated_at)
+
+        # A changed book of business or --force regenerates
+        client = Client.objects.filter(agent=self.agents[0]).first()
+        client.city = 'Shelbyville'
+        client.save()
+        self.assertIn('Precomputed 1 dashboards, 0 failed, 1 already fresh', self.precompute())
+        self.assertIn('Precomputed 2 dashboards, 0 failed, 0 already fresh', self.precompute('--force'))
+
+    def test_selected_agents(self):
+        output = self.precompute('--agents', self.agents[1].agent_id)
+        self.assertIn('Precomputed 1 dashboards', output)
+        self.assertEqual(set(self.snapshots()), {self.agents[1].pk})
+
+
+@override_settings(AI_LLM_RESPONSE_CACHE_PATH='', AI_GENERATION_MODE='parallel')
+class LLMExecutorTests(TestCase):
+    """LLM stages share one bounded pool, run side by side and release their DB connections"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = create_benchmark_rows(1, prefix='executor')['agents'][0]
+
+    @override_settings(AI_LLM_MAX_CONCURRENCY=3)
+    def test_pool_is_sized_by_setting(self):
+        with mock.patch('insurance.ai_agent._llm_executor', None):
+            executor = get_llm_executor()
+            self.addCleanup(executor.shutdown)
+            self.assertEqual(executor._max_workers, 3)
+            self.assertIs(get_llm_executor(), executor)
+
+    def test_stage_releases_connections(self):
+        with mock.patch('insurance.ai_agent.connections') as connections:
+            self.assertEqual(_run_llm_stage(lambda value: value * 2, 21), 42)
+            self.assertEqual(connections.close_all.call_count, 1)
+            with self.assertRaises(ZeroDivisionError):
+                _run_llm_stage(lambda value: value / 0, 21)
+            self.assertEqual(connections.close_all.call_count, 2)
+
+    def test_stages_run_concurrently(self):
+        # Three 200 ms calls take about one call's time, not three
+        assistant = InsuranceAgentAI(llm=FakeLLMBackend(latency='fixed', latency_ms=200, tokens_per_second=0))
+        assistant.breaker = CircuitBreaker()
+        agent = InsuranceAgent.objects.select_related('user').get(pk=self.agent.pk)
+        started = time.monotonic()
+        assistant.generate_summary_for_agent(agent)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(
+            sorted(stage['name'] for stage in assistant.trace.stages if stage['name'].startswith('llm')),
+            ['llm_executive_summary', 'llm_insights', 'llm_recommendations'],
+        )
+
+
+class LazyLLMTests(SimpleTestCase):
+    """The LLM backend is built once, on first use, and no provider SDK is imported at startup"""
+
+    def test_backend_built_once_on_first_use(self):
+        backend = FakeLLMBackend()
+        with mock.patch.multiple('insurance.llm', _llm_backend=None, _llm_backend_loaded=False), \
+                mock.patch('insurance.llm.build_llm_backend', return_value=backend) as build:
+            build.assert_not_called()
+            self.assertIs(get_llm_backend(), backend)
+            self.assertIs(get_llm_backend(), backend)
+        self.assertEqual(build.call_count, 1)
+
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     encodings.utf_8\n'
+            'import time:       300 |        420 |   encodings\n'
+            'import time:      1500 |       2000 | django\n'
+            'unrelated line\n'
+            'import time:       800 |        800 | groq\n'
+        )
+        rows = parse_importtime(output)
+        self.assertEqual(rows, [
+            ('encodings.utf_8', 120, 120, 2), ('encodings', 300, 420, 1),
+            ('django', 1500, 2000, 0), ('groq', 800, 800, 0),
+        ])
+        self.assertEqual(total_import_ms(rows), 2.8)
+
+    def test_cold_start_skips_llm_modules(self):
+        # Fails with CommandError if a module in LAZY_MODULES is imported while booting a worker
+        stdout = io.StringIO()
+        call_command('check_import_time', '--runs', '1', '--budget-ms', '60000', stdout=stdout)
+        self.assertIn('Import time within budget', stdout.getvalue())
+
+
+@override_settings(AI_LLM_RESPONSE_CACHE_PATH='', AI_GENERATION_MODE='parallel')
+class ServerTimingTests(TestCase):
+    """AI responses carry per-stage Server-Timing entries, with repeated stages summed"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = create_benchmark_rows(1, prefix='timing')['agents'][0]
+
+    def setUp(self):
+        summary_cache.invalidate()
+
+    def test_header_format(self):
+        trace = PipelineTrace(registry=MetricsRegistry())
+        trace.stages = [
+            {'name': 'parse', 'duration_ms': 1.25, 'queries': 0},
+            {'name': 'context', 'duration_ms': 4.0, 'queries': 1},
+            {'name': 'parse', 'duration_ms': 0.5, 'queries': 0},
+        ]
+        trace.record_source('generated')
+        trace.record_fallback('recommendations', 'invalid LLM response')
+        trace.record_fallback('insights', 'timeout')
+        entries = trace.server_timing().split(', ')
+        self.assertEqual(entries[:2], ['parse;dur=1.8', 'context;dur=4.0'])
+        self.assertRegex(entries[2], r'^total;dur=\d+\.\d$')
+        self.assertEqual(entries[3:], ['source;desc="generated"', 'fallback;desc="insights recommendations"'])
+
+    def test_ai_dashboard_header(self):
+        llm = FakeLLMBackend(latency='fixed', latency_ms=0, tokens_per_second=0)
+        url = reverse('agent_ai_dashboard', kwargs={'agent_id': self.agent.agent_id})
+        with mock.patch('insurance.ai_agent.get_llm_backend', return_value=llm):
+            response = self.client.get(url)
+        names = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        for name in ('lookup', 'context', 'prompt', 'llm_insights', 'llm_recommendations', 'llm_executive_summary',
+                     'assemble', 'total', 'source'):
+            with self.subTest(stage=name):
+                self.assertIn(name, names)
+
+
+class AIStreamTests(TestCase):
+    """Every SSE stream records its request duration, including streams that end early"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = create_benchmark_rows(1, prefix='sse')['agents'][0]
+
+    def stream(self, agent_id):
+        url = reverse('agent_ai_dashboard_stream', kwargs={'agent_id': agent_id})
+        response = self.client.get(url)
+        return [line for line in b''.join(response.streaming_content).decode().splitlines() if line.startswith('event:')]
+
+    def finished_requests(self):
+        return ai_metrics.snapshot()['histograms'].get('request.duration_ms', {}).get('count', 0)
+
+    def test_agent_not_found(self):
+        before = self.finished_requests()
+        self.assertEqual(self.stream('NOPE404'), ['event: error'])
+        self.assertEqual(self.finished_requests(), before + 1)
+
+    @override_settings(AI_LLM_RESPONSE_CACHE_PATH='')
+    def test_generated_and_cached(self):
+        summary_cache.invalidate()
+        llm = FakeLLMBackend(latency='fixed', latency_ms=0, tokens_per_second=0)
+        with mock.patch('insurance.ai_agent.get_llm_backend', return_value=llm):
+            for source in ('generated', 'cached'):
+                with self.subTest(source=source):
+                    before = self.finished_requests()
+                    self.assertEqual(self.stream(self.agent.agent_id)[-1], 'event: done')
+                    self.assertEqual(self.finished_requests(), before + 1)
+
+
+class ClientSearchTests(TestCase):
+    """Indexed search finds every client the original icontains search did, on every backend path"""
+
+    @classmethod
+    def setUpTestData(cls):
+        agent = create_benchmark_rows(1, prefix='search')['agents'][0]
+        people = [
+            ('Dana', 'Miller', 'dana.miller2792@email.com', '+1 (555) 279-2001'),
+            ('Camille', 'Rodriguez', 'crod@mail.net', '555.279.2001'),
+            ('Ed', 'Hill', 'ed.hill@inbox.org', '+1-312-555-0199'),
+            ('Maria', 'Smith', 'maria@example.com', '(773) 555-4827'),
+        ]
+        for first_name, last_name, email, phone_number in people:
+            Client.objects.create(**{
+                **CLIENT_PAYLOAD, 'agent': agent, 'first_name': first_name, 'last_name': last_name,
+                'email': email, 'phone_number': phone_number,
+            })
+
+    def search(self, query):
+        return set(search_clients(Client.objects.all(), query).values_list('last_name', flat=True))
+
+    def baseline(self, query):
+        return set(Client.objects.filter(
+            Q(first_name__icontains=query) | Q(last_name__icontains=query) | Q(email__icontains=query)
+        ).values_list('last_name', flat=True))
+
+    def for_each_backend(self):
+        yield 'fts'
+        with mock.patch('insurance.search.fts_available', return_value=False):
+            yield 'unindexed'
+
+    def test_baseline_matches(self):
+        for backend in self.for_each_backend():
+            for query in ('iller', 'MILL', 'ill', '2792', 'ed', 'mi', 'dana.miller2792@email.com', 'email.com'):
+                with self.subTest(backend=backend, query=query):
+                    expected = self.baseline(query)
+                    self.assertTrue(expected)
+                    # Number-like queries may add phone matches on top
+                    self.assertEqual(expected - self.search(query), set())
+
+    def test_terms_match_across_fields(self):
+        for backend in self.for_each_backend():
+            with self.subTest(backend=backend):
+                self.assertEqual(self.search('dana mill'), {'Miller'})
+                self.assertEqual(self.search('ria ex'), {'Smith'})
+
+    def test_phone_numbers(self):
+        # The fallback compares the stored value as typed, so formatted queries are indexed-only
+        cases = [
+            ('555-279-2001', {'Miller', 'Rodriguez'}),
+            ('+1 555 279 2001', {'Miller', 'Rodriguez'}),
+            ('15552792001', {'Miller', 'Rodriguez'}),
+            ('2792001', {'Miller', 'Rodriguez'}),
+            ('279-2001', {'Miller', 'Rodriguez'}),
+            ('4827', {'Smith'}),
+            ('2792', {'Miller', 'Rodriguez'}),
+        ]
+        for query, expected in cases:
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query), expected)
+
+
+class RollupTests(TestCase):
+    """Signal-maintained AgentStats stay equal to a recompute from the raw tables"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rows = create_benchmark_rows(1, prefix='rollup')
+        cls.agent = cls.rows['agents'][0]
+
+    def assert_rollup_exact(self):
+        stats = AgentStats.objects.get(agent=self.agent)
+        for field, value in compute_agent_stats([self.agent.pk])[self.agent.pk].items():
+            self.assertEqual(getattr(stats, field), value, field)
+
+    def test_status_outside_choices(self):
+        # Model saves skip choice validation; such rows have no bucket and are left out of the rollup
+        client = self.rows['clients'][0]
+        for status in ('ARCHIVED', 'ACTIVE'):
+            with self.subTest(status=status):
+                client.status = status
+                client.save()
+                self.assert_rollup_exact()
+        Client.objects.create(**{**CLIENT_PAYLOAD, 'agent': self.agent, 'status': 'ARCHIVED'}).delete()
+        self.assert_rollup_exact()
+
+    def test_missing_stats_row_is_created(self):
+        # A row lost to e.g. a manual delete is rebuilt by the next write, not skipped
+        client = self.rows['clients'][0]
+        for status in ('LAPSED', 'ACTIVE'):
+            with self.subTest(status=status):
+                AgentStats.objects.filter(agent=self.agent).delete()
+                client.status = status
+                client.save()
+                self.assert_rollup_exact()
+
+    def test_migration_builds_exact_rows(self):
+        # 0003 uses a frozen aggregation on historical models; it must still agree with the live one
+        AgentStats.objects.all().delete()
+        import_module('insurance.migrations.0003_agent_stats').build_agent_stats(django_apps, None)
+        self.assert_rollup_exact()
+
+
+class AgentUserTouchTests(TestCase):
+    """User saves bump the agent's validators only when fields rendered for the agent change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = create_benchmark_rows(1, prefix='touch')['agents'][0]
+
+    def agent_updated_at(self):
+        return InsuranceAgent.objects.values_list('updated_at', flat=True).get(pk=self.agent.pk)
+
+    def test_last_login_save_skips_agent(self):
+        before = self.agent_updated_at()
+        user = self.agent.user
+        user.last_login = timezone.now()
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
+        self.assertEqual(self.agent_updated_at(), before)
+
+    def test_name_change_touches_agent(self):
+        before = self.agent_updated_at()
+        user = self.agent.user
+        for update_fields in (['first_name'], None):
+            with self.subTest(update_fields=update_fields):
+                user.first_name = f'Renamed{update_fields}'
+                user.save(update_fields=update_fields)
+                self.assertGreater(self.agent_updated_at(), before)
+                before = self.agent_updated_at()
+
+
+class ExportTests(TestCase):
+    """CSV exports cannot smuggle spreadsheet formulas; NDJSON keeps values verbatim"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rows = create_benchmark_rows(1, prefix='export')
+        cls.activity = rows['activities'][0]
+        AgentActivity.objects.filter(pk=cls.activity.pk).update(
+            subject='=HYPERLINK("http://evil.example","click")', description='@SUM(1+1)',
+            outcome='-2+3', next_action='+cmd|" /C calc"!A0',
+        )
+
+    def export(self, export_format):
+        response = self.client.get(reverse('activity_export'), {'format': export_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_formulas_are_quoted(self):
+        row = next(csv.DictReader(io.StringIO(self.export('csv'))))
+        self.assertEqual(row['subject'], '\'=HYPERLINK("http://evil.example","click")')
+        self.assertEqual(row['description'], "'@SUM(1+1)")
+        self.assertEqual(row['outcome'], "'-2+3")
+        self.assertEqual(row['next_action'], '\'+cmd|" /C calc"!A0')
+        self.assertEqual(row['id'], str(self.activity.pk))
+
+    def test_csv_numbers_stay_numeric(self):
+        for value in ('-12.50', '+3', '-7'):
+            with self.subTest(value=value):
+                self.assertEqual(escape_formula(value), value)
+
+    def test_ndjson_is_verbatim(self):
+        row = json.loads(self.export('ndjson').splitlines()[0])
+        self.assertEqual(row['description'], '@SUM(1+1)')
+
+
+class ReaderParityTests(TestCase):
+    """The values() reader renders the same JSON as the serializer over model instances, for every list shape"""
+
+    # (model, serializer, ?fields=, ?expand=) per list endpoint
+    SHAPES = [
+        (InsuranceAgent, InsuranceAgentSerializer, '', ''),
+        (InsuranceAgent, InsuranceAgentSerializer, '', AGENT_EXPAND),
+        (InsuranceAgent, InsuranceAgentSerializer, 'id,full_name,user.email', ''),
+        (InsuranceCarrier, InsuranceCarrierSerializer, '', ''),
+        (InsuranceCarrier, InsuranceCarrierSerializer, 'id,code', ''),
+        (InsurancePlan, InsurancePlanSerializer, '', ''),
+        (InsurancePlan, InsurancePlanSerializer, '', PLAN_EXPAND),
+        (InsurancePlan, InsurancePlanSerializer, 'id,monthly_premium,carrier.name', ''),
+        (Client, ClientSerializer, '', ''),
+        (Client, ClientSerializer, '', CLIENT_EXPAND),
+        (Client, ClientSerializer, 'id,full_name,agent.full_name,agent.user.username', ''),
+        (PolicyApplication, PolicyApplicationSerializer, '', ''),
+        (PolicyApplication, PolicyApplicationSerializer, '', APPLICATION_EXPAND),
+        (PolicyApplication, PolicyApplicationSerializer, 'id,status,client.full_name,plan.carrier.code', 'agent'),
+        (AgentCommission, AgentCommissionSerializer, '', ''),
+        (AgentCommission, AgentCommissionSerializer, '', COMMISSION_EXPAND),
+        (AgentCommission, AgentCommissionSerializer, 'id,amount,application.client.agent.full_name', ''),
+        (AgentActivity, AgentActivitySerializer, '', ''),
+        (AgentActivity, AgentActivitySerializer, '', ACTIVITY_EXPAND),
+        (AgentActivity, AgentActivitySerializer, 'id,created_at,client.full_name,agent.user', ''),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        rows = create_benchmark_rows(3, prefix='parity')
+        # Values the converters special-case: a blank first name, null dates and relations, timestamps
+        agent = rows['agents'][0]
+        agent.user.first_name = ''
+        agent.user.save()
+        PolicyApplication.objects.filter(pk=rows['applications'][0].pk).update(
+            submitted_at=timezone.now(), approved_at=None
+        )
+        AgentActivity.objects.create(agent=agent, client=None, activity_type='EMAIL', subject='No client')
+        AgentCommission.objects.filter(pk=rows['commissions'][0].pk).update(paid_date=timezone.now().date())
+
+    def test_reader_matches_serializer(self):
+        renderer = JSONRenderer()
+        for model, serializer_class, fields, expand in self.SHAPES:
+            with self.subTest(model=model.__name__, fields=fields, expand=expand):
+                shape = {'fields': parse_field_paths(fields), 'expand': parse_field_paths(expand)}
+                reader = compile_reader(serializer_class(**shape))
+                self.assertIsNotNone(reader)
+                queryset = model.objects.order_by('pk')
+                expected = serializer_class(list(queryset), many=True, **shape).data
+                self.assertEqual(renderer.render(reader.render(reader.values(queryset))), renderer.render(expected))
+
+    def test_list_endpoints_render_serializer_output(self):
+        urls = {
+            InsuranceAgent: 'agent_list', InsuranceCarrier: 'carrier_list', InsurancePlan: 'plan_list',
+            Client: 'client_list', PolicyApplication: 'application_list', AgentCommission: 'commission_list',
+            AgentActivity: 'activity_list',
+        }
+        for model, serializer_class, fields, expand in self.SHAPES:
+            with self.subTest(model=model.__name__, fields=fields, expand=expand):
+                response = self.client.get(reverse(urls[model]), {'fields': fields, 'expand': expand, 'page_size': 100})
+                self.assertEqual(response.status_code, 200)
+                results = response.json()['results']
+                instances = model._base_manager.in_bulk([row['id'] for row in results])
+                expected = serializer_class(
+                    [instances[row['id']] for row in results], many=True,
+                    fields=parse_field_paths(fields), expand=parse_field_paths(expand),
+                ).data
+                self.assertEqual(results, json.loads(JSONRenderer().render(expected)))
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages cover every row exactly once in both directions, ties on created_at included"""
+
+    @classmethod
+    def setUpTestData(cls):
+        agent = create_benchmark_rows(1, prefix='keyset')['agents'][0]
+        AgentActivity.objects.bulk_create([
+            AgentActivity(agent=agent, activity_type='NOTE', subject=f'Note {index}') for index in range(11)
+        ])
+        # Half the rows share one timestamp, so page boundaries fall inside a created_at tie
+        tied = AgentActivity.objects.order_by('id').values_list('pk', flat=True)[:6]
+        AgentActivity.objects.filter(pk__in=list(tied)).update(created_at=timezone.now())
+        cls.expected = list(AgentActivity.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def walk(self, url, link, params=None):
+        """Ids of every page followed through the next or previous links, in page order"""
+        pages = []
+        while url:
+            body = self.get(url, params)
+            pages.append([row['id'] for row in body['results']])
+            url, params = body[link], None
+        return pages
+
+    def test_next_and_previous_cover_every_row(self):
+        forward = self.walk(reverse('activity_list'), 'next', {'page_size': 3, 'fields': 'id'})
+        self.assertEqual([pk for page in forward for pk in page], self.expected)
+        self.assertTrue(all(len(page) == 3 for page in forward[:-1]))
+
+        # From the last page back to the first
+        last = self.get(reverse('activity_list'), {'page_size': 3, 'fields': 'id'})
+        while last['next']:
+            url, last = last['next'], self.get(last['next'])
+        backward = self.walk(url, 'previous')
+        self.assertEqual(backward, forward[::-1])
+
+    def test_cursor_round_trip(self):
+        paginator = KeysetPagination()
+        paginator.request = RequestFactory().get('/api/activities/')
+        row = AgentActivity.objects.get(pk=self.expected[4])
+        for reverse_direction in (False, True):
+            with self.subTest(reverse=reverse_direction):
+                link = paginator.cursor_link(row, reverse=reverse_direction)
+                request = RequestFactory().get(link)
+                request.query_params = request.GET
+                self.assertEqual(paginator.decode_cursor(request), (row.created_at, row.pk, reverse_direction))
+
+    def test_invalid_cursor(self):
+        def token(position):
+            return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+        cursors = {
+            'not base64': '!!!',
+            'not json': base64.urlsafe_b64encode(b'created').decode(),
+            'not an object': token([1, 2]),
+            'missing id': token({'c': '2026-01-01T00:00:00+00:00'}),
+            'bad id': token({'c': '2026-01-01T00:00:00+00:00', 'i': 'x'}),
+            'bad time': token({'c': 'yesterday', 'i': 1}),
+            'naive time': token({'c': '2026-01-01T00:00:00', 'i': 1}),
+        }
+        for label, cursor in cursors.items():
+            with self.subTest(label):
+                response = self.client.get(reverse('activity_list'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'cursor': ['Invalid cursor']})
+
+    def test_count(self):
+        url = reverse('activity_list')
+        self.assertNotIn('count', self.get(url))
+        self.assertEqual(self.get(url, {'count': 'exact'})['count'], len(self.expected))
+        # SQLite has no planner estimate and counts exactly
+        self.assertEqual(self.get(url, {'count': 'estimate'})['count'], len(self.expected))
+        with override_settings(KEYSET_PAGINATION_COUNT='exact'):
+            self.assertEqual(self.get(url)['count'], len(self.expected))
+
+    def test_page_number_fallback(self):
+        body = self.get(reverse('activity_list'), {'page': 2, 'page_size': 5, 'fields': 'id'})
+        self.assertEqual(body['count'], len(self.expected))
+        self.assertEqual([row['id'] for row in body['results']], self.expected[5:10])
+        self.assertIn('page=3', body['next'])
+        self.assertIn('page_size=5', body['previous'])
+
+
+class FakeLLMBackendTests(SimpleTestCase):
+    """The offline model answers by prompt, fails and waits as configured, and reproduces runs by seed"""
+
+    def backend(self, **kwargs):
+        return FakeLLMBackend(**{'latency': 'fixed', 'latency_ms': 0, 'tokens_per_second': 0, **kwargs})
+
+    def test_responses_match_prompt(self):
+        backend = self.backend(responses=[('custom needle', 'custom answer')])
+        self.assertEqual(backend.invoke('a custom needle prompt').content, 'custom answer')
+        self.assertEqual(backend.invoke('nothing to match').content, 'No analysis available.')
+        # Combined prompts name the "executive_summary" key and get the full JSON document
+        self.assertEqual(set(json.loads(backend.invoke('{"executive_summary": ...}').content)),
+                         {'insights', 'recommendations', 'executive_summary'})
+        response = backend.invoke('one two three insights')
+        self.assertEqual(response.usage['input_tokens'], 4)
+        self.assertEqual(response.usage['total_tokens'], 4 + len(response.content.split()))
+        self.assertEqual(''.join(chunk.content for chunk in backend.stream('insights')).split(),
+                         response.content.split())
+
+    def test_error_rate(self):
+        with self.assertRaises(LLMBackendError):
+            self.backend(error_rate=1).invoke('insights')
+        self.assertTrue(self.backend(error_rate=0).invoke('insights').content)
+
+    def test_latency_distributions(self):
+        self.assertEqual(self.backend(latency_ms=250)._first_token_delay(), 0.25)
+        self.assertEqual(self.backend(tokens_per_second=4)._token_delay(), 0.25)
+        for latency in ('uniform', 'normal', 'lognormal'):
+            with self.subTest(latency=latency):
+                delays = [self.backend(latency=latency, latency_ms=100, seed=7)._first_token_delay() for _ in range(2)]
+                self.assertEqual(delays[0], delays[1])  # same seed, same run
+                samples = [self.backend(latency=latency, latency_ms=100, seed=seed)._first_token_delay()
+                           for seed in range(400)]
+                self.assertTrue(all(delay >= 0 for delay in samples))
+                self.assertAlmostEqual(sum(samples) / len(samples), 0.1, delta=0.01)
+        with self.assertRaises(ValueError):
+            FakeLLMBackend(latency='pareto')
+
+    def test_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual([percentile(values, pct) for pct in (50, 95, 99, 100)], [50.0, 95.0, 99.0, 100.0])
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+class CircuitBreakerTests(TestCase):
+    """closed -> open after N failures -> one half-open probe -> closed, or open again"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, slow_call_seconds=5, reset_timeout=30, clock=self.clock)
+
+    def trip(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+    def test_trips_after_consecutive_failures(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.breaker.record_success(0.1)  # a success resets the streak
+        self.assertEqual(self.breaker.stats()['consecutive_failures'], 0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        self.trip()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.stats()['trips'], 1)
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+    def test_slow_calls_count_as_failures(self):
+        for _ in range(3):
+            self.breaker.record_success(5)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.stats()['slow_calls'], 3)
+
+    def test_half_open_probe_success_closes(self):
+        self.trip()
+        self.clock.advance(29.9)
+        self.assertFalse(self.breaker.allow())
+        self.clock.advance(0.1)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(self.breaker.allow())  # one probe at a time
+
+        self.breaker.record_success(0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.stats()['recoveries'], 1)
+
+    def test_half_open_probe_failure_reopens(self):
+        self.trip()
+        self.clock.advance(30)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.stats()['trips'], 2)
+
+        # The reset timeout restarts from the failed probe
+        self.clock.advance(29)
+        self.assertFalse(self.breaker.allow())
+        self.clock.advance(1)
+        self.assertTrue(self.breaker.allow())
+
+
+@override_settings(AI_LLM_RESPONSE_CACHE_PATH='', AI_GENERATION_MODE='parallel')
+class DeadlineTests(TestCase):
+    """One budget is shared by every LLM stage of a request; spending it falls back without waiting"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = create_benchmark_rows(1, prefix='deadline')['agents'][0]
+
+    def test_budget_arithmetic(self):
+        clock = FakeClock()
+        deadline = Deadline(5, clock=clock)
+        self.assertEqual(deadline.remaining(), 5)
+        clock.advance(2)
+        self.assertEqual(deadline.remaining(), 3)
+        self.assertFalse(deadline.expired)
+        clock.advance(4)
+        self.assertEqual(deadline.remaining(), 0)
+        self.assertTrue(deadline.expired)
+
+    def test_spent_budget_skips_the_call(self):
+        clock = FakeClock()
+        llm = mock.Mock(spec=FakeLLMBackend, name='llm')
+        assistant = InsuranceAgentAI(llm=llm)
+        assistant.breaker = CircuitBreaker()
+        assistant.deadline = Deadline(1, clock=clock)
+        clock.advance(1)
+        with self.assertRaises(LLMUnavailableError):
+            assistant._invoke_llm('prompt')
+        llm.invoke.assert_not_called()
+
+    @override_settings(AI_REQUEST_BUDGET_SECONDS=0.2)
+    def test_slow_llm_falls_back_at_the_deadline(self):
+        assistant = InsuranceAgentAI(llm=FakeLLMBackend(latency='fixed', latency_ms=1000, tokens_per_second=0))
+        assistant.breaker = CircuitBreaker()
+        agent = InsuranceAgent.objects.select_related('user').get(pk=self.agent.pk)
+        started = time.monotonic()
+        summary = assistant.generate_summary_for_agent(agent)
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertTrue(summary['executive_summary'])
+        self.assertEqual(
+            {(fallback['section'], fallback['reason']) for fallback in assistant.trace.fallbacks},
+            {(section, 'deadline budget spent') for section in ('insights', 'recommendations', 'executive_summary')},
+        )
+
+
+@override_settings(AI_LLM_RESPONSE_CACHE_PATH='', AI_GENERATION_MODE='combined')
+class CombinedResponseTests(TestCase):
+    """A combined-mode reply is parsed leniently and each section falls back on its own"""
+
+    INSIGHT = {
+        'type': 'portfolio', 'title': 'Healthy book', 'insight': 'Most clients are active.',
+        'metric': '80% active', 'recommendation': 'Keep it up',
+    }
+    RECOMMENDATION = {
+        'type': 'growth', 'priority': 'High', 'action': 'Call lapsed clients',
+        'description': 'Reach out this week.', 'expected_impact': 'Fewer lapses',
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = create_benchmark_rows(1, prefix='combined')['agents'][0]
+
+    def assistant(self, reply=''):
+        llm = FakeLLMBackend(latency='fixed', latency_ms=0, tokens_per_second=0,
+                             responses=[('single JSON object', reply)])
+        assistant = InsuranceAgentAI(llm=llm)
+        assistant.breaker = CircuitBreaker()
+        return assistant
+
+    def test_parse(self):
+        document = {'executive_summary': 'Solid quarter.'}
+        cases = {
+            'bare': (json.dumps(document), document),
+            'fenced with prose': (f'Here you go:\n```json\n{json.dumps(document)}\n```\nThanks', document),
+            'not JSON': ('{"insights": [', {}),
+            'no object': ('No analysis available.', {}),
+            'array': ('["insights", "recommendations"]', {}),
+        }
+        for name, (reply, expected) in cases.items():
+            with self.subTest(reply=name):
+                self.assertEqual(self.assistant()._parse_combined_response(reply), expected)
+
+    def test_validate_section(self):
+        assistant = self.assistant()
+        cases = {
+            'not a list': ('oops', []),
+            'valid': ([self.RECOMMENDATION], [{**self.RECOMMENDATION, 'priority': 'high'}]),
+            'missing field': ([{**self.RECOMMENDATION, 'action': None}], []),
+            'blank field': ([{**self.RECOMMENDATION, 'action': '  '}], []),
+            'nested value': ([{**self.RECOMMENDATION, 'action': {'title': 'Call'}}], []),
+            'unknown priority': ([{**self.RECOMMENDATION, 'priority': 'urgent'}], []),
+            'not an object': (['Call lapsed clients'], []),
+        }
+        for name, (items, expected) in cases.items():
+            with self.subTest(items=name):
+                self.assertEqual(assistant._validate_section(items, 'recommendations'), expected)
+
+    def test_sections_fall_back_independently(self):
+        # Valid insights are kept; a malformed recommendations list and a missing summary fall back
+        reply = json.dumps({'insights': [self.INSIGHT], 'recommendations': [{'action': 'Call'}]})
+        assistant = self.assistant(reply)
+        agent = InsuranceAgent.objects.select_related('user').get(pk=self.agent.pk)
+        context = build_agent_context(agent)
+        with mock.patch.object(assistant, '_fallback_generate_insights') as insights_fallback:
+            summary = assistant.generate_summary_for_agent(agent)
+
+        insights_fallback.assert_not_called()
+        self.assertEqual(summary['insights'], [self.INSIGHT])
+        self.assertEqual(summary['recommendations'], assistant._fallback_generate_recommendations(context))
+        self.assertEqual(summary['executive_summary'], assistant._fallback_generate_executive_summary(context))
+        self.assertEqual(
+            {(fallback['section'], fallback['reason']) for fallback in assistant.trace.fallbacks},
+            {(section, 'invalid LLM response') for section in ('recommendations', 'executive_summary')},
+        )
+
+
+class SummaryCacheTests(SimpleTestCase):
+    """Cached summaries are served only while fresh, for the same fingerprint, evicting least recently used"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = SummaryCache(max_entries=2, ttl=60, clock=self.clock)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.set('a', 'fp', {'value': 'a'})
+        self.cache.set('b', 'fp', {'value': 'b'})
+        self.cache.get('a', 'fp')  # b is now the least recently used
+        self.cache.set('c', 'fp', {'value': 'c'})
+        self.assertEqual([self.cache.get(key, 'fp') is not None for key in ('a', 'b', 'c')], [True, False, True])
+        self.cache.set('d', 'fp', {'value': 'd'})  # a was read before c, so it goes next
+        self.assertEqual([self.cache.get(key, 'fp') is not None for key in ('a', 'c', 'd')], [False, True, True])
+        self.assertEqual(self.cache.stats()['evictions'], 2)
+
+    def test_ttl_expiry(self):
+        self.cache.set('a', 'fp', {'value': 'a'})
+        self.clock.advance(59)
+        self.assertEqual(self.cache.get('a', 'fp'), {'value': 'a'})
+        self.clock.advance(1)
+        self.assertIsNone(self.cache.get('a', 'fp'))
+        self.assertEqual((self.cache.stats()['expirations'], self.cache.stats()['size']), (1, 0))
+
+    def test_fingerprint_mismatch_invalidates(self):
+        self.cache.set('a', 'old', {'value': 'a'})
+        self.assertIsNone(self.cache.get('a', 'new'))
+        self.assertIsNone(self.cache.get('a', 'old'))
+        self.assertEqual(self.cache.stats()['invalidations'], 1)
+
+
+class FingerprintTests(TestCase):
+    """Any write to an agent's book of business, or to the plan catalog, changes the agent's fingerprint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rows = create_benchmark_rows(2, prefix='fingerprint')
+        cls.agent, cls.other_agent = cls.rows['agents']
+
+    def fingerprints(self):
+        agents = InsuranceAgent.objects.filter(pk__in=[self.agent.pk, self.other_agent.pk])
+        return compute_fingerprints(agents)
+
+    def assert_changes(self, write, other_agent_too=False):
+        before = self.fingerprints()
+        write()
+        after = self.fingerprints()
+        self.assertNotEqual(after[self.agent.pk], before[self.agent.pk])
+        self.assertEqual(after[self.other_agent.pk] != before[self.other_agent.pk], other_agent_too)
+
+    def test_agent_rows_change_fingerprint(self):
+        def first(model):
+            return model.objects.filter(agent=self.agent).first()
+
+        def update(model, **values):
+            def write():
+                row = first(model)
+                for name, value in values.items():
+                    setattr(row, name, value)
+                row.save()
+            return write
+
+        writes = {
+            'agent': lambda: InsuranceAgent.objects.get(pk=self.agent.pk).save(),
+            'client updated': update(Client, last_name='Renamed'),
+            'client added': lambda: Client.objects.create(**{**CLIENT_PAYLOAD, 'agent': self.agent}),
+            'application status': update(PolicyApplication, status='APPROVED'),
+            'commission status': update(AgentCommission, status='PAID'),
+            'commission amount': update(AgentCommission, amount=first(AgentCommission).amount + 1),
+            # Last: deleting a client cascades to its applications and commissions
+            'client deleted': lambda: first(Client).delete(),
+        }
+        for name, write in writes.items():
+            with self.subTest(write=name):
+                self.assert_changes(write)
+
+    def test_plan_change_affects_every_agent(self):
+        plan = InsurancePlan.objects.filter(is_active=True).first()
+        plan.plan_name = 'Renamed Plan'
+        self.assert_changes(plan.save, other_agent_too=True)
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Concurrent callers for one key share a single run of the work, its result or its exception"""
+
+    WAITERS = 4
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def work(self, outcome):
+        def fn():
+            self.calls += 1
+            self.release.wait(5)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return fn
+
+    def run_threads(self, outcome):
+        """Outcomes of the leader and WAITERS coalesced callers, in start order"""
+        results = [None] * (self.WAITERS + 1)
+
+        def call(index):
+            try:
+                results[index] = self.flight.do('key', self.work(outcome))
+            except Exception as e:
+                results[index] = e
+
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(self.WAITERS + 1)]
+        threads[0].start()
+        wait_until(lambda: self.calls == 1)
+        for thread in threads[1:]:
+            thread.start()
+        wait_until(lambda: self.flight.stats()['coalesced'] == self.WAITERS)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def run_coroutines(self, outcome):
+        async def main():
+            async def call():
+                try:
+                    return await self.flight.do_async('key', self.work(outcome))
+                except Exception as e:
+                    return e
+
+            leader = asyncio.ensure_future(call())
+            while self.calls != 1:
+                await asyncio.sleep(0.001)
+            waiters = [asyncio.ensure_future(call()) for _ in range(self.WAITERS)]
+            while self.flight.stats()['coalesced'] != self.WAITERS:
+                await asyncio.sleep(0.001)
+            self.release.set()
+            return await asyncio.gather(leader, *waiters)
+        return asyncio.run(main())
+
+    def test_callers_share_one_run(self):
+        for run in (self.run_threads, self.run_coroutines):
+            with self.subTest(run=run.__name__):
+                self.setUp()
+                result = object()
+                self.assertTrue(all(value is result for value in run(result)))
+                self.assertEqual(self.calls, 1)
+                self.assertEqual(self.flight.stats(), {'leaders': 1, 'coalesced': self.WAITERS, 'in_flight': 0})
+
+    def test_exception_reaches_every_caller_and_clears_the_key(self):
+        for run in (self.run_threads, self.run_coroutines):
+            with self.subTest(run=run.__name__):
+                self.setUp()
+                error = ValueError('upstream failed')
+                self.assertTrue(all(value is error for value in run(error)))
+                self.assertEqual(self.calls, 1)
+                self.assertEqual(self.flight.stats()['in_flight'], 0)
+
+                # The failed flight is gone: the next call runs the work again
+                self.release.set()
+                self.assertEqual(self.flight.do('key', self.work('retried')), 'retried')
+                self.assertEqual(self.calls, 2)
+
+
+class LLMResponseCacheTests(SimpleTestCase):
+    """The on-disk LLM response cache expires by TTL, evicts least recently used rows and keys on every input"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'cache', 'llm.sqlite3')
+        self.clock = FakeClock()
+
+    def make_cache(self, **kwargs):
+        cache = LLMResponseCache(self.path, clock=self.clock, **kwargs)
+        cache.EVICT_EVERY = 1
+        return cache
+
+    def test_ttl_expiry(self):
+        cache = self.make_cache(ttl=60)
+        cache.set('key', LLMResponse('text', {'total_tokens': 3}))
+        self.clock.advance(59)
+        self.assertEqual(cache.get('key'), LLMResponse('text', {'total_tokens': 3}))
+        self.clock.advance(1)
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (1, 1))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = self.make_cache(max_entries=2)
+        for key in ('a', 'b'):
+            cache.set(key, LLMResponse(key, {}))
+            self.clock.advance(1)
+        cache.get('a')  # b is now the least recently used
+        self.clock.advance(1)
+        cache.set('c', LLMResponse('c', {}))
+        self.assertEqual([cache.get(key) is not None for key in ('a', 'b', 'c')], [True, False, True])
+        self.assertEqual(cache.stats()['size'], 2)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_key_covers_every_input(self):
+        base = ('fake', 'model-a', 0.2, 'Summarize this book')
+        self.assertEqual(LLMResponseCache.make_key(*base), LLMResponseCache.make_key(*base))
+        keys = {LLMResponseCache.make_key(*base)}
+        for index, changed in enumerate(('openai', 'model-b', 0.3, 'Summarize this book.')):
+            with self.subTest(changed=changed):
+                key = LLMResponseCache.make_key(*base[:index], changed, *base[index + 1:])
+                self.assertNotIn(key, keys)
+                keys.add(key)
+
+    def test_connection_per_thread(self):
+        cache = self.make_cache()
+        cache.set('key', LLMResponse('text', {}))
+        seen = {}
+
+        def read():
+            seen['connection'] = cache._connection()
+            seen['response'] = cache.get('key')
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join(5)
+        self.assertIsNot(seen['connection'], cache._connection())
+        self.assertEqual(seen['response'], LLMResponse('text', {}))
+        self.assertEqual(cache.stats()['errors'], 0)
+
+
+class NormalizedShapeTests(TestCase):
+    """?shape=normalized side-loads every related object once, merged across shapes, in a stable order"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rows = create_benchmark_rows(3, prefix='normal')
+
+    def get(self, name, **params):
+        response = self.client.get(reverse(name), {'shape': 'normalized', 'page_size': 100, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_shapes_are_merged(self):
+        # Each commission's agent is also its application's agent, requested there with other fields
+        data = self.get(
+            'commission_list', expand='agent,application.agent',
+            fields='id,agent.agent_id,application.id,application.agent.email',
+        )
+        agents = data['included']['agents']
+        self.assertEqual(set(agents), {str(agent.pk) for agent in self.rows['agents']})
+        for agent in self.rows['agents']:
+            self.assertEqual(agents[str(agent.pk)], {'agent_id': agent.agent_id, 'email': agent.email})
+        for commission in data['results']:
+            self.assertIsInstance(commission['agent'], int)
+            self.assertEqual(data['included']['applications'][str(commission['application'])]['agent'], commission['agent'])
+
+    def test_nested_side_loads(self):
+        data = self.get('application_list', expand='plan.carrier,client.agent')
+        included = data['included']
+        self.assertEqual(sorted(included), ['agents', 'carriers', 'clients', 'plans'])
+        for application in data['results']:
+            plan = included['plans'][str(application['plan'])]
+            self.assertIn(str(plan['carrier']), included['carriers'])
+            client = included['clients'][str(application['client'])]
+            self.assertIn(str(client['agent']), included['agents'])
+            self.assertIsInstance(included['agents'][str(client['agent'])], dict)
+
+    def test_included_order(self):
+        # Resources by name and objects by id, whatever order the results reference them in
+        data = self.get('application_list', expand=APPLICATION_EXPAND)
+        plans = [application['plan'] for application in data['results']]
+        self.assertNotEqual(plans, sorted(plans))  # newest first, so not referenced in id order
+        included = data['included']
+        self.assertEqual(list(included), ['agents', 'carriers', 'clients', 'plans', 'users'])
+        for resource, entities in included.items():
+            with self.subTest(resource=resource):
+                self.assertEqual(list(entities), sorted(entities, key=int))
+
+    def test_query_count(self):
+        # Validator, the keyset page, then one prefetch per side-loaded resource (plans, carriers)
+        for extra, prefix in ((0, None), (10, 'nqa')):
+            if extra:
+                create_benchmark_rows(extra, prefix=prefix)
+            with self.subTest(rows=3 + extra), self.assertNumQueries(4):
+                self.get('application_list', expand='plan.carrier')
+
+
+class FastJSONRendererTests(TestCase):
+    """FastJSONRenderer output is byte-identical to DRF's JSONRenderer, except for the documented non-finite floats"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rows = create_benchmark_rows(3, prefix='render')
+        # Separators that JSONRenderer escapes, plus non-ASCII text it keeps as UTF-8
+        Client.objects.filter(pk=cls.rows['clients'][0].pk).update(address_line1='Line\u2028break\u2029 — café')
+
+    def assert_parity(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_endpoint_parity(self):
+        for label, name, kwargs, params, _ in ENDPOINTS:
+            url = reverse(name, kwargs={key: self.rows[source][0].pk for key, source in kwargs.items()})
+            with self.subTest(endpoint=label):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_decimal(self):
+        for value in (Decimal('0'), Decimal('1.10'), Decimal('-247.50'), Decimal('12345678.99')):
+            with self.subTest(value=value):
+                self.assert_parity({'amount': value})
+
+    def test_datetime(self):
+        values = [
+            datetime(2026, 6, 1, 9, 30, tzinfo=dt_timezone.utc),
+            datetime(2026, 6, 1, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            datetime(2026, 6, 1, 9, 30, tzinfo=dt_timezone(timedelta(hours=-5))),
+            datetime(2026, 6, 1, 9, 30),
+            date(2026, 6, 1),
+        ]
+        for value in values:
+            with self.subTest(value=value):
+                self.assert_parity({'at': value})
+
+    def test_non_finite_floats(self):
+        # JSONRenderer rejects them under STRICT_JSON; FastJSONRenderer renders null instead of failing the response
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with self.subTest(value=value):
+                self.assertEqual(FastJSONRenderer().render({'rate': value}), b'{"rate":null}')
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({'rate': value})
+
+
+class QueryBudgetTests(TestCase):
+    """Every list and detail endpoint runs the same number of queries at 1, 20 and 200 rows"""
+
+    SIZES = (1, 20, 200)
+
+    def test_query_budgets(self):
+        created, rows = 0, None
+        for size, prefix in zip(self.SIZES, ('bga', 'bgb', 'bgc')):
+            # Distinct prefixes keep generated carrier codes unique between batches
+            batch = create_benchmark_rows(size - created, prefix=prefix)
+            rows, created = rows or batch, size
+            for label, name, kwargs, params, budget in ENDPOINTS:
+                url = reverse(name, kwargs={key: rows[source][0].pk for key, source in kwargs.items()})
+                with self.subTest(endpoint=label, rows=size):
+                    # Warm per-process state (e.g. the search index probe) so only steady-state queries count
+                    self.client.get(url, params)
+                    cache.clear()  # measure the uncached dashboard
+                    with self.assertNumQueries(budget):
+                        response = self.client.get(url, params)
+                    self.assertEqual(response.status_code, 200)
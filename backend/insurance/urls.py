@@ -1,6 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from . import views
-from .ai_agent import agent_ai_dashboard, agent_recommendations
+from .exports import export_activities, export_applications, export_commissions
+from .ai_agent import (
+    agent_ai_dashboard, agent_ai_dashboard_async, agent_ai_dashboard_batch, agent_ai_dashboard_stream,
+    agent_recommendations, ai_pipeline_metrics, ai_stats
+)
 
 urlpatterns = [
     # Health check
@@ -13,8 +18,16 @@ urlpatterns = [
     path('agents/<int:agent_id>/commissions/', views.commission_summary, name='agent_commissions'),
     
     # AI Agent Assistant - Agentic Solution
-    path('agents/<str:agent_id>/ai-dashboard/', agent_ai_dashboard, name='agent_ai_dashboard'),
+    path(
+        'agents/<str:agent_id>/ai-dashboard/',
+        agent_ai_dashboard_async if settings.AI_ASYNC_VIEWS else agent_ai_dashboard,
+        name='agent_ai_dashboard'
+    ),
+    path('agents/<str:agent_id>/ai-dashboard/stream/', agent_ai_dashboard_stream, name='agent_ai_dashboard_stream'),
     path('agents/<str:agent_id>/ai-recommendations/', agent_recommendations, name='agent_ai_recommendations'),
+    path('agents/ai-dashboard/batch/', agent_ai_dashboard_batch, name='agent_ai_dashboard_batch'),
+    path('ai/stats/', ai_stats, name='ai_stats'),
+    path('ai/metrics/', ai_pipeline_metrics, name='ai_metrics'),
     
     # Insurance carriers
     path('carriers/', views.CarrierListView.as_view(), name='carrier_list'),
@@ -26,15 +39,21 @@ urlpatterns = [
     
     # Client management
     path('clients/', views.ClientListCreateView.as_view(), name='client_list'),
+    path('clients/bulk/', views.ClientBulkView.as_view(), name='client_bulk'),
     path('clients/<int:pk>/', views.ClientDetailView.as_view(), name='client_detail'),
     
     # Policy applications
     path('applications/', views.ApplicationListCreateView.as_view(), name='application_list'),
+    path('applications/bulk/', views.ApplicationBulkView.as_view(), name='application_bulk'),
+    path('applications/export/', export_applications, name='application_export'),
     path('applications/<int:pk>/', views.ApplicationDetailView.as_view(), name='application_detail'),
     
     # Commissions
     path('commissions/', views.CommissionListView.as_view(), name='commission_list'),
+    path('commissions/export/', export_commissions, name='commission_export'),
     
     # Activities
     path('activities/', views.ActivityListCreateView.as_view(), name='activity_list'),
+    path('activities/bulk/', views.ActivityBulkView.as_view(), name='activity_bulk'),
+    path('activities/export/', export_activities, name='activity_export'),
 ]
\ No newline at end of file
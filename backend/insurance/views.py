@@ -1,22 +1,87 @@
+from collections import OrderedDict
+
 from rest_framework import generics, status, permissions
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from django.db.models import Q, Sum, Count
 from django.utils import timezone
 from datetime import timedelta
+from .aggregates import agent_count
+from .bulk import BulkWriteView
+from .conditional import ConditionalGetMixin, agent_validators, conditional_get
+from .dashboard_cache import get_cached_dashboard, set_cached_dashboard
+from .filters import filter_activities, filter_applications, filter_commissions
+from .pagination import KeysetPagination
 from .models import (
     InsuranceAgent, InsuranceCarrier, InsurancePlan, Client,
     PolicyApplication, AgentCommission, AgentActivity
 )
+from .readers import compile_reader
+from .rollups import get_agent_stats
+from .search import search_clients
 from .serializers import (
     InsuranceAgentSerializer, InsuranceCarrierSerializer, InsurancePlanSerializer,
     ClientSerializer, PolicyApplicationSerializer, AgentCommissionSerializer,
     AgentActivitySerializer, ClientSummarySerializer, ApplicationSummarySerializer,
-    CommissionSummarySerializer
+    CommissionSummarySerializer, IncludedEntities, shape_queryset
 )
 
 
+class ShapedQuerysetMixin:
+    """Fetch only the joins and columns the requested ?fields= / ?expand= shape renders"""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        # Columns the paginator reads from each row, e.g. keyset cursor positions
+        required = getattr(self.paginator, 'required_fields', ())
+        return shape_queryset(queryset, self.get_serializer(), required)
+
+
+class ValuesListMixin:
+    """Render list pages from values() rows instead of model instances when the shape allows it"""
+
+    def list(self, request, *args, **kwargs):
+        reader = compile_reader(self.get_serializer())
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        required = getattr(self.paginator, 'required_fields', ())
+        queryset = reader.values(self.filter_queryset(self.get_queryset()), required)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(reader.render(queryset))
+        return self.get_paginated_response(reader.render(page))
+
+
+class NormalizedListMixin:
+    """
+    ?shape=normalized: relations in ?expand= render as primary keys and every distinct related object
+    appears once in the response's `included` map, keyed by resource name and id
+    """
+    included = None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.included is not None:
+            context['included'] = self.included
+        return context
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('shape') != 'normalized':
+            return super().list(request, *args, **kwargs)
+
+        self.included = IncludedEntities()
+        response = super().list(request, *args, **kwargs)
+        if not isinstance(response.data, dict):
+            response.data = OrderedDict([('results', response.data)])
+        response.data['included'] = self.included.collections
+        return response
+
+
 # Health check endpoint
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
@@ -29,29 +94,33 @@ def health_check(view):
 
 
 # Agent Management Views
-class AgentListCreateView(generics.ListCreateAPIView):
-    queryset = InsuranceAgent.objects.filter(is_active=True)
+class AgentListCreateView(ConditionalGetMixin, ShapedQuerysetMixin, NormalizedListMixin, ValuesListMixin,
+        generics.ListCreateAPIView):
+    queryset = InsuranceAgent.objects.filter(is_active=True).order_by('agent_id')
     serializer_class = InsuranceAgentSerializer
     permission_classes = [permissions.AllowAny]  # Configure authentication as needed
 
 
-class AgentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AgentDetailView(ConditionalGetMixin, ShapedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = InsuranceAgent.objects.all()
     serializer_class = InsuranceAgentSerializer
     permission_classes = [permissions.AllowAny]
 
 
 # Insurance Carriers Views
-class CarrierListView(generics.ListAPIView):
-    queryset = InsuranceCarrier.objects.filter(is_active=True)
+class CarrierListView(ConditionalGetMixin, ShapedQuerysetMixin, NormalizedListMixin, ValuesListMixin,
+        generics.ListAPIView):
+    queryset = InsuranceCarrier.objects.filter(is_active=True).order_by('name')
     serializer_class = InsuranceCarrierSerializer
     permission_classes = [permissions.AllowAny]
 
 
 # Insurance Plans Views
-class PlanListView(generics.ListAPIView):
+class PlanListView(ConditionalGetMixin, ShapedQuerysetMixin, NormalizedListMixin, ValuesListMixin,
+        generics.ListAPIView):
     serializer_class = InsurancePlanSerializer
     permission_classes = [permissions.AllowAny]
+    validator_related = ('carrier',)
 
     def get_queryset(self):
         queryset = InsurancePlan.objects.filter(is_active=True).order_by('carrier__name', 'plan_name')
@@ -66,19 +135,23 @@ class PlanListView(generics.ListAPIView):
         if tier:
             queryset = queryset.filter(tier=tier)
 
-        return queryset.select_related('carrier')
+        return queryset
 
 
-class PlanDetailView(generics.RetrieveAPIView):
+class PlanDetailView(ConditionalGetMixin, ShapedQuerysetMixin, generics.RetrieveAPIView):
     queryset = InsurancePlan.objects.filter(is_active=True)
     serializer_class = InsurancePlanSerializer
     permission_classes = [permissions.AllowAny]
+    validator_related = ('carrier',)
 
 
 # Client Management Views
-class ClientListCreateView(generics.ListCreateAPIView):
+class ClientListCreateView(ConditionalGetMixin, ShapedQuerysetMixin, NormalizedListMixin, ValuesListMixin,
+        generics.ListCreateAPIView):
     serializer_class = ClientSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    validator_related = ('agent',)
 
     def get_queryset(self):
         agent_id = self.request.query_params.get('agent')
@@ -92,192 +165,180 @@ class ClientListCreateView(generics.ListCreateAPIView):
         if status_filter:
             queryset = queryset.filter(status=status_filter)
         if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search)
-            )
+            queryset = search_clients(queryset, search)
+
+        return queryset
+
 
-        return queryset.select_related('agent__user')
+class ClientBulkView(BulkWriteView):
+    queryset = Client.objects.all()
+    serializer_class = ClientSerializer
+    permission_classes = [permissions.AllowAny]
 
 
-class ClientDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ClientDetailView(ConditionalGetMixin, ShapedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
     permission_classes = [permissions.AllowAny]
+    validator_related = ('agent',)
 
 
 # Policy Application Views
-class ApplicationListCreateView(generics.ListCreateAPIView):
+# Relations nested by PolicyApplicationSerializer, for conditional GET validators
+APPLICATION_RELATED = ('agent', 'client', 'client__agent', 'plan', 'plan__carrier')
+
+
+class ApplicationListCreateView(ConditionalGetMixin, ShapedQuerysetMixin, NormalizedListMixin, ValuesListMixin,
+        generics.ListCreateAPIView):
     serializer_class = PolicyApplicationSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    validator_related = APPLICATION_RELATED
 
     def get_queryset(self):
-        agent_id = self.request.query_params.get('agent')
-        client_id = self.request.query_params.get('client')
-        status_filter = self.request.query_params.get('status')
-
-        queryset = PolicyApplication.objects.all()
+        return filter_applications(PolicyApplication.objects.all(), self.request.query_params)
 
-        if agent_id:
-            queryset = queryset.filter(agent_id=agent_id)
-        if client_id:
-            queryset = queryset.filter(client_id=client_id)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
 
-        return queryset.select_related('agent__user', 'client', 'plan__carrier')
+class ApplicationBulkView(BulkWriteView):
+    queryset = PolicyApplication.objects.all()
+    serializer_class = PolicyApplicationSerializer
+    permission_classes = [permissions.AllowAny]
 
 
-class ApplicationDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ApplicationDetailView(ConditionalGetMixin, ShapedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = PolicyApplication.objects.all()
     serializer_class = PolicyApplicationSerializer
     permission_classes = [permissions.AllowAny]
+    validator_related = APPLICATION_RELATED
 
 
 # Commission Views
-class CommissionListView(generics.ListAPIView):
+class CommissionListView(ConditionalGetMixin, ShapedQuerysetMixin, NormalizedListMixin, ValuesListMixin,
+        generics.ListAPIView):
     serializer_class = AgentCommissionSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    validator_related = ('agent', 'application') + tuple(f'application__{path}' for path in APPLICATION_RELATED)
 
     def get_queryset(self):
-        agent_id = self.request.query_params.get('agent')
-        pay_period = self.request.query_params.get('period')
-        status_filter = self.request.query_params.get('status')
+        return filter_commissions(AgentCommission.objects.all(), self.request.query_params)
 
-        queryset = AgentCommission.objects.all()
 
-        if agent_id:
-            queryset = queryset.filter(agent_id=agent_id)
-        if pay_period:
-            queryset = queryset.filter(pay_period=pay_period)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
+# Activity Views
+class ActivityListCreateView(ConditionalGetMixin, ShapedQuerysetMixin, NormalizedListMixin, ValuesListMixin,
+        generics.ListCreateAPIView):
+    serializer_class = AgentActivitySerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    validator_related = ('agent', 'client', 'client__agent')
 
-        return queryset.select_related('agent__user', 'application__client')
+    def get_queryset(self):
+        return filter_activities(AgentActivity.objects.all(), self.request.query_params)
 
 
-# Activity Views
-class ActivityListCreateView(generics.ListCreateAPIView):
+class ActivityBulkView(BulkWriteView):
+    queryset = AgentActivity.objects.all()
     serializer_class = AgentActivitySerializer
     permission_classes = [permissions.AllowAny]
 
-    def get_queryset(self):
-        agent_id = self.request.query_params.get('agent')
-        client_id = self.request.query_params.get('client')
-        activity_type = self.request.query_params.get('type')
 
-        queryset = AgentActivity.objects.all()
+# Dashboard/Analytics Views
+def agent_dashboard_validators(request, agent_id):
+    # Month-to-date figures change at midnight, so the date is part of the validator
+    return agent_validators(
+        request, agent_id,
+        models=(Client, PolicyApplication, AgentActivity),
+        latest=[(PolicyApplication, 'plan__updated_at')],
+        parts=[timezone.now().date()]
+    )
 
-        if agent_id:
-            queryset = queryset.filter(agent_id=agent_id)
-        if client_id:
-            queryset = queryset.filter(client_id=client_id)
-        if activity_type:
-            queryset = queryset.filter(activity_type=activity_type)
 
-        return queryset.select_related('agent__user', 'client')
+def commission_summary_validators(request, agent_id):
+    return agent_validators(request, agent_id, models=(AgentCommission,))
 
 
-# Dashboard/Analytics Views
+@conditional_get(agent_dashboard_validators)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def agent_dashboard(request, agent_id):
     """Get dashboard data for a specific agent"""
+    # Cached bodies are only served for the data version the validators just computed
+    version = getattr(request, 'validators', (None, None))[0]
+    cached = get_cached_dashboard(agent_id, version) if version else None
+    if cached is not None:
+        return Response(cached)
+    
+    # Get date ranges
+    today = timezone.now().date()
+    this_month_start = today.replace(day=1)
+    
     try:
-        agent = InsuranceAgent.objects.get(id=agent_id)
-        
-        # Get date ranges
-        today = timezone.now().date()
-        this_month_start = today.replace(day=1)
-        last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
-        
-        # Client statistics
-        total_clients = Client.objects.filter(agent=agent).count()
-        active_clients = Client.objects.filter(agent=agent, status='ACTIVE').count()
-        prospects = Client.objects.filter(agent=agent, status='PROSPECT').count()
-        
-        # Application statistics
-        applications_this_month = PolicyApplication.objects.filter(
-            agent=agent,
-            application_date__gte=this_month_start
-        ).count()
-        
-        pending_applications = PolicyApplication.objects.filter(
-            agent=agent,
-            status__in=['SUBMITTED', 'UNDER_REVIEW']
-        ).count()
-        
-        approved_applications = PolicyApplication.objects.filter(
-            agent=agent,
-            status='APPROVED',
-            application_date__gte=this_month_start
-        ).count()
-        
-        # Commission statistics
-        total_commissions = AgentCommission.objects.filter(
-            agent=agent,
-            status='PAID'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        pending_commissions = AgentCommission.objects.filter(
-            agent=agent,
-            status__in=['PENDING', 'CALCULATED']
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Recent activities
-        recent_activities = AgentActivity.objects.filter(
-            agent=agent
-        ).order_by('-created_at')[:10]
-        
-        # Recent clients
-        recent_clients = Client.objects.filter(
-            agent=agent
-        ).order_by('-created_at')[:5]
-        
-        # Recent applications
-        recent_applications = PolicyApplication.objects.filter(
-            agent=agent
-        ).order_by('-created_at')[:5]
-        
-        dashboard_data = {
-            'agent': InsuranceAgentSerializer(agent).data,
-            'statistics': {
-                'clients': {
-                    'total': total_clients,
-                    'active': active_clients,
-                    'prospects': prospects
-                },
-                'applications': {
-                    'this_month': applications_this_month,
-                    'pending': pending_applications,
-                    'approved_this_month': approved_applications
-                },
-                'commissions': {
-                    'total_earned': float(total_commissions),
-                    'pending': float(pending_commissions)
-                }
-            },
-            'recent_activities': AgentActivitySerializer(recent_activities, many=True).data,
-            'recent_clients': ClientSummarySerializer(recent_clients, many=True).data,
-            'recent_applications': ApplicationSummarySerializer(recent_applications, many=True).data
-        }
-        
-        return Response(dashboard_data)
-        
+        # Agent, user, status rollups and the month-to-date counts in a single query
+        agent = InsuranceAgent.objects.select_related('user', 'stats').annotate(
+            applications_this_month=agent_count(PolicyApplication, Q(application_date__gte=this_month_start)),
+            approved_applications=agent_count(
+                PolicyApplication, Q(status='APPROVED', application_date__gte=this_month_start)
+            ),
+        ).get(id=agent_id)
     except InsuranceAgent.DoesNotExist:
         return Response(
             {'error': 'Agent not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+    
+    stats = get_agent_stats(agent)
+    
+    # Recent activities
+    recent_activities = AgentActivity.objects.filter(
+        agent=agent
+    ).select_related('client').order_by('-created_at')[:10]
+    
+    # Recent clients
+    recent_clients = Client.objects.filter(
+        agent=agent
+    ).order_by('-created_at')[:5]
+    
+    # Recent applications
+    recent_applications = PolicyApplication.objects.filter(
+        agent=agent
+    ).select_related('client', 'plan').order_by('-created_at')[:5]
+    
+    dashboard_data = {
+        'agent': InsuranceAgentSerializer(agent, expand={'user': {}}).data,
+        'statistics': {
+            'clients': {
+                'total': stats.total_clients,
+                'active': stats.clients_active,
+                'prospects': stats.clients_prospect
+            },
+            'applications': {
+                'this_month': agent.applications_this_month,
+                'pending': stats.pending_applications,
+                'approved_this_month': agent.approved_applications
+            },
+            'commissions': {
+                'total_earned': float(stats.commission_amount_paid),
+                'pending': float(stats.pending_commission_amount)
+            }
+        },
+        'recent_activities': AgentActivitySerializer(recent_activities, many=True, expand={'client': {}}).data,
+        'recent_clients': ClientSummarySerializer(recent_clients, many=True).data,
+        'recent_applications': ApplicationSummarySerializer(recent_applications, many=True).data
+    }
+    
+    if version:
+        set_cached_dashboard(agent.pk, version, dashboard_data)
+    
+    return Response(dashboard_data)
 
 
+@conditional_get(commission_summary_validators)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def commission_summary(request, agent_id):
     """Get commission summary for an agent"""
     try:
-        agent = InsuranceAgent.objects.get(id=agent_id)
+        agent = InsuranceAgent.objects.select_related('user').get(id=agent_id)
         
         # Get commission data by pay period
         commissions = AgentCommission.objects.filter(
@@ -288,7 +349,7 @@ def commission_summary(request, agent_id):
         ).order_by('-pay_period')
         
         return Response({
-            'agent': InsuranceAgentSerializer(agent).data,
+            'agent': InsuranceAgentSerializer(agent, expand={'user': {}}).data,
             'commission_periods': commissions
         })
         
@@ -324,7 +385,7 @@ def calculate_quote(request):
         quoted_premium = base_premium * age_factor
         
         quote_data = {
-            'plan': InsurancePlanSerializer(plan).data,
+            'plan': InsurancePlanSerializer(plan, expand={'carrier': {}}).data,
             'quoted_premium': round(quoted_premium, 2),
             'annual_premium': round(quoted_premium * 12, 2),
             'commission_estimate': round(quoted_premium * 12 * float(plan.commission_percentage) / 100, 2),
@@ -13,4 +13,7 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'navicare_backend.settings')
 
+# Serve the AI dashboard from its async view so coalesced requests wait without holding threads
+os.environ.setdefault('AI_ASYNC_VIEWS', 'True')
+
 application = get_asgi_application()
\ No newline at end of file
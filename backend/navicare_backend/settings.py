@@ -128,10 +128,75 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'insurance.renderers.FastJSONRenderer',  # orjson-backed, same output as rest_framework's JSONRenderer
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    'PAGE_SIZE': 20,
+    # Money and other decimals render as strings ("412.50") by default; False renders JSON numbers (412.5)
+    'COERCE_DECIMAL_TO_STRING': env.bool('API_DECIMALS_AS_STRINGS', default=True),
+}
+
+# Agent dashboard payloads are cached per agent and invalidated on writes (see insurance/signals.py); entries
+# are tied to the data version they were built from, so the default per-process cache never serves stale data
+AGENT_DASHBOARD_CACHE_TTL = env.int('AGENT_DASHBOARD_CACHE_TTL', default=300)  # seconds
+
+# Keyset-paginated lists (see insurance/pagination.py) skip COUNT(*) unless ?count= asks for one; set to
+# 'exact' or 'estimate' to keep `count` in every response for clients that still read it
+KEYSET_PAGINATION_COUNT = env('KEYSET_PAGINATION_COUNT', default=None)
+
+# Items accepted per request by the bulk create/update endpoints (see insurance/bulk.py)
+BULK_WRITE_MAX_ITEMS = env.int('BULK_WRITE_MAX_ITEMS', default=1000)
+
+# Rows fetched per round trip by the streaming CSV/NDJSON exports (see insurance/exports.py)
+EXPORT_CHUNK_SIZE = env.int('EXPORT_CHUNK_SIZE', default=2000)
+
+# AI assistant configuration
+AI_LLM_BACKEND = env('AI_LLM_BACKEND', default='groq')  # 'groq' or 'fake' (offline stand-in)
+AI_LLM_BACKEND_OPTIONS = {
+    'groq': {
+        'model_name': env('GROQ_MODEL_NAME', default='mixtral-8x7b-32768'),
+        'temperature': 0.1,
+        'max_tokens': 1024,
+        'timeout': env.float('AI_LLM_TIMEOUT', default=10),  # seconds per upstream call
+    },
+    'fake': {
+        'latency': env('AI_FAKE_LLM_LATENCY', default='lognormal'),  # fixed, uniform, normal or lognormal
+        'latency_ms': env.float('AI_FAKE_LLM_LATENCY_MS', default=800),
+        'tokens_per_second': env.float('AI_FAKE_LLM_TOKENS_PER_SECOND', default=250),
+        'error_rate': env.float('AI_FAKE_LLM_ERROR_RATE', default=0.0),
+    },
+}
+AI_SUMMARY_CACHE_SIZE = env.int('AI_SUMMARY_CACHE_SIZE', default=512)
+AI_SUMMARY_CACHE_TTL = env.int('AI_SUMMARY_CACHE_TTL', default=900)  # seconds
+AI_LLM_MAX_CONCURRENCY = env.int('AI_LLM_MAX_CONCURRENCY', default=6)  # concurrent LLM calls per process
+AI_GENERATION_MODE = env('AI_GENERATION_MODE', default='parallel')  # 'parallel' (three LLM calls) or 'combined' (one)
+AI_REQUEST_BUDGET_SECONDS = env.float('AI_REQUEST_BUDGET_SECONDS', default=12)  # shared by all LLM stages of a request
+AI_LLM_SLOW_CALL_SECONDS = env.float('AI_LLM_SLOW_CALL_SECONDS', default=8)  # slower calls count as breaker failures
+AI_LLM_BREAKER_FAILURE_THRESHOLD = env.int('AI_LLM_BREAKER_FAILURE_THRESHOLD', default=5)
+AI_LLM_BREAKER_RESET_SECONDS = env.float('AI_LLM_BREAKER_RESET_SECONDS', default=30)  # open time before a half-open probe
+AI_BATCH_CONCURRENCY = env.int('AI_BATCH_CONCURRENCY', default=4)  # agents generated at once by the batch endpoint
+AI_BATCH_MAX_AGENTS = env.int('AI_BATCH_MAX_AGENTS', default=200)
+AI_LLM_RESPONSE_CACHE_PATH = env('AI_LLM_RESPONSE_CACHE_PATH', default=str(BASE_DIR / 'var' / 'cache' / 'llm_cache.sqlite3'))  # empty disables
+AI_LLM_RESPONSE_CACHE_TTL = env.int('AI_LLM_RESPONSE_CACHE_TTL', default=604800)  # seconds
+AI_LLM_RESPONSE_CACHE_SIZE = env.int('AI_LLM_RESPONSE_CACHE_SIZE', default=5000)  # responses kept on disk
+AI_ASYNC_VIEWS = env.bool('AI_ASYNC_VIEWS', default=False)  # enabled by asgi.py to serve the AI dashboard natively async
+AI_SNAPSHOT_MAX_AGE = env.int('AI_SNAPSHOT_MAX_AGE', default=86400)  # seconds a precomputed dashboard stays servable
+
+# Logging - AI pipeline fallbacks and LLM backend status go to the 'insurance.ai' logger
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'insurance': {
+            'handlers': ['console'],
+            'level': env('INSURANCE_LOG_LEVEL', default='INFO'),
+        },
+    },
 }
 
 # CORS settings
@@ -142,4 +207,7 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:8000",
 ]
 
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# Let the frontend read AI pipeline stage timings
+CORS_EXPOSE_HEADERS = ['Server-Timing']
\ No newline at end of file
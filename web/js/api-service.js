@@ -60,7 +60,7 @@ class APIService {
     async getInsurancePlans() {
         try {
             console.log('🏥 Fetching insurance plans...');
-            const response = await this.fetchWithTimeout(`${this.baseURL}/plans/`);
+            const response = await this.fetchWithTimeout(`${this.baseURL}/plans/?expand=carrier`);
             console.log('📋 Raw API response:', response);
             // Django API returns paginated data: { results: [...], count: X, next: null, previous: null }
             const plans = response.results || response;  // Handle both paginated and direct array responses
@@ -80,7 +80,7 @@ class APIService {
      */
     async getInsurancePlan(planId) {
         try {
-            const response = await this.fetchWithTimeout(`${this.baseURL}/plans/${planId}/`);
+            const response = await this.fetchWithTimeout(`${this.baseURL}/plans/${planId}/?expand=carrier`);
             return response;
         } catch (error) {
             console.error('Error fetching insurance plan:', error);